@@ -0,0 +1,190 @@
+"""
+Paylaşımlı HTTP istemci kaydı.
+Tek bir connection pool'lu Groq istemcisi (LangChain ChatGroq ile aynı httpx havuzu)
+ve Gemini için tek bir keep-alive requests.Session; tüm modüller buradan alır.
+Groq havuzlarının event hook'ları her chat.completions isteğini agents.scheduler'dan geçirir.
+Async yol için aynı ayarlarla AsyncGroq + httpx.AsyncClient havuzları tutulur
+(süreç başına tek event loop varsayılır: Gradio'nun loop'u).
+"""
+
+import threading
+from typing import TYPE_CHECKING, Optional, Tuple
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from agents.scheduler import get_scheduler
+from config.settings import Settings, get_settings
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq, Groq
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    """Groq ve Gemini istemcilerini tembel (lazy) oluşturan ve paylaşan kayıt"""
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self._lock = threading.Lock()
+        self._groq_http: Optional[httpx.Client] = None
+        self._groq: Optional["Groq"] = None
+        self._gemini_session: Optional[requests.Session] = None
+        self._groq_async_http: Optional[httpx.AsyncClient] = None
+        self._async_groq: Optional["AsyncGroq"] = None
+        self._gemini_async: Optional[httpx.AsyncClient] = None
+
+    def _limits(self) -> httpx.Limits:
+        return httpx.Limits(
+            max_connections=self.settings.http_pool_size,
+            max_keepalive_connections=self.settings.http_keepalive_connections,
+            keepalive_expiry=self.settings.http_keepalive_expiry
+        )
+
+    @property
+    def groq_timeout(self) -> httpx.Timeout:
+        """Groq çağrıları için connect/read timeout"""
+        return httpx.Timeout(self.settings.http_read_timeout, connect=self.settings.http_connect_timeout)
+
+    @property
+    def gemini_timeout(self) -> Tuple[float, float]:
+        """requests için (connect, read) timeout"""
+        return (self.settings.http_connect_timeout, self.settings.http_read_timeout)
+
+    @property
+    def groq_http_client(self) -> httpx.Client:
+        """Groq SDK ve ChatGroq'un paylaştığı httpx havuzu"""
+        with self._lock:
+            if self._groq_http is None:
+                self._groq_http = httpx.Client(limits=self._limits(), timeout=self.groq_timeout,
+                                               event_hooks=get_scheduler().event_hooks())
+            return self._groq_http
+
+    @property
+    def groq(self) -> "Groq":
+        """Paylaşımlı Groq istemcisi"""
+        http_client = self.groq_http_client
+        with self._lock:
+            if self._groq is None:
+                if not self.settings.groq_api_key:
+                    raise ValueError("GROQ_API_KEY environment variable is required")
+                from groq import Groq  # SDK ilk istemci kurulurken yüklenir
+                self._groq = Groq(
+                    api_key=self.settings.groq_api_key,
+                    base_url=self.settings.groq_base_url,
+                    http_client=http_client,
+                    timeout=self.groq_timeout,
+                    max_retries=0  # retry/backoff agents.resilience'ta
+                )
+                logger.info(f"🔌 Groq istemcisi oluşturuldu (pool={self.settings.http_pool_size})")
+            return self._groq
+
+    @property
+    def gemini_session(self) -> requests.Session:
+        """Gemini generateContent çağrıları için keep-alive session"""
+        with self._lock:
+            if self._gemini_session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.settings.http_pool_size
+                )
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+                session.headers.update({"Content-Type": "application/json"})
+                self._gemini_session = session
+                logger.info(f"🔌 Gemini HTTP session oluşturuldu (pool={self.settings.http_pool_size})")
+            return self._gemini_session
+
+    @property
+    def groq_async_http_client(self) -> httpx.AsyncClient:
+        """AsyncGroq ve ChatGroq'un async çağrılarının paylaştığı httpx havuzu"""
+        with self._lock:
+            if self._groq_async_http is None:
+                self._groq_async_http = httpx.AsyncClient(limits=self._limits(), timeout=self.groq_timeout,
+                                                          event_hooks=get_scheduler().async_event_hooks())
+            return self._groq_async_http
+
+    @property
+    def async_groq(self) -> "AsyncGroq":
+        """Paylaşımlı AsyncGroq istemcisi"""
+        http_client = self.groq_async_http_client
+        with self._lock:
+            if self._async_groq is None:
+                if not self.settings.groq_api_key:
+                    raise ValueError("GROQ_API_KEY environment variable is required")
+                from groq import AsyncGroq
+                self._async_groq = AsyncGroq(
+                    api_key=self.settings.groq_api_key,
+                    base_url=self.settings.groq_base_url,
+                    http_client=http_client,
+                    timeout=self.groq_timeout,
+                    max_retries=0  # retry/backoff agents.resilience'ta
+                )
+                logger.info(f"🔌 AsyncGroq istemcisi oluşturuldu (pool={self.settings.http_pool_size})")
+            return self._async_groq
+
+    @property
+    def gemini_async_client(self) -> httpx.AsyncClient:
+        """Gemini için keep-alive async HTTP istemcisi"""
+        with self._lock:
+            if self._gemini_async is None:
+                self._gemini_async = httpx.AsyncClient(
+                    limits=self._limits(),
+                    timeout=self.groq_timeout,
+                    headers={"Content-Type": "application/json"}
+                )
+            return self._gemini_async
+
+    async def aclose(self) -> None:
+        """Async havuzları kapat"""
+        with self._lock:
+            clients = [client for client in (self._groq_async_http, self._gemini_async) if client is not None]
+            self._groq_async_http = None
+            self._async_groq = None
+            self._gemini_async = None
+        for client in clients:
+            await client.aclose()
+
+    def close(self) -> None:
+        """Açık bağlantı havuzlarını kapat"""
+        with self._lock:
+            if self._groq_http is not None:
+                self._groq_http.close()
+            if self._gemini_session is not None:
+                self._gemini_session.close()
+            self._groq_http = None
+            self._groq = None
+            self._gemini_session = None
+
+
+_registry: Optional[ClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_registry() -> ClientRegistry:
+    """Süreç genelindeki tek istemci kaydı"""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ClientRegistry()
+        return _registry
+
+
+def get_groq_client() -> "Groq":
+    """Paylaşımlı Groq istemcisi"""
+    return get_registry().groq
+
+
+def get_gemini_session() -> requests.Session:
+    """Paylaşımlı Gemini session'ı"""
+    return get_registry().gemini_session
+
+
+def get_async_groq_client() -> "AsyncGroq":
+    """Paylaşımlı AsyncGroq istemcisi"""
+    return get_registry().async_groq
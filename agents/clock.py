@@ -0,0 +1,123 @@
+"""
+Sistem saati + zoneinfo ile yerel tarih/saat biçimlendirme (ağ çağrısı yok).
+"""
+
+import functools
+import re
+from datetime import datetime
+from typing import Dict, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+
+MONTH_NAMES = {
+    "tr": ["Ocak", "Şubat", "Mart", "Nisan", "Mayıs", "Haziran",
+           "Temmuz", "Ağustos", "Eylül", "Ekim", "Kasım", "Aralık"],
+    "en": ["January", "February", "March", "April", "May", "June",
+           "July", "August", "September", "October", "November", "December"],
+}
+
+DAY_NAMES = {
+    "tr": ["Pazartesi", "Salı", "Çarşamba", "Perşembe", "Cuma", "Cumartesi", "Pazar"],
+    "en": ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"],
+}
+
+LABELS = {
+    "tr": {"date": "Tarih", "day": "Gün", "time": "Saat", "zone": "Zaman Dilimi"},
+    "en": {"date": "Date", "day": "Day", "time": "Time", "zone": "Time Zone"},
+}
+
+
+# Sık sorulan şehir/ülke adları (Türkçe ve İngilizce) → IANA zaman dilimi
+CITY_TIMEZONES: Dict[str, str] = {
+    "istanbul": "Europe/Istanbul", "ankara": "Europe/Istanbul", "izmir": "Europe/Istanbul",
+    "türkiye": "Europe/Istanbul", "turkey": "Europe/Istanbul",
+    "london": "Europe/London", "londra": "Europe/London", "ingiltere": "Europe/London",
+    "england": "Europe/London", "uk": "Europe/London",
+    "paris": "Europe/Paris", "fransa": "Europe/Paris", "france": "Europe/Paris",
+    "berlin": "Europe/Berlin", "almanya": "Europe/Berlin", "germany": "Europe/Berlin",
+    "münih": "Europe/Berlin", "munich": "Europe/Berlin", "frankfurt": "Europe/Berlin",
+    "amsterdam": "Europe/Amsterdam", "hollanda": "Europe/Amsterdam", "netherlands": "Europe/Amsterdam",
+    "brüksel": "Europe/Brussels", "brussels": "Europe/Brussels",
+    "roma": "Europe/Rome", "rome": "Europe/Rome", "italya": "Europe/Rome", "italy": "Europe/Rome",
+    "madrid": "Europe/Madrid", "barselona": "Europe/Madrid", "barcelona": "Europe/Madrid",
+    "ispanya": "Europe/Madrid", "spain": "Europe/Madrid",
+    "lizbon": "Europe/Lisbon", "lisbon": "Europe/Lisbon",
+    "viyana": "Europe/Vienna", "vienna": "Europe/Vienna",
+    "zürih": "Europe/Zurich", "zurich": "Europe/Zurich",
+    "atina": "Europe/Athens", "athens": "Europe/Athens", "yunanistan": "Europe/Athens", "greece": "Europe/Athens",
+    "moskova": "Europe/Moscow", "moscow": "Europe/Moscow",
+    "kiev": "Europe/Kyiv", "kyiv": "Europe/Kyiv",
+    "bakü": "Asia/Baku", "baku": "Asia/Baku", "azerbaycan": "Asia/Baku", "azerbaijan": "Asia/Baku",
+    "tahran": "Asia/Tehran", "tehran": "Asia/Tehran", "iran": "Asia/Tehran",
+    "dubai": "Asia/Dubai", "kahire": "Africa/Cairo", "cairo": "Africa/Cairo",
+    "mısır": "Africa/Cairo", "egypt": "Africa/Cairo",
+    "tokyo": "Asia/Tokyo", "japonya": "Asia/Tokyo", "japan": "Asia/Tokyo",
+    "seul": "Asia/Seoul", "seoul": "Asia/Seoul",
+    "pekin": "Asia/Shanghai", "beijing": "Asia/Shanghai", "şanghay": "Asia/Shanghai",
+    "shanghai": "Asia/Shanghai", "çin": "Asia/Shanghai", "china": "Asia/Shanghai",
+    "hong kong": "Asia/Hong_Kong", "singapur": "Asia/Singapore", "singapore": "Asia/Singapore",
+    "hindistan": "Asia/Kolkata", "india": "Asia/Kolkata", "yeni delhi": "Asia/Kolkata",
+    "new delhi": "Asia/Kolkata", "mumbai": "Asia/Kolkata",
+    "new york": "America/New_York", "washington": "America/New_York", "boston": "America/New_York",
+    "toronto": "America/Toronto", "chicago": "America/Chicago", "denver": "America/Denver",
+    "los angeles": "America/Los_Angeles", "san francisco": "America/Los_Angeles",
+    "seattle": "America/Los_Angeles", "kaliforniya": "America/Los_Angeles", "california": "America/Los_Angeles",
+    "meksiko": "America/Mexico_City", "mexico city": "America/Mexico_City",
+    "sao paulo": "America/Sao_Paulo", "brezilya": "America/Sao_Paulo", "brazil": "America/Sao_Paulo",
+    "buenos aires": "America/Argentina/Buenos_Aires", "arjantin": "America/Argentina/Buenos_Aires",
+    "sidney": "Australia/Sydney", "sydney": "Australia/Sydney", "melbourne": "Australia/Melbourne",
+    "utc": "UTC", "gmt": "UTC",
+}
+
+_ZONE_NAME_RE = re.compile(r"\b[A-Za-z]+(?:/[A-Za-z0-9_+\-]+){1,2}\b")
+
+
+@functools.lru_cache(maxsize=1)
+def _city_pattern() -> re.Pattern:
+    names = sorted(CITY_TIMEZONES, key=len, reverse=True)
+    return re.compile(r"\b(" + "|".join(re.escape(name) for name in names) + r")\b")
+
+
+@functools.lru_cache(maxsize=1)
+def _zone_names() -> Dict[str, str]:
+    return {name.lower(): name for name in available_timezones()}
+
+
+def find_timezone(text: str) -> Optional[str]:
+    """Metindeki IANA adını ("Asia/Tokyo") veya bilinen şehir/ülke adını ("Tokyo'da") zaman dilimine çevir"""
+    for candidate in _ZONE_NAME_RE.findall(text):
+        zone = _zone_names().get(candidate.lower())
+        if zone:
+            return zone
+    match = _city_pattern().search(text.replace("İ", "i").lower())
+    return CITY_TIMEZONES[match.group(1)] if match else None
+
+
+def resolve_timezone(name: Optional[str], default: str) -> ZoneInfo:
+    """IANA adını ZoneInfo'ya çevir; bilinmiyorsa varsayılana düş"""
+    for candidate in (name, default, "UTC"):
+        if not candidate:
+            continue
+        try:
+            return ZoneInfo(candidate.strip())
+        except (ZoneInfoNotFoundError, ValueError):
+            continue
+    raise ZoneInfoNotFoundError("UTC")
+
+
+def format_now(timezone: Optional[str] = None, language: str = "tr",
+               default_timezone: str = "Europe/Istanbul", now: Optional[datetime] = None) -> str:
+    """Şu anki tarih/saati seçilen dilde biçimlendir"""
+    language = language if language in MONTH_NAMES else "tr"
+    zone = resolve_timezone(timezone, default_timezone)
+    current = (now or datetime.now(tz=zone)).astimezone(zone)
+
+    offset = current.strftime("%z")
+    utc_offset = f"UTC{offset[:3]}:{offset[3:]}" if offset else "UTC"
+    labels = LABELS[language]
+
+    return (
+        f"📅 {labels['date']}: {current.day} {MONTH_NAMES[language][current.month - 1]} {current.year}\n"
+        f"🗓️ {labels['day']}: {DAY_NAMES[language][current.weekday()]}\n"
+        f"🕐 {labels['time']}: {current.strftime('%H:%M:%S')}\n"
+        f"📍 {labels['zone']}: {zone.key} ({utc_offset})"
+    )
@@ -0,0 +1,281 @@
+"""
+Merkezi LLM completion yardımcıları ve token muhasebesi.
+Tüm Groq chat.completions çağrıları buradan geçer; her çağrı yeri (site) için
+prompt/completion token sayıları `completion.usage` (stream'de son chunk'ın usage'ı)
+veya LangChain callback'lerinden toplanır. Usage gelmezse tahmini sayı kaydedilir.
+Her çağrı aynı noktada aktif trace'e "llm" span'i ve gecikme/token/hata metrikleri olarak yazılır;
+retry, circuit breaker ve hedging agents.resilience üzerinden uygulanır.
+"""
+
+import threading
+import time
+from collections import defaultdict
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+from agents.memory import estimate_tokens
+from agents.metrics import LLM_ERRORS, LLM_LATENCY, LLM_TOKENS
+from agents.resilience import get_resilience
+from agents.tracing import record_span
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def estimate_messages_tokens(messages: List[Dict[str, Any]]) -> int:
+    """OpenAI formatındaki mesajların tahmini token sayısı (görsel parçalar hariç)"""
+    total = 0
+    for message in messages:
+        content = message.get("content", "")
+        if isinstance(content, list):
+            content = " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+        total += estimate_tokens(str(content))
+    return total
+
+
+class UsageTracker:
+    """Çağrı yeri başına token ve gecikme sayaçları"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites: Dict[str, Dict[str, float]] = defaultdict(lambda: {
+            "calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "estimated_calls": 0, "latency_ms": 0.0,
+        })
+
+    def record(self, site: str, prompt_tokens: int, completion_tokens: int,
+               latency_ms: float = 0.0, estimated: bool = False) -> None:
+        with self._lock:
+            counters = self._sites[site]
+            counters["calls"] += 1
+            counters["prompt_tokens"] += prompt_tokens
+            counters["completion_tokens"] += completion_tokens
+            counters["latency_ms"] += latency_ms
+            if estimated:
+                counters["estimated_calls"] += 1
+        logger.info(
+            f"🧮 Tokens [{site}]: prompt={prompt_tokens} completion={completion_tokens}"
+            f"{' (tahmini)' if estimated else ''} | {latency_ms:.0f} ms"
+        )
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Site başına toplamlar ve ortalamalar"""
+        with self._lock:
+            result = {}
+            for site, counters in self._sites.items():
+                calls = counters["calls"] or 1
+                result[site] = dict(counters)
+                result[site]["avg_prompt_tokens"] = counters["prompt_tokens"] / calls
+                result[site]["avg_latency_ms"] = counters["latency_ms"] / calls
+            return result
+
+    def reset(self) -> None:
+        with self._lock:
+            self._sites.clear()
+
+
+_tracker = UsageTracker()
+
+
+def get_usage_tracker() -> UsageTracker:
+    """Süreç genelindeki token sayacı"""
+    return _tracker
+
+
+def _usage_tokens(usage: Any) -> Optional[Tuple[int, int]]:
+    """usage nesnesinden (prompt, completion) token sayıları"""
+    if usage is None:
+        return None
+    prompt = getattr(usage, "prompt_tokens", None)
+    completion = getattr(usage, "completion_tokens", None)
+    if prompt is None and isinstance(usage, dict):
+        prompt, completion = usage.get("prompt_tokens"), usage.get("completion_tokens")
+    if prompt is None:
+        return None
+    return int(prompt), int(completion or 0)
+
+
+def _chunk_usage(chunk: Any) -> Any:
+    """Stream chunk'ındaki usage (Groq: x_groq.usage, OpenAI uyumlu: usage)"""
+    x_groq = getattr(chunk, "x_groq", None)
+    return getattr(x_groq, "usage", None) or getattr(chunk, "usage", None)
+
+
+def _observe(site: str, model: str, prompt_tokens: int, completion_tokens: int, latency_ms: float,
+             estimated: bool = False, span_name: str = "llm") -> None:
+    """Token sayacı + metrikler + trace span'i"""
+    _tracker.record(site, prompt_tokens, completion_tokens, latency_ms, estimated=estimated)
+    LLM_LATENCY.observe(latency_ms / 1000, site=site, model=model)
+    LLM_TOKENS.inc(prompt_tokens, site=site, model=model, type="prompt")
+    LLM_TOKENS.inc(completion_tokens, site=site, model=model, type="completion")
+    record_span(span_name, latency_ms, site=site, model=model, prompt_tokens=prompt_tokens,
+                completion_tokens=completion_tokens, estimated=estimated)
+
+
+def record_llm_error(site: str, model: str, started: float, error: BaseException,
+                     span_name: str = "llm") -> None:
+    """Başarısız çağrıyı hata sayacına ve trace'e yaz"""
+    LLM_ERRORS.inc(site=site, model=model, error=type(error).__name__)
+    record_span(span_name, (time.perf_counter() - started) * 1000, error=type(error).__name__,
+                site=site, model=model)
+
+
+def _record(site: str, model: str, usage: Any, messages: List[Dict[str, Any]], output: str, started: float) -> None:
+    latency_ms = (time.perf_counter() - started) * 1000
+    tokens = _usage_tokens(usage)
+    if tokens:
+        _observe(site, model, tokens[0], tokens[1], latency_ms)
+    else:
+        _observe(site, model, estimate_messages_tokens(messages), estimate_tokens(output), latency_ms, estimated=True)
+
+
+def _complete_once(client: Any, site: str, kwargs: Dict[str, Any]) -> Any:
+    started = time.perf_counter()
+    model = kwargs.get("model", "")
+    try:
+        completion = client.chat.completions.create(**kwargs)
+    except Exception as e:
+        record_llm_error(site, model, started, e)
+        raise
+    _record(site, model, getattr(completion, "usage", None), kwargs.get("messages", []),
+            completion.choices[0].message.content or "", started)
+    return completion
+
+
+def _stream_once(client: Any, site: str, kwargs: Dict[str, Any]) -> Iterator[str]:
+    started = time.perf_counter()
+    model = kwargs.get("model", "")
+    parts: List[str] = []
+    usage = None
+    stream = None
+    try:
+        stream = client.chat.completions.create(stream=True, **kwargs)
+        for chunk in stream:
+            usage = _chunk_usage(chunk) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        record_llm_error(site, model, started, e)
+        raise
+    finally:
+        # Erken bırakılan (ör. hedge'i kaybeden) stream'in bağlantısını havuza geri ver
+        if stream is not None and hasattr(stream, "close"):
+            stream.close()
+    _record(site, model, usage, kwargs.get("messages", []), "".join(parts), started)
+
+
+async def _acomplete_once(client: Any, site: str, kwargs: Dict[str, Any]) -> Any:
+    started = time.perf_counter()
+    model = kwargs.get("model", "")
+    try:
+        completion = await client.chat.completions.create(**kwargs)
+    except Exception as e:
+        record_llm_error(site, model, started, e)
+        raise
+    _record(site, model, getattr(completion, "usage", None), kwargs.get("messages", []),
+            completion.choices[0].message.content or "", started)
+    return completion
+
+
+async def _astream_once(client: Any, site: str, kwargs: Dict[str, Any]) -> AsyncIterator[str]:
+    started = time.perf_counter()
+    model = kwargs.get("model", "")
+    parts: List[str] = []
+    usage = None
+    stream = None
+    try:
+        stream = await client.chat.completions.create(stream=True, **kwargs)
+        async for chunk in stream:
+            usage = _chunk_usage(chunk) or usage
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        record_llm_error(site, model, started, e)
+        raise
+    finally:
+        if stream is not None and hasattr(stream, "close"):
+            await stream.close()
+    _record(site, model, usage, kwargs.get("messages", []), "".join(parts), started)
+
+
+def complete(client: Any, site: str, **kwargs: Any) -> Any:
+    """Tek seferlik completion (retry/circuit/hedge ile); usage'ı kaydeder ve completion nesnesini döndürür"""
+    return get_resilience().call(
+        site, kwargs.get("model", ""), lambda model: _complete_once(client, site, {**kwargs, "model": model}))
+
+
+def stream_complete(client: Any, site: str, **kwargs: Any) -> Iterator[str]:
+    """Stream completion'ın metin parçaları; ilk parçaya kadar retry/hedge, bittiğinde usage kaydı"""
+    return get_resilience().stream(
+        site, kwargs.get("model", ""), lambda model: _stream_once(client, site, {**kwargs, "model": model}))
+
+
+async def acomplete(client: Any, site: str, **kwargs: Any) -> Any:
+    """complete'in async karşılığı"""
+    return await get_resilience().acall(
+        site, kwargs.get("model", ""), lambda model: _acomplete_once(client, site, {**kwargs, "model": model}))
+
+
+def astream_complete(client: Any, site: str, **kwargs: Any) -> AsyncIterator[str]:
+    """stream_complete'in async karşılığı"""
+    return get_resilience().astream(
+        site, kwargs.get("model", ""), lambda model: _astream_once(client, site, {**kwargs, "model": model}))
+
+
+def record_gemini_usage(site: str, usage_metadata: Dict[str, Any], request: Dict[str, Any],
+                        output: str, started: float, model: str = "") -> None:
+    """Gemini usageMetadata'sını (yoksa tahmini sayıyı) "gemini_http" span'i olarak kaydet"""
+    latency_ms = (time.perf_counter() - started) * 1000
+    if usage_metadata.get("promptTokenCount") is not None:
+        _observe(site, model, int(usage_metadata["promptTokenCount"]),
+                 int(usage_metadata.get("candidatesTokenCount", 0)), latency_ms, span_name="gemini_http")
+        return
+    texts = [part.get("text", "") for content in request.get("contents", []) for part in content.get("parts", [])]
+    _observe(site, model, estimate_tokens(" ".join(texts)), estimate_tokens(output), latency_ms,
+             estimated=True, span_name="gemini_http")
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """LangChain agent'ının her LLM turu için token sayılarını kaydeder"""
+
+    run_inline = True
+
+    def __init__(self, site: str = "agent"):
+        self.site = site
+        self._started: Dict[UUID, Tuple[float, int, str]] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], *,
+                            run_id: UUID, **kwargs: Any) -> None:
+        prompt = sum(estimate_tokens(str(msg.content)) for batch in messages for msg in batch)
+        # ChatGroq model adını invocation_params'ta değil, ls_* metadata'sında verir
+        params = kwargs.get("invocation_params") or {}
+        model = ((kwargs.get("metadata") or {}).get("ls_model_name")
+                 or params.get("model_name") or params.get("model") or "")
+        self._started[run_id] = (time.perf_counter(), prompt, model)
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started, estimated_prompt, model = self._started.pop(run_id, (time.perf_counter(), 0, ""))
+        get_resilience().record_outcome(model)
+        latency_ms = (time.perf_counter() - started) * 1000
+        generation = response.generations[0][0] if response.generations and response.generations[0] else None
+        usage_metadata = getattr(getattr(generation, "message", None), "usage_metadata", None)
+        if usage_metadata:
+            _observe(self.site, model, usage_metadata.get("input_tokens", 0),
+                     usage_metadata.get("output_tokens", 0), latency_ms)
+            return
+        tokens = _usage_tokens((response.llm_output or {}).get("token_usage"))
+        if tokens:
+            _observe(self.site, model, tokens[0], tokens[1], latency_ms)
+            return
+        text = generation.text if generation else ""
+        _observe(self.site, model, estimated_prompt, estimate_tokens(text), latency_ms, estimated=True)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        started, _, model = self._started.pop(run_id, (time.perf_counter(), 0, ""))
+        get_resilience().record_outcome(model, error)
+        record_llm_error(self.site, model, started, error)
@@ -0,0 +1,330 @@
+"""
+Kalıcı, yalnızca ekleme yapılan (append-only) konuşma deposu.
+Her mesaj gerçek zaman damgası ve tahmini token sayısıyla oturum içi sıra numarasıyla (seq) yazılır;
+oturum tablosu mesaj sayısını ve hafıza özetini tutar. Okumalar sayfa/aralık bazlıdır:
+(session_id, seq) ve (session_id, created_at) indeksleri sayesinde maliyet geçmişin değil sayfanın boyutuyla
+orantılıdır. Temizleme mesaj silmez, oturumun görünür başlangıcını (start_seq) ileri alır.
+
+Varsayılan backend SQLite (WAL: aynı makinedeki birden çok süreç aynı dosyayı paylaşabilir);
+"memory" backend'i testler ve diskin istenmediği kurulumlar içindir. Yeni backend ConversationStore'un
+tüm soyut metotlarını uygulayıp `STORE_BACKENDS`'e eklenerek seçilebilir.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROLE_HUMAN, ROLE_ASSISTANT = "human", "assistant"
+
+
+class StoredMessage:
+    """Depodaki tek mesaj"""
+
+    __slots__ = ("session_id", "seq", "role", "content", "tokens", "created_at")
+
+    def __init__(self, session_id: str, seq: int, role: str, content: str, tokens: int, created_at: float):
+        self.session_id = session_id
+        self.seq = seq
+        self.role = role
+        self.content = content
+        self.tokens = tokens
+        self.created_at = created_at
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "seq": self.seq,
+            "role": self.role,
+            "content": self.content,
+            "tokens": self.tokens,
+            "timestamp": datetime.fromtimestamp(self.created_at).isoformat(),
+        }
+
+
+class ConversationStore(ABC):
+    """Konuşma deposu arayüzü; seq oturum içinde 0'dan başlar, görünür mesajlar start_seq'ten itibarendir"""
+
+    @abstractmethod
+    def append(self, session_id: str, messages: List[Tuple[str, str, int]],
+               created_at: Optional[float] = None) -> int:
+        """(rol, içerik, token) mesajlarını tek işlemde ekle; ilk mesajın seq'ini döndür"""
+
+    @abstractmethod
+    def count(self, session_id: str) -> int:
+        """Oturumun görünür mesaj sayısı (O(1))"""
+
+    @abstractmethod
+    def page(self, session_id: str, offset: int = 0, limit: int = 50) -> List[StoredMessage]:
+        """Görünür mesajların [offset, offset+limit) aralığı, eskiden yeniye"""
+
+    @abstractmethod
+    def time_range(self, session_id: str, since: Optional[float] = None, until: Optional[float] = None,
+                   limit: int = 50) -> List[StoredMessage]:
+        """[since, until) zaman aralığındaki ilk `limit` görünür mesaj"""
+
+    @abstractmethod
+    def tail(self, session_id: str, token_budget: int, after_seq: int = 0, max_messages: int = 200,
+             min_messages: int = 2) -> List[StoredMessage]:
+        """`after_seq`'ten sonraki en yeni mesajlar (token bütçesi dolana kadar, en az `min_messages`), eskiden yeniye"""
+
+    @abstractmethod
+    def save_summary(self, session_id: str, summary: str, through_seq: int) -> None:
+        """Hafıza özetini ve kapsadığı son seq'i (hariç) kaydet"""
+
+    @abstractmethod
+    def load_summary(self, session_id: str) -> Tuple[str, int]:
+        """(özet, kapsadığı seq sınırı); yoksa ("", görünür başlangıç)"""
+
+    @abstractmethod
+    def clear(self, session_id: str) -> None:
+        """Oturumu boş göster (mesajlar silinmez)"""
+
+    def close(self) -> None:
+        pass
+
+
+class SQLiteConversationStore(ConversationStore):
+    """WAL modunda SQLite deposu; tek bağlantı + kilit (ResponseCache ile aynı düzen)"""
+
+    def __init__(self, db_path: str):
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(db_path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        # Başka süreç yazarken kilit için bekle
+        self._conn.execute("PRAGMA busy_timeout=5000")
+        self._conn.executescript(
+            "CREATE TABLE IF NOT EXISTS sessions ("
+            " session_id TEXT PRIMARY KEY,"
+            " message_count INTEGER NOT NULL DEFAULT 0,"
+            " start_seq INTEGER NOT NULL DEFAULT 0,"
+            " summary TEXT NOT NULL DEFAULT '',"
+            " summary_seq INTEGER NOT NULL DEFAULT 0,"
+            " updated_at REAL NOT NULL);"
+            "CREATE TABLE IF NOT EXISTS messages ("
+            " session_id TEXT NOT NULL,"
+            " seq INTEGER NOT NULL,"
+            " role TEXT NOT NULL,"
+            " content TEXT NOT NULL,"
+            " tokens INTEGER NOT NULL,"
+            " created_at REAL NOT NULL,"
+            " PRIMARY KEY (session_id, seq)) WITHOUT ROWID;"
+            "CREATE INDEX IF NOT EXISTS idx_messages_session_time ON messages(session_id, created_at);"
+        )
+        self.path = db_path
+
+    def _session_row(self, session_id: str) -> Tuple[int, int, str, int]:
+        row = self._conn.execute(
+            "SELECT message_count, start_seq, summary, summary_seq FROM sessions WHERE session_id = ?",
+            (session_id,)
+        ).fetchone()
+        return row if row is not None else (0, 0, "", 0)
+
+    def append(self, session_id: str, messages: List[Tuple[str, str, int]],
+               created_at: Optional[float] = None) -> int:
+        created_at = time.time() if created_at is None else created_at
+        with self._lock:
+            # IMMEDIATE: seq ataması diğer süreçlerin eklemeleriyle çakışmasın
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                first = self._session_row(session_id)[0]
+                self._conn.executemany(
+                    "INSERT INTO messages (session_id, seq, role, content, tokens, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                    [(session_id, first + index, role, content, tokens, created_at)
+                     for index, (role, content, tokens) in enumerate(messages)]
+                )
+                self._conn.execute(
+                    "INSERT INTO sessions (session_id, message_count, updated_at) VALUES (?, ?, ?)"
+                    " ON CONFLICT(session_id) DO UPDATE SET message_count = excluded.message_count,"
+                    " updated_at = excluded.updated_at",
+                    (session_id, first + len(messages), created_at)
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return first
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            message_count, start_seq, _, _ = self._session_row(session_id)
+        return message_count - start_seq
+
+    def _rows(self, sql: str, params: Tuple[Any, ...], session_id: str) -> List[StoredMessage]:
+        return [StoredMessage(session_id, *row) for row in self._conn.execute(sql, params).fetchall()]
+
+    def page(self, session_id: str, offset: int = 0, limit: int = 50) -> List[StoredMessage]:
+        with self._lock:
+            start_seq = self._session_row(session_id)[1]
+            first = start_seq + max(0, offset)
+            return self._rows(
+                "SELECT seq, role, content, tokens, created_at FROM messages"
+                " WHERE session_id = ? AND seq >= ? AND seq < ? ORDER BY seq",
+                (session_id, first, first + limit), session_id
+            )
+
+    def time_range(self, session_id: str, since: Optional[float] = None, until: Optional[float] = None,
+                   limit: int = 50) -> List[StoredMessage]:
+        with self._lock:
+            start_seq = self._session_row(session_id)[1]
+            return self._rows(
+                "SELECT seq, role, content, tokens, created_at FROM messages"
+                " WHERE session_id = ? AND created_at >= ? AND created_at < ? AND seq >= ?"
+                " ORDER BY created_at, seq LIMIT ?",
+                (session_id, since if since is not None else float("-inf"),
+                 until if until is not None else float("inf"), start_seq, limit), session_id
+            )
+
+    def tail(self, session_id: str, token_budget: int, after_seq: int = 0, max_messages: int = 200,
+             min_messages: int = 2) -> List[StoredMessage]:
+        with self._lock:
+            start_seq = self._session_row(session_id)[1]
+            cursor = self._conn.execute(
+                "SELECT seq, role, content, tokens, created_at FROM messages"
+                " WHERE session_id = ? AND seq >= ? ORDER BY seq DESC LIMIT ?",
+                (session_id, max(start_seq, after_seq), max_messages)
+            )
+            window: List[StoredMessage] = []
+            used = 0
+            # Satırlar yeniden eskiye okunur; bütçe dolunca imleç bırakılır
+            for row in cursor:
+                message = StoredMessage(session_id, *row)
+                if len(window) >= min_messages and used + message.tokens > token_budget:
+                    break
+                window.append(message)
+                used += message.tokens
+            cursor.close()
+        window.reverse()
+        return window
+
+    def save_summary(self, session_id: str, summary: str, through_seq: int) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, summary, summary_seq, updated_at) VALUES (?, ?, ?, ?)"
+                " ON CONFLICT(session_id) DO UPDATE SET summary = excluded.summary,"
+                " summary_seq = excluded.summary_seq, updated_at = excluded.updated_at",
+                (session_id, summary, through_seq, time.time())
+            )
+
+    def load_summary(self, session_id: str) -> Tuple[str, int]:
+        with self._lock:
+            _, start_seq, summary, summary_seq = self._session_row(session_id)
+        return summary, max(start_seq, summary_seq)
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO sessions (session_id, updated_at) VALUES (?, ?)"
+                " ON CONFLICT(session_id) DO UPDATE SET start_seq = message_count, summary = '',"
+                " summary_seq = message_count, updated_at = excluded.updated_at",
+                (session_id, time.time())
+            )
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class InMemoryConversationStore(ConversationStore):
+    """Süreç içi depo (yeniden başlatmada kaybolur); aynı arayüz"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._messages: Dict[str, List[StoredMessage]] = {}
+        self._sessions: Dict[str, List[Any]] = {}  # [start_seq, summary, summary_seq]
+
+    def _state(self, session_id: str) -> List[Any]:
+        return self._sessions.setdefault(session_id, [0, "", 0])
+
+    def append(self, session_id: str, messages: List[Tuple[str, str, int]],
+               created_at: Optional[float] = None) -> int:
+        created_at = time.time() if created_at is None else created_at
+        with self._lock:
+            stored = self._messages.setdefault(session_id, [])
+            first = len(stored)
+            stored.extend(StoredMessage(session_id, first + index, role, content, tokens, created_at)
+                          for index, (role, content, tokens) in enumerate(messages))
+            self._state(session_id)
+        return first
+
+    def count(self, session_id: str) -> int:
+        with self._lock:
+            return len(self._messages.get(session_id, [])) - self._state(session_id)[0]
+
+    def page(self, session_id: str, offset: int = 0, limit: int = 50) -> List[StoredMessage]:
+        with self._lock:
+            first = self._state(session_id)[0] + max(0, offset)
+            return self._messages.get(session_id, [])[first:first + limit]
+
+    def time_range(self, session_id: str, since: Optional[float] = None, until: Optional[float] = None,
+                   limit: int = 50) -> List[StoredMessage]:
+        with self._lock:
+            start_seq = self._state(session_id)[0]
+            matches = [
+                message for message in self._messages.get(session_id, [])[start_seq:]
+                if (since is None or message.created_at >= since) and (until is None or message.created_at < until)
+            ]
+        return matches[:limit]
+
+    def tail(self, session_id: str, token_budget: int, after_seq: int = 0, max_messages: int = 200,
+             min_messages: int = 2) -> List[StoredMessage]:
+        with self._lock:
+            first = max(self._state(session_id)[0], after_seq)
+            candidates = self._messages.get(session_id, [])[first:][-max_messages:]
+        window: List[StoredMessage] = []
+        used = 0
+        for message in reversed(candidates):
+            if len(window) >= min_messages and used + message.tokens > token_budget:
+                break
+            window.append(message)
+            used += message.tokens
+        window.reverse()
+        return window
+
+    def save_summary(self, session_id: str, summary: str, through_seq: int) -> None:
+        with self._lock:
+            state = self._state(session_id)
+            state[1], state[2] = summary, through_seq
+
+    def load_summary(self, session_id: str) -> Tuple[str, int]:
+        with self._lock:
+            start_seq, summary, summary_seq = self._state(session_id)
+        return summary, max(start_seq, summary_seq)
+
+    def clear(self, session_id: str) -> None:
+        with self._lock:
+            count = len(self._messages.get(session_id, []))
+            self._sessions[session_id] = [count, "", count]
+
+
+STORE_BACKENDS: Dict[str, Callable[[str], ConversationStore]] = {
+    "sqlite": SQLiteConversationStore,
+    "memory": lambda path: InMemoryConversationStore(),
+}
+
+
+def create_conversation_store(backend: str, path: str) -> Optional[ConversationStore]:
+    """Ayardaki backend'i kur; "none" veya açılamazsa None (yalnızca süreç içi hafıza)"""
+    if backend == "none":
+        return None
+    factory = STORE_BACKENDS.get(backend)
+    if factory is None:
+        logger.warning(f"⚠️ Bilinmeyen konuşma deposu: {backend}, kalıcı geçmiş kapalı")
+        return None
+    try:
+        store = factory(path)
+    except (OSError, sqlite3.Error) as e:
+        logger.warning(f"⚠️ Konuşma deposu açılamadı, geçmiş yalnızca bellekte tutulacak: {str(e)}")
+        return None
+    logger.info(f"🗄️ Konuşma deposu: {backend}" + (f" ({path})" if backend == "sqlite" else ""))
+    return store
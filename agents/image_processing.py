@@ -0,0 +1,179 @@
+"""
+Vision istekleri için hızlı görsel ön işleme.
+JPEG draft-mode decode, Image.reduce ile kaba küçültme + son LANCZOS resample,
+EXIF yönü, RGBA→RGB ve hedef byte bütçesine göre boyut/kalite seçimi.
+İşler sınırlı bir thread havuzunda çalışır; Pillow decode/resize sırasında GIL'i bırakır.
+"""
+
+import base64
+import hashlib
+import io
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Optional
+
+from PIL import Image, ImageOps
+
+from agents.tracing import propagate, record_span
+from config.settings import get_settings
+
+# Bütçe aşılırsa kalite bu adımlarla düşürülür, sonra boyut küçültülür
+QUALITY_STEP = 10
+DOWNSCALE_FACTOR = 0.75
+MIN_SIDE = 256
+# İçerik hash'i bu sabit boyuttaki piksellerden alınır; encode ayarlarından bağımsızdır
+HASH_SIDE = 256
+
+
+class PreparedImage:
+    """Vision API'ye gönderilmeye hazır JPEG"""
+
+    def __init__(self, data: bytes, width: int, height: int, quality: int, elapsed_ms: float,
+                 pixel_hash: str = "", phash: int = 0):
+        self.data = data
+        self.width = width
+        self.height = height
+        self.quality = quality
+        self.elapsed_ms = elapsed_ms
+        self.pixel_hash = pixel_hash  # normalize piksellerin SHA-256'sı (içerik adresi)
+        self.phash = phash  # 64-bit algısal hash (yeniden sıkıştırılmış kopyalar için)
+        self.mime_type = "image/jpeg"
+
+    @property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("utf-8")
+
+    @property
+    def size_bytes(self) -> int:
+        return len(self.data)
+
+    def __repr__(self) -> str:
+        return (f"PreparedImage({self.width}x{self.height}, q={self.quality}, "
+                f"{self.size_bytes} bytes, {self.elapsed_ms:.1f} ms)")
+
+
+def _open(source: Any) -> Image.Image:
+    """PIL görseli, dosya yolu, bytes veya Gradio dosya objesi kabul et"""
+    if isinstance(source, Image.Image):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return Image.open(io.BytesIO(source))
+    if hasattr(source, "name") and not isinstance(source, str):  # Gradio file objesi
+        return Image.open(source.name)
+    if isinstance(source, (str, os.PathLike)):
+        return Image.open(source)
+    raise TypeError(f"Desteklenmeyen görsel tipi: {type(source).__name__}")
+
+
+def _to_rgb(img: Image.Image) -> Image.Image:
+    """Şeffaflığı beyaz zemine bindirerek RGB'ye çevir"""
+    if img.mode == "RGB":
+        return img
+    if img.mode in ("RGBA", "LA") or (img.mode == "P" and "transparency" in img.info):
+        rgba = img.convert("RGBA")
+        background = Image.new("RGB", rgba.size, (255, 255, 255))
+        background.paste(rgba, mask=rgba.getchannel("A"))
+        return background
+    return img.convert("RGB")
+
+
+def _fit(img: Image.Image, max_side: int) -> Image.Image:
+    """Önce tamsayı reduce (ucuz), sonra hedef boyuta LANCZOS"""
+    longest = max(img.size)
+    if longest <= max_side:
+        return img
+    factor = longest // max_side
+    if factor >= 2:
+        img = img.reduce(factor)
+    if max(img.size) > max_side:
+        img.thumbnail((max_side, max_side), Image.Resampling.LANCZOS)
+    return img
+
+
+def pixel_hash(img: Image.Image) -> str:
+    """Normalize (RGB, sabit boyut) piksellerin SHA-256'sı"""
+    normalized = img.copy()
+    normalized.thumbnail((HASH_SIDE, HASH_SIDE), Image.Resampling.BILINEAR)
+    digest = hashlib.sha256(f"{normalized.width}x{normalized.height}".encode("ascii"))
+    digest.update(normalized.tobytes())
+    return digest.hexdigest()
+
+
+def perceptual_hash(img: Image.Image) -> int:
+    """64-bit difference hash (dHash): yeniden sıkıştırma ve küçük ölçeklemeye dayanıklı"""
+    small = img.convert("L").resize((9, 8), Image.Resampling.BILINEAR)
+    pixels = small.tobytes()
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            value = (value << 1) | (pixels[row * 9 + col] > pixels[row * 9 + col + 1])
+    return value
+
+
+def _encode(img: Image.Image, quality: int) -> bytes:
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=quality)
+    return buffer.getvalue()
+
+
+def prepare_image(source: Any, max_side: Optional[int] = None, byte_budget: Optional[int] = None,
+                  max_quality: Optional[int] = None, min_quality: Optional[int] = None) -> PreparedImage:
+    """Görseli decode et, küçült ve bütçeye sığan en yüksek kaliteyle JPEG'e çevir"""
+    started = time.perf_counter()
+    settings = get_settings()
+    max_side = max_side or settings.vision_max_side
+    byte_budget = byte_budget or settings.vision_byte_budget
+    max_quality = max_quality or settings.vision_max_quality
+    min_quality = min_quality or settings.vision_min_quality
+
+    img = _open(source)
+    # JPEG'lerde decoder doğrudan 1/2, 1/4, 1/8 ölçekte açar
+    if img.format == "JPEG" and max(img.size) > max_side:
+        img.draft("RGB", (max_side, max_side))
+    img = ImageOps.exif_transpose(img)
+    img = _fit(_to_rgb(img), max_side)
+    content_hash = pixel_hash(img)
+    phash = perceptual_hash(img)
+
+    quality = max_quality
+    data = _encode(img, quality)
+    while len(data) > byte_budget:
+        if quality - QUALITY_STEP >= min_quality:
+            quality -= QUALITY_STEP
+        else:
+            side = int(max(img.size) * DOWNSCALE_FACTOR)
+            if side < MIN_SIDE:
+                break
+            img = img.resize(
+                (max(1, int(img.width * DOWNSCALE_FACTOR)), max(1, int(img.height * DOWNSCALE_FACTOR))),
+                Image.Resampling.LANCZOS
+            )
+        data = _encode(img, quality)
+
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    record_span("image_prepare", elapsed_ms, width=img.width, height=img.height, quality=quality, bytes=len(data))
+    return PreparedImage(data, img.width, img.height, quality, elapsed_ms,
+                         pixel_hash=content_hash, phash=phash)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Ön işleme için sınırlı thread havuzu"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=get_settings().image_workers,
+                thread_name_prefix="image-prep"
+            )
+        return _executor
+
+
+def prepare_image_async(source: Any, **kwargs: Any) -> "Future[PreparedImage]":
+    """prepare_image'i havuzda (çağıranın trace context'iyle) çalıştır"""
+    return get_executor().submit(propagate(prepare_image), source, **kwargs)
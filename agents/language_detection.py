@@ -0,0 +1,246 @@
+"""
+Yerel karakter n-gram dil tespiti (Türkçe, İngilizce, Fransızca, Almanca).
+Profiller ilk kullanımda bir kez çıkarılır ve kompakt array'ler olarak tutulur;
+tespit mikro saniyeler sürer ve ağ çağrısı yapmaz.
+"""
+
+import math
+import re
+from array import array
+from collections import Counter
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+
+LANGUAGE_NAMES = {
+    "tr": "Türkçe",
+    "en": "English",
+    "fr": "Français",
+    "de": "Deutsch",
+}
+
+# Profillerin çıkarıldığı örnek metinler
+SEED_CORPORA = {
+    "tr": """
+Merhaba, bugün nasılsın? Ben iyiyim, teşekkür ederim. Bu akşam arkadaşlarımla birlikte
+yemeğe çıkacağız ve sonra sinemaya gideceğiz. İstanbul'da hava çok güzel, güneş parlıyor
+ama rüzgâr biraz serin. Çocuklar okuldan döndükten sonra parkta oynamayı seviyorlar.
+Türkiye'nin en kalabalık şehri olan İstanbul, iki kıtayı birbirine bağlayan eşsiz bir
+konuma sahiptir. Bu metni analiz etmek ve özetlemek istiyorum, bana yardımcı olur musun?
+Saat kaç, bugün hangi gün? Yarın sabah erkenden toplantımız var, lütfen unutma.
+Kitap okumak insanın hayal gücünü geliştirir ve kelime dağarcığını zenginleştirir.
+Öğretmenimiz derste yapay zekâ ve makine öğrenmesi hakkında ilginç şeyler anlattı.
+Geçen hafta ailemle birlikte köye gittik; dedemin bahçesindeki ağaçlardan elma topladık.
+Bilgisayarım çok yavaş çalışıyor, sanırım yeni bir tane almam gerekiyor. Ne düşünüyorsun?
+Şirketimiz bu yıl yeni ürünler geliştirdi ve müşterilerden olumlu geri dönüşler aldı.
+Bu konuda daha fazla bilgi verebilir misin? Çok teşekkürler, görüşmek üzere.
+Değerli müşterimiz, siparişiniz kargoya verilmiştir ve en geç üç gün içinde adresinize
+teslim edilecektir. Herhangi bir sorunuz olursa bizimle iletişime geçebilirsiniz.
+Merhaba! Selam, günaydın, iyi akşamlar, iyi geceler. Evet, hayır, tamam, peki, olur.
+Sağ ol, teşekkürler, rica ederim, kolay gelsin, hoşça kal. Nasılsın, ne haber, naber?
+Bu kodda hata nerede? Fonksiyon neden yanlış değer döndürüyor, açıklar mısın? Sunucu
+yeniden başlatıldıktan sonra uygulama çöküyor; günlük kayıtlarında bağlantı zaman aşımı
+görünüyor. Veritabanı sorgusunu nasıl hızlandırabilirim, indeks eklemem gerekir mi?
+Kubernetes üzerinde çalışan servisimiz sürekli yeniden başlıyor, sebebini bulmamıza
+yardım eder misin? Bu hatayı çözmek için hangi adımları izlemeliyim? Kodu gözden geçirip
+daha okunabilir hâle getirebilir misin? Yazılım geliştirme sürecinde test yazmak önemlidir.
+""",
+    "en": """
+Hello, how are you today? I am fine, thank you very much. This evening we are going out
+for dinner with some friends and then we will go to the cinema. The weather in London is
+quite nice, the sun is shining but the wind is a little cold. The children like to play in
+the park after they come back from school. New York is one of the largest cities in the
+world and it attracts millions of visitors every year. I would like to analyze and
+summarize this text, could you help me with that? What time is it and what day is today?
+We have a meeting early tomorrow morning, please do not forget about it. Reading books
+improves the imagination and enriches the vocabulary of people of all ages. Our teacher
+told us interesting things about artificial intelligence and machine learning in class.
+Last week I visited my family in the countryside and we picked apples from the trees in
+my grandfather's garden. My computer is running very slowly, I think I need to buy a new
+one. What do you think? Our company developed new products this year and received
+positive feedback from customers. Could you give me more information about this topic?
+Thanks a lot, see you soon. Your order has been shipped and should arrive within three days.
+Hello! Hi there, good morning, good evening, good night. Yes, no, sure, please, sorry.
+Thanks, thank you, you're welcome, goodbye, see you later. How are you, what's up?
+Where is the bug in this code? Why does the function return the wrong value? The server
+keeps crashing after the deploy and the logs show a connection timeout. How can I speed up
+this database query, should I add an index? Our service running on Kubernetes is stuck in a
+restart loop, can you help me debug the pod? The API endpoint returns a 500 error when the
+request body is empty. Explain the difference between git rebase and merge. Write a unit test
+for this class and refactor the method to make it more readable. The build failed because a
+dependency is missing. Check the config file, the environment variables and the network
+settings, then run the script again and compare the output with the expected result.
+Every endpoint returns JSON; when the token expires the request returns an error response.
+Update the package, restart the worker and open a pull request with the fix and the tests.
+""",
+    "fr": """
+Bonjour, comment allez-vous aujourd'hui? Je vais bien, merci beaucoup. Ce soir nous allons
+dîner avec des amis et ensuite nous irons au cinéma. Le temps à Paris est très agréable,
+le soleil brille mais le vent est un peu frais. Les enfants aiment jouer dans le parc
+après l'école. Paris est l'une des plus belles villes du monde et elle attire des
+millions de visiteurs chaque année. Je voudrais analyser et résumer ce texte, pouvez-vous
+m'aider? Quelle heure est-il et quel jour sommes-nous aujourd'hui? Nous avons une réunion
+demain matin de bonne heure, s'il vous plaît ne l'oubliez pas. La lecture des livres
+développe l'imagination et enrichit le vocabulaire des gens de tous les âges. Notre
+professeur nous a raconté des choses intéressantes sur l'intelligence artificielle et
+l'apprentissage automatique. La semaine dernière, j'ai rendu visite à ma famille à la
+campagne et nous avons cueilli des pommes dans le jardin de mon grand-père. Mon
+ordinateur est très lent, je pense que je dois en acheter un nouveau. Qu'en pensez-vous?
+Notre entreprise a développé de nouveaux produits cette année et a reçu des retours
+positifs de la part des clients. Merci beaucoup, à bientôt. Votre commande a été expédiée.
+Bonjour! Salut, bonsoir, bonne nuit. Oui, non, d'accord, s'il te plaît, pardon.
+Merci, merci beaucoup, de rien, au revoir, à plus tard. Comment ça va, quoi de neuf?
+Où est l'erreur dans ce code? Pourquoi la fonction renvoie-t-elle une mauvaise valeur? Le
+serveur plante après le déploiement et les journaux indiquent un délai de connexion dépassé.
+Comment accélérer cette requête sur la base de données, faut-il ajouter un index? Notre
+service tourne en boucle de redémarrage, pouvez-vous m'aider à trouver la cause? Comment
+configurer le serveur comme proxy inverse? Écrivez un test unitaire pour cette classe.
+""",
+    "de": """
+Hallo, wie geht es Ihnen heute? Mir geht es gut, vielen Dank. Heute Abend gehen wir mit
+Freunden essen und danach gehen wir ins Kino. Das Wetter in Berlin ist ziemlich schön,
+die Sonne scheint, aber der Wind ist ein bisschen kühl. Die Kinder spielen gern im Park,
+nachdem sie aus der Schule zurückgekommen sind. München ist eine der schönsten Städte
+Deutschlands und zieht jedes Jahr Millionen von Besuchern an. Ich möchte diesen Text
+analysieren und zusammenfassen, können Sie mir dabei helfen? Wie spät ist es und welcher
+Tag ist heute? Wir haben morgen früh eine Besprechung, bitte vergessen Sie das nicht.
+Das Lesen von Büchern fördert die Vorstellungskraft und erweitert den Wortschatz von
+Menschen jeden Alters. Unser Lehrer hat uns im Unterricht interessante Dinge über
+künstliche Intelligenz und maschinelles Lernen erzählt. Letzte Woche habe ich meine
+Familie auf dem Land besucht und wir haben Äpfel im Garten meines Großvaters gepflückt.
+Mein Computer läuft sehr langsam, ich glaube, ich muss einen neuen kaufen. Was denken Sie?
+Unser Unternehmen hat dieses Jahr neue Produkte entwickelt und positive Rückmeldungen
+von Kunden erhalten. Vielen Dank, bis bald. Ihre Bestellung wurde bereits verschickt.
+Hallo! Guten Morgen, guten Abend, gute Nacht. Ja, nein, genau, bitte, Entschuldigung.
+Danke, danke schön, gern geschehen, tschüss, bis später. Wie geht's, was gibt's Neues?
+Wo ist der Fehler in diesem Code? Warum gibt die Funktion einen falschen Wert zurück? Der
+Server stürzt nach dem Deployment ab und die Protokolle zeigen eine Zeitüberschreitung der
+Verbindung. Wie kann ich diese Datenbankabfrage beschleunigen, sollte ich einen Index
+hinzufügen? Unser Dienst startet ständig neu, können Sie mir helfen, die Ursache zu finden?
+Wie richte ich den Server als Reverse Proxy ein? Schreiben Sie einen Unit-Test für diese Klasse.
+""",
+}
+
+MAX_NGRAM = 3
+# Naive Bayes log-olabilirlikleri aşırı emin olur; softmax öncesi bu sıcaklıkla yumuşatılır
+CONFIDENCE_TEMPERATURE = 4.0
+# Bundan az harfli girdilerde ("ok", "?!", "5") dil kanıtı yok; güven 0 döner ve çağıran önceki dili korur
+MIN_DETECT_LETTERS = 4
+
+_WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+_SEGMENT_RE = re.compile(r"[^.!?…\n]+[.!?…]*")
+
+
+def _normalize(text: str) -> str:
+    """Küçük harf; Türkçe İ harfi tek karakterli i'ye çevrilir"""
+    return text.replace("İ", "i").lower()
+
+
+def extract_ngrams(text: str, max_n: int = MAX_NGRAM) -> Counter:
+    """Kelime sınırları boşlukla işaretlenmiş 1..max_n karakter n-gram'ları"""
+    grams: Counter = Counter()
+    for word in _WORD_RE.findall(_normalize(text)):
+        padded = f" {word} "
+        length = len(padded)
+        for n in range(1, max_n + 1):
+            for i in range(length - n + 1):
+                gram = padded[i:i + n]
+                if gram != " ":
+                    grams[gram] += 1
+    return grams
+
+
+class LanguageDetector:
+    """Naive Bayes karakter n-gram sınıflandırıcı"""
+
+    def __init__(self, corpora: Dict[str, str] = SEED_CORPORA, max_n: int = MAX_NGRAM):
+        self.max_n = max_n
+        self.languages: Tuple[str, ...] = tuple(corpora)
+        profiles = {lang: extract_ngrams(text, max_n) for lang, text in corpora.items()}
+
+        # Ortak sözlük: n-gram -> indeks; her dil için log-olasılık array'i
+        self.vocabulary: Dict[str, int] = {}
+        for profile in profiles.values():
+            for gram in profile:
+                self.vocabulary.setdefault(gram, len(self.vocabulary))
+
+        vocab_size = len(self.vocabulary)
+        self.log_probs: Dict[str, array] = {}
+        self.unseen_log_prob: Dict[str, float] = {}
+        for lang, profile in profiles.items():
+            total = sum(profile.values()) + vocab_size  # add-one smoothing
+            weights = array("f", [math.log(1 / total)]) * vocab_size
+            for gram, count in profile.items():
+                weights[self.vocabulary[gram]] = math.log((count + 1) / total)
+            self.log_probs[lang] = weights
+            self.unseen_log_prob[lang] = math.log(1 / (total + vocab_size))
+
+    def scores(self, text: str) -> Dict[str, float]:
+        """Her dil için olasılık (toplamı 1)"""
+        grams = extract_ngrams(text, self.max_n)
+        feature_count = sum(grams.values())
+        if not feature_count:
+            uniform = 1 / len(self.languages)
+            return {lang: uniform for lang in self.languages}
+
+        indexed = [(self.vocabulary.get(gram), count) for gram, count in grams.items()]
+        log_likelihoods = {}
+        for lang in self.languages:
+            weights = self.log_probs[lang]
+            unseen = self.unseen_log_prob[lang]
+            total = 0.0
+            for index, count in indexed:
+                total += count * (weights[index] if index is not None else unseen)
+            log_likelihoods[lang] = total
+
+        # Kısa metinlerde fark küçük kalır, dolayısıyla güven de düşük olur
+        best = max(log_likelihoods.values())
+        exps = {
+            lang: math.exp((value - best) / CONFIDENCE_TEMPERATURE)
+            for lang, value in log_likelihoods.items()
+        }
+        norm = sum(exps.values())
+        return {lang: value / norm for lang, value in exps.items()}
+
+    def detect(self, text: str) -> Tuple[str, float]:
+        """En olası dil ve güven skoru"""
+        scores = self.scores(text)
+        lang = max(scores, key=scores.get)
+        if sum(len(word) for word in _WORD_RE.findall(text)) < MIN_DETECT_LETTERS:
+            return lang, 0.0
+        return lang, scores[lang]
+
+    def spans(self, text: str) -> List[Dict[str, Any]]:
+        """Cümle bazında dil aralıkları; ardışık aynı diller birleştirilir"""
+        spans: List[Dict[str, Any]] = []
+        for match in _SEGMENT_RE.finditer(text):
+            segment = match.group()
+            if not _WORD_RE.search(segment):
+                continue
+            lang, confidence = self.detect(segment)
+            start, end = match.start(), match.end()
+            if spans and spans[-1]["language"] == lang:
+                spans[-1]["end"] = end
+                spans[-1]["confidence"] = round(min(spans[-1]["confidence"], confidence), 4)
+            else:
+                spans.append({"language": lang, "start": start, "end": end, "confidence": round(confidence, 4)})
+        return spans
+
+    def analyze(self, text: str) -> Dict[str, Any]:
+        """Tool çıktısı için yapılandırılmış rapor"""
+        scores = self.scores(text)
+        lang, confidence = self.detect(text)
+        spans = self.spans(text)
+        return {
+            "language": lang,
+            "language_name": LANGUAGE_NAMES.get(lang, lang),
+            "confidence": round(confidence, 4),
+            "scores": {key: round(value, 4) for key, value in sorted(scores.items(), key=lambda item: -item[1])},
+            "mixed": len({span["language"] for span in spans}) > 1,
+            "spans": spans,
+        }
+
+
+@lru_cache(maxsize=1)
+def get_detector() -> LanguageDetector:
+    """Profilleri bir kez çıkarılmış paylaşımlı dedektör"""
+    return LanguageDetector()
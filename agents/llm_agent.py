@@ -3,20 +3,44 @@ Llama 3.3 70B + LangChain Prompt-Based AI Agent
 Tool'lar Llama 3.3 ile prompt engineering entegrasyonu ile çalışır
 """
 
-import os
-import base64
-import io
-from PIL import Image
+import asyncio
+import json
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Optional, Dict, Any, List, Tuple
-from groq import Groq
-from config.settings import Settings
+from typing import TYPE_CHECKING, Optional, Dict, Any, List, Tuple, Iterator, AsyncIterator
+from config.settings import get_settings
 
-# LangChain imports - geri eklendi!
-from langchain.agents import initialize_agent, AgentType
-from langchain.memory import ConversationBufferWindowMemory
-from langchain_groq import ChatGroq
-from agents.tools import create_tools
+# langchain.agents ve langchain_groq (~2.5 sn import) ilk model kurulurken yüklenir
+from agents.tools import create_tools, tool_specs
+from agents.completions import (
+    UsageCallbackHandler, complete, stream_complete, astream_complete, get_usage_tracker, record_gemini_usage,
+    record_llm_error
+)
+from agents.memory import TokenBudgetMemory, estimate_tokens
+from agents.summarizer import summarize
+from agents.streaming import AsyncQueueWriter, FinalAnswerStreamHandler, STREAM_END
+from agents.session_manager import DEFAULT_SESSION_ID, SessionManager, SessionState, is_ephemeral
+from agents.conversation_store import create_conversation_store
+from agents.model_registry import ModelRegistry
+from agents.response_cache import ResponseCache, is_time_sensitive, memory_fingerprint, normalize_message
+from agents.language_detection import get_detector, LANGUAGE_NAMES
+from agents.clock import find_timezone
+from agents.router import IntentRouter, RouteDecision, ROUTE_TOOL, ROUTE_DIRECT, ROUTE_PARALLEL
+from agents.parallel_tools import ParallelToolRunner, synthesis_prompt
+from agents.clients import get_groq_client, get_registry
+from agents.image_processing import PreparedImage, prepare_image_async
+from agents.vision_cache import VisionCache
+from agents.metrics import Counter, Gauge, get_metrics
+from agents.tracing import annotate, mark_error, propagate, request_scope, span
+from agents.resilience import UpstreamHTTPError, get_resilience, parse_retry_after
+from agents.scheduler import GEMINI_IMAGE_TOKENS, PRIORITY_BACKGROUND, get_scheduler, work_scope
+from agents.singleflight import SingleFlight
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
 
 import logging
 
@@ -28,11 +52,18 @@ class LLMAgent:
     """Llama 3.3 70B + LangChain Prompt-Based AI Agent"""
     
     def __init__(self):
-        self.settings = Settings()
-        self.groq_client = None
-        self.langchain_llm = None
-        self.agent = None
-        self.memory = None
+        self.settings = get_settings()
+        self.models = None
+        self.sessions = None
+        self.response_cache = None
+        self.conversation_store = None
+        self.vision_cache = None
+        self.vision_executor = None
+        self.router = None
+        self.tool_runner = None
+        self.message_flights = None
+        self.vision_flights = None
+        self.tools_by_name = {}
         self.current_text_model = self.settings.text_model
         self.current_vision_model = self.settings.vision_model
         self._initialize_systems()
@@ -42,76 +73,214 @@ class LLMAgent:
         if not self.settings.groq_api_key:
             raise ValueError("GROQ_API_KEY environment variable is required")
         
-        # Groq istemcisi (vision için)
-        self.groq_client = Groq(api_key=self.settings.groq_api_key)
+        # Kalıcı, append-only konuşma geçmişi: yeniden başlatmada ve çoklu worker'da bağlam korunur
+        self.conversation_store = create_conversation_store(
+            self.settings.conversation_store, self.settings.conversation_store_path
+        )
         
-        # LangChain + Groq LLM (Llama 3.3 ile tool entegrasyonu)
-        self.langchain_llm = ChatGroq(
-            groq_api_key=self.settings.groq_api_key,
-            model_name=self.current_text_model,
-            temperature=self.settings.temperature,
-            max_tokens=self.settings.max_tokens
+        # Oturum başına konuşma hafızası - agent executor tüm oturumlarca paylaşılır
+        self.sessions = SessionManager(
+            memory_factory=self._create_memory,
+            max_sessions=self.settings.max_sessions,
+            idle_ttl=self.settings.session_idle_ttl
         )
         
-        # Konuşma hafızası
-        self.memory = ConversationBufferWindowMemory(
-            memory_key="chat_history",
-            return_messages=True,
-            k=10  # Son 10 mesajı hatırla
+        # Aynı prompt'lar için yanıt cache'i
+        if self.settings.response_cache_enabled:
+            self.response_cache = ResponseCache(
+                db_path=self.settings.response_cache_path,
+                memory_entries=self.settings.response_cache_memory_entries,
+                disk_entries=self.settings.response_cache_disk_entries,
+                default_ttl=self.settings.response_cache_ttl
+            )
+        
+        # Aynı görsel + aynı soru için vision sonuç cache'i
+        if self.settings.vision_cache_enabled:
+            self.vision_cache = VisionCache(
+                db_path=self.settings.vision_cache_path,
+                max_entries=self.settings.vision_cache_max_entries,
+                max_bytes=self.settings.vision_cache_max_bytes,
+                phash_distance=self.settings.vision_cache_phash_distance
+            )
+        
+        # Çoklu görsel analizinde vision backend'ine giden eşzamanlı istek sınırı
+        self.vision_executor = ThreadPoolExecutor(
+            max_workers=self.settings.vision_concurrency,
+            thread_name_prefix="vision"
         )
         
-        # Tool'ları yükle
-        tools = create_tools()
+        # Tool tanımlarını yükle (LangChain Tool nesneleri agent kurulurken oluşturulur)
+        self.tools_by_name = {spec.name: spec for spec in tool_specs()}
         
-        # LangChain agent'ını başlat - Meta-Llama Maverick seviyesi
-        self.agent = initialize_agent(
-            tools=tools,
-            llm=self.langchain_llm,
-            agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-            memory=self.memory,
-            verbose=True,  # Debug için
-            handle_parsing_errors=True,
-            agent_kwargs={
-                "system_message": self.settings.system_prompt,
-                "input_variables": ["input", "chat_history", "agent_scratchpad"]
-            }
+        # ReAct agent'ının önündeki hızlı yönlendirici
+        if self.settings.router_enabled:
+            self.router = IntentRouter(
+                confidence_threshold=self.settings.router_confidence_threshold,
+                parallel_enabled=self.settings.parallel_tools_enabled
+            )
+        
+        # Birden çok bağımsız tool isteyen mesajlar için eşzamanlı çalıştırıcı
+        self.tool_runner = ParallelToolRunner(
+            self.tools_by_name,
+            max_workers=self.settings.tool_workers,
+            timeout=self.settings.tool_timeout
         )
         
+        # Aynı anda gelen özdeş mesajlar ve görsel istekleri tek upstream çağrısını paylaşır
+        self.message_flights = SingleFlight("message", enabled=self.settings.singleflight_enabled)
+        self.vision_flights = SingleFlight("vision", enabled=self.settings.singleflight_enabled)
+        
+        # Model başına ChatGroq + agent executor cache'i; ilk kullanımda (veya warm_up ile) kurulur
+        text_models = self.settings.get_available_models()["text_models"]
+        if self.current_text_model not in text_models:
+            text_models.append(self.current_text_model)
+        self.models = ModelRegistry(text_models, self._build_llm, self._build_agent)
+        
+        # /metrics okunurken cache oranları ve oturum sayısı buradan hesaplanır
+        get_metrics().set_collector("agent", self._collect_metrics)
+        
         logger.info(f"🦙 Llama 3.3 + LangChain Agent başlatıldı")
         logger.info(f"📝 Text Model: {self.current_text_model}")
         logger.info(f"👁️ Vision Model: {self.current_vision_model}")
         logger.info(f"🛠️ Tool Model: {self.current_text_model}")
+        prompts = self.settings.prompts
+        logger.info(
+            f"📏 Prompt profili: {prompts.name} | system ~{estimate_tokens(prompts.system)} token, "
+            f"vision ~{estimate_tokens(prompts.vision)} token"
+        )
     
-    def switch_model(self, text_model: str, vision_model: str):
-        """Model değiştir"""
-        old_text = self.current_text_model
-        old_vision = self.current_vision_model
-        
-        self.current_text_model = text_model
-        self.current_vision_model = vision_model
-        
-        # LangChain LLM'i yeniden başlat
-        self.langchain_llm = ChatGroq(
+    @property
+    def groq_client(self):
+        """Paylaşımlı, connection pool'lu Groq istemcisi (vision + direkt çağrılar)"""
+        return get_registry().groq
+    
+    @property
+    def async_groq_client(self):
+        """Paylaşımlı AsyncGroq istemcisi"""
+        return get_registry().async_groq
+    
+    @property
+    def langchain_llm(self) -> "ChatGroq":
+        """Varsayılan modelin ChatGroq örneği"""
+        return self.models.get(self.current_text_model).llm
+    
+    @property
+    def agent(self):
+        """Varsayılan modelin agent executor'ı"""
+        return self.models.get(self.current_text_model).agent
+    
+    def warm_up(self) -> None:
+        """Varsayılan modeli ve Groq istemcisini önceden kur (ilk isteğin import maliyetini ödememesi için)"""
+        started = time.perf_counter()
+        self.models.get(self.current_text_model)
+        # Groq SDK'sını yükle ve paylaşımlı istemciyi kur; ilk istek bu importu beklemesin
+        get_groq_client()
+        logger.info(f"🔥 Varsayılan model hazır: {self.current_text_model} ({(time.perf_counter() - started) * 1000:.0f} ms)")
+    
+    def warm_up_async(self) -> threading.Thread:
+        """warm_up'ı arka plan thread'inde başlat"""
+        thread = threading.Thread(target=self.warm_up, name="model-warm-up", daemon=True)
+        thread.start()
+        return thread
+    
+    def _build_llm(self, model_name: str) -> "ChatGroq":
+        """Model için LangChain + Groq LLM (Llama 3.3 ile tool entegrasyonu) - aynı httpx havuzunu kullanır"""
+        from langchain_groq import ChatGroq
+        clients = get_registry()
+        return ChatGroq(
             groq_api_key=self.settings.groq_api_key,
-            model_name=text_model,
+            groq_api_base=self.settings.groq_base_url,
+            model_name=model_name,
             temperature=self.settings.temperature,
-            max_tokens=self.settings.max_tokens
+            max_tokens=self.settings.max_tokens,
+            streaming=True,  # stream_message için token callback'leri
+            # Agent turları resilience katmanından geçmez; retry/backoff'u SDK aynı politikayla yapar
+            max_retries=self.settings.llm_max_attempts - 1,
+            http_client=clients.groq_http_client,
+            http_async_client=clients.groq_async_http_client
         )
-        
-        # Agent'ı yeniden başlat
-        tools = create_tools()
-        self.agent = initialize_agent(
-            tools=tools,
-            llm=self.langchain_llm,
+    
+    def _build_agent(self, llm: "ChatGroq"):
+        """LangChain agent'ını başlat - tool'lar tüm modellerce paylaşılır"""
+        from langchain.agents import initialize_agent, AgentType
+        return initialize_agent(
+            tools=create_tools(),
+            llm=llm,
             agent=AgentType.CHAT_CONVERSATIONAL_REACT_DESCRIPTION,
-            memory=self.memory,
-            verbose=True,
+            verbose=self.settings.agent_verbose,  # stdout izi yavaş; istek izi agents.trace log'unda
             handle_parsing_errors=True,
             agent_kwargs={
                 "system_message": self.settings.system_prompt,
                 "input_variables": ["input", "chat_history", "agent_scratchpad"]
             }
         )
+    
+    def _text_model(self, session: Optional[SessionState]) -> str:
+        """Oturumun aktif text modeli (seçilmediyse varsayılan)"""
+        return (session.text_model if session else None) or self.current_text_model
+    
+    def _agent_for(self, session: SessionState):
+        """Oturumun text modeline ait (cache'li) agent executor"""
+        return self.models.get(self._text_model(session)).agent
+    
+    def _agent_available(self, session: SessionState) -> bool:
+        """Oturum modelinin circuit'i açıksa agent atlanır, doğrudan fallback (ikincil model) kullanılır"""
+        model = self._text_model(session)
+        if get_resilience().available(model):
+            return True
+        logger.warning(f"🚧 {model} circuit açık, agent atlanıyor")
+        return False
+    
+    def _create_memory(self, session_id: str) -> TokenBudgetMemory:
+        """Yeni bir oturum için token bütçeli konuşma hafızası oluştur (depoda geçmişi varsa son penceresiyle)"""
+        return TokenBudgetMemory(
+            summarizer=self._summarize_history,
+            token_budget=self.settings.memory_token_budget,
+            store=None if is_ephemeral(session_id) else self.conversation_store,
+            session_id=session_id
+        )
+    
+    def _summarize_history(self, previous_summary: str, messages: List[Any]) -> str:
+        """Hafızadan düşen turları mevcut özete kat (arka plan thread'inde çalışır)"""
+        transcript = "\n".join(
+            f"{'Kullanıcı' if msg.__class__.__name__ == 'HumanMessage' else 'Asistan'}: {msg.content}"
+            for msg in messages
+        )
+        prompt = (
+            f"Mevcut özet:\n{previous_summary or '(yok)'}\n\n"
+            f"Yeni konuşma bölümü:\n{transcript}\n\n"
+            "Mevcut özeti yeni bölümle güncelle. Kullanıcının adı, tercihleri, verdiği bilgiler, "
+            "alınan kararlar ve açık kalan sorular korunmalı. Sadece güncel özeti, konuşmanın dilinde ve "
+            "kısa paragraflar halinde yaz."
+        )
+        try:
+            # Arka plan işi: kuyrukta etkileşimli sohbet çağrılarının arkasında bekler
+            with work_scope(priority=PRIORITY_BACKGROUND):
+                completion = complete(
+                    self.groq_client,
+                    "memory_summary",
+                    model=self.current_text_model,
+                    messages=[{"role": "user", "content": prompt}],
+                    max_tokens=self.settings.memory_summary_max_tokens,
+                    temperature=0.2
+                )
+            return completion.choices[0].message.content.strip()
+        except Exception as e:
+            # LLM'e ulaşılamazsa yerel extractive özetle devam et
+            logger.warning(f"⚠️ Hafıza özeti LLM hatası, yerel özet kullanılıyor: {str(e)}")
+            return summarize(f"{previous_summary}\n\n{transcript}", sentence_count=5)["summary"]
+    
+    def switch_model(self, text_model: str, vision_model: str):
+        """Varsayılan modelleri değiştir (model seçmemiş oturumlar için)"""
+        old_text = self.current_text_model
+        old_vision = self.current_vision_model
+        
+        try:
+            self.models.get(text_model)
+        except ValueError as e:
+            return f"❌ {str(e)}"
+        self.current_text_model = text_model
+        self.current_vision_model = vision_model
         
         logger.info(f"🔄 Maverick Model değiştirildi:")
         logger.info(f"   Text: {old_text} → {text_model}")
@@ -119,25 +288,317 @@ class LLMAgent:
         
         return f"✅ Llama 3.3 Modeller güncellendi!\n📝 Text: {text_model}\n👁️ Vision: {vision_model}"
     
-    def process_message(self, message: str, image=None) -> str:
-        """Llama 3.3 ile mesajı işle - LangChain + prompt-based tool entegrasyonu"""
+    def set_session_model(self, session_id: Optional[str] = None, text_model: Optional[str] = None,
+                          vision_model: Optional[str] = None) -> str:
+        """Sadece bu oturumun modelini değiştir; agent cache'ten alınır, diğer oturumlar etkilenmez"""
+        session = self.sessions.get(session_id)
         try:
-            # Görsel var mı kontrol et
-            if image is not None:
-                return self._process_with_vision(message, image)
-            else:
-                return self._process_with_langchain(message)
-                
-        except Exception as e:
-            error_msg = f"❌ Llama 3.3 işlem hatası: {str(e)}"
-            logger.error(error_msg)
-            return error_msg
+            if text_model is not None:
+                # İlk seçimde kurulur, sonraki geçişler sözlük araması
+                self.models.get(text_model)
+                session.text_model = text_model
+            if vision_model is not None:
+                if vision_model not in self.settings.get_available_models()["vision_models"]:
+                    raise ValueError(f"Bilinmeyen vision modeli: {vision_model}")
+                session.vision_model = vision_model
+        except ValueError as e:
+            logger.warning(f"⚠️ Model değiştirilemedi: {str(e)}")
+            return f"❌ {str(e)}"
+        
+        backend, model = self._vision_model(session)
+        logger.info(f"🔄 Oturum modeli: {session.session_id} → text={self._text_model(session)}, vision={model}")
+        return f"✅ Oturum modelleri: 📝 `{self._text_model(session)}` | 👁️ `{model}` ({backend})"
+    
+    def _session(self, session_id: Optional[str]) -> SessionState:
+        """İstek başında oturumu al ve hafızasını depoyla bir kez eşitle (başka worker yazmış olabilir)"""
+        session = self.sessions.get(session_id)
+        session.memory.refresh()
+        return session
+    
+    async def _asession(self, session_id: Optional[str]) -> SessionState:
+        """_session'ın async karşılığı; depo okuması event loop'u bloklamasın"""
+        return await asyncio.to_thread(self._session, session_id)
+    
+    @staticmethod
+    async def _asave(session: SessionState, message: str, response: str) -> None:
+        """Yanıtı hafızaya thread'de yaz; depo yazımı (BEGIN IMMEDIATE, busy_timeout) event loop'u bloklamasın"""
+        await asyncio.to_thread(session.memory.save_context, {"input": message}, {"output": response})
+    
+    def process_message(self, message: str, image=None, session_id: Optional[str] = None) -> str:
+        """Llama 3.3 ile mesajı işle - LangChain + prompt-based tool entegrasyonu"""
+        with request_scope("vision" if image is not None else "text"), work_scope(session_id=session_id):
+            try:
+                # Görsel var mı kontrol et
+                if image is not None:
+                    annotate(route="vision")
+                    return "".join(self._stream_with_vision(message, image, self._session(session_id)))
+                else:
+                    return self._process_text_shared(message, self._session(session_id))
+                    
+            except Exception as e:
+                mark_error(e)
+                error_msg = f"❌ Llama 3.3 işlem hatası: {str(e)}"
+                logger.error(error_msg)
+                return error_msg
+    
+    def stream_message(self, message: str, image=None, session_id: Optional[str] = None) -> Iterator[str]:
+        """Mesajı işle ve yanıtı parça parça (token-by-token) üret"""
+        with request_scope("vision" if image is not None else "text"), work_scope(session_id=session_id):
+            try:
+                if image is not None:
+                    annotate(route="vision")
+                    yield from self._stream_with_vision(message, image, self._session(session_id))
+                else:
+                    yield from self._stream_text_shared(message, self._session(session_id))
+                    
+            except Exception as e:
+                mark_error(e)
+                error_msg = f"❌ Llama 3.3 işlem hatası: {str(e)}"
+                logger.error(error_msg)
+                yield error_msg
+    
+    def _route(self, message: str) -> Optional[RouteDecision]:
+        """Mesajı yönlendir; router kapalıysa None (her şey agent'a gider)"""
+        if not self.router:
+            return None
+        with span("route") as current:
+            decision = self.router.route(message)
+            current.set(route=decision.route, stage=decision.stage, confidence=round(decision.confidence, 3),
+                        intents=list(decision.intents))
+        annotate(route=decision.route)
+        return decision
+    
+    def _process_text(self, message: str, session: SessionState) -> str:
+        """Metin mesajını yönlendirme kararına göre tool, direkt completion veya agent ile işle"""
+        decision = self._route(message)
+        if decision and decision.route == ROUTE_TOOL:
+            response = self._run_routed_tool(decision, message)
+            session.memory.save_context({"input": message}, {"output": response})
+            return response
+        if decision and decision.route == ROUTE_DIRECT:
+            return self._process_direct(message, session)
+        if decision and decision.route == ROUTE_PARALLEL:
+            return "".join(self._stream_parallel(decision, message, session))
+        return self._process_with_langchain(message, session)
+    
+    def _message_flight_key(self, message: str, session: SessionState) -> Optional[str]:
+        """Single-flight anahtarı; geçmişi olan oturumda (singleflight_skip_memory ile) None: birleştirilmez"""
+        chat_history = session.memory.load_memory_variables({})["chat_history"]
+        if chat_history and self.settings.singleflight_skip_memory:
+            return None
+        return ResponseCache.make_key(
+            self._text_model(session),
+            self.settings.temperature,
+            self.settings.system_prompt,
+            message,
+            memory_fingerprint(chat_history)
+        )
+    
+    def _process_text_shared(self, message: str, session: SessionState) -> str:
+        """_process_text; uçuşta özdeş bir mesaj varsa onun agent çalıştırmasının yanıtını paylaş"""
+        ran = []
+        
+        def run() -> str:
+            ran.append(True)
+            return self._process_text(message, session)
+        
+        response = self.message_flights.do(self._message_flight_key(message, session), run)
+        if not ran:
+            # Lider yanıtı kendi oturumuna yazdı; paylaşan oturumun hafızasına da ekle
+            session.memory.save_context({"input": message}, {"output": response})
+        return response
+    
+    def _stream_text_shared(self, message: str, session: SessionState) -> Iterator[str]:
+        """_stream_text; uçuşta özdeş bir mesaj varsa onun stream'ine baştan katıl"""
+        ran = []
+        
+        def run() -> Iterator[str]:
+            ran.append(True)
+            return self._stream_text(message, session)
+        
+        parts = []
+        for chunk in self.message_flights.stream(self._message_flight_key(message, session), run):
+            parts.append(chunk)
+            yield chunk
+        if not ran:
+            session.memory.save_context({"input": message}, {"output": "".join(parts)})
+    
+    def _stream_text(self, message: str, session: SessionState) -> Iterator[str]:
+        """_process_text'in stream karşılığı"""
+        decision = self._route(message)
+        if decision and decision.route == ROUTE_TOOL:
+            response = self._run_routed_tool(decision, message)
+            session.memory.save_context({"input": message}, {"output": response})
+            yield response
+        elif decision and decision.route == ROUTE_DIRECT:
+            yield from self._stream_direct(message, session)
+        elif decision and decision.route == ROUTE_PARALLEL:
+            yield from self._stream_parallel(decision, message, session)
+        else:
+            yield from self._stream_with_langchain(message, session)
+    
+    @staticmethod
+    def _tool_input(tool_name: str, decision: RouteDecision, message: str) -> str:
+        """Router kararından tool girdisini üret"""
+        if tool_name == "get_current_time":
+            lang, _ = get_detector().detect(message)
+            question = message
+            if decision.route == ROUTE_PARALLEL and decision.payload and decision.payload != message:
+                question = message.replace(decision.payload, "")
+            # "Tokyo'da saat kaç?" sunucunun yerel saatiyle değil, sorulan yerin saatiyle yanıtlanır
+            return json.dumps({"language": "en" if lang == "en" else "tr", "timezone": find_timezone(question)})
+        return decision.payload or message
     
-    def _process_with_langchain(self, message: str) -> str:
+    def _run_routed_tool(self, decision: RouteDecision, message: str) -> str:
+        """Router'ın seçtiği tool'u ReAct döngüsü olmadan çalıştır"""
+        tool_name = decision.tool
+        output = self.tools_by_name[tool_name].func(self._tool_input(tool_name, decision, message))
+        logger.info(f"⚡ Fast-path tool: {tool_name}")
+        # JSON döndüren tool'ları okunabilir bir blokta göster
+        if tool_name in ("text_analyzer", "language_detector"):
+            return f"```json\n{output}\n```"
+        return output
+    
+    def _parallel_messages(self, message: str, results) -> List[Dict[str, Any]]:
+        """Paralel tool sonuçlarının sentez çağrısı için mesajlar"""
+        return self._fallback_messages(message)[:1] + [{"role": "user", "content": synthesis_prompt(message, results)}]
+    
+    def _stream_parallel(self, decision: RouteDecision, message: str, session: SessionState) -> Iterator[str]:
+        """Bağımsız tool'ları eşzamanlı çalıştır, sonuçları tek sentez çağrısında birleştir"""
+        calls = [(tool, self._tool_input(tool, decision, message)) for tool in decision.tools]
+        results = self.tool_runner.run(calls)
+        parts = []
+        for chunk in self._stream_completion("parallel_synthesis", self._text_model(session),
+                                             self._parallel_messages(message, results)):
+            parts.append(chunk)
+            yield chunk
+        session.memory.save_context({"input": message}, {"output": "".join(parts)})
+    
+    def _direct_messages(self, message: str, session: SessionState) -> List[Dict[str, Any]]:
+        """Tek direkt completion için sistem prompt'u + oturum geçmişi + mesaj"""
+        messages = self._fallback_messages(message, session)
+        history = []
+        for msg in session.memory.load_memory_variables({})["chat_history"]:
+            role = {"HumanMessage": "user", "SystemMessage": "system"}.get(msg.__class__.__name__, "assistant")
+            history.append({"role": role, "content": msg.content})
+        return messages[:1] + history + messages[1:]
+    
+    def _process_direct(self, message: str, session: SessionState) -> str:
+        """Tool gerektirmeyen mesajlar için tek Groq çağrısı"""
+        cache_key = self._response_cache_key(message, session)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                session.memory.save_context({"input": message}, {"output": cached})
+                logger.info("⚡ Response cache hit")
+                return cached
+        
+        completion = complete(
+            self.groq_client,
+            "direct",
+            model=self._text_model(session),
+            messages=self._direct_messages(message, session),
+            max_tokens=self.settings.max_tokens,
+            temperature=self.settings.temperature
+        )
+        response = completion.choices[0].message.content
+        session.memory.save_context({"input": message}, {"output": response})
+        if cache_key:
+            self.response_cache.set(cache_key, response)
+        return response
+    
+    def _stream_direct(self, message: str, session: SessionState) -> Iterator[str]:
+        """Direkt completion'ı stream modunda yap"""
+        cache_key = self._response_cache_key(message, session)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                session.memory.save_context({"input": message}, {"output": cached})
+                logger.info("⚡ Response cache hit")
+                yield cached
+                return
+        
+        parts = []
+        for chunk in self._stream_completion("direct", self._text_model(session), self._direct_messages(message, session)):
+            parts.append(chunk)
+            yield chunk
+        response = "".join(parts)
+        session.memory.save_context({"input": message}, {"output": response})
+        if cache_key:
+            self.response_cache.set(cache_key, response)
+    
+    def _reply_language(self, message: str, session: Optional[SessionState] = None) -> Optional[str]:
+        """
+        Yanıt dilini yerel dedektörle seç. Güven düşükse ("ok", "Hello") oturumun önceki dili korunur;
+        o da yoksa None (model karar verir).
+        """
+        previous = session.reply_language if session is not None else None
+        if not message.strip():
+            return previous
+        lang, confidence = get_detector().detect(message)
+        if confidence < self.settings.language_confidence_threshold:
+            return previous
+        if session is not None:
+            session.reply_language = LANGUAGE_NAMES[lang]
+        return LANGUAGE_NAMES[lang]
+    
+    def _fallback_messages(self, message: str, session: Optional[SessionState] = None) -> List[Dict[str, Any]]:
+        """Direkt Groq fallback çağrısı için mesaj listesi"""
+        system_prompt = self.settings.system_prompt
+        language = self._reply_language(message, session)
+        if language:
+            system_prompt = f"{system_prompt}\n\nYanıt dili: {language}"
+        return [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": message}
+        ]
+    
+    def _agent_inputs(self, message: str, session: SessionState) -> Dict[str, Any]:
+        """Oturum hafızasını ve yanıt dilini agent girdisine ekle"""
+        chat_history = session.memory.load_memory_variables({})["chat_history"]
+        language = self._reply_language(message, session)
+        agent_input = f"{message}\n\n(Yanıt dili: {language})" if language else message
+        return {"input": agent_input, "chat_history": chat_history}
+    
+    def _response_cache_key(self, message: str, session: SessionState) -> Optional[str]:
+        """Cache anahtarı üret; zamana bağlı niyetlerde None döner (cache atlanır)"""
+        if self.response_cache is None:
+            return None
+        if is_time_sensitive(message):
+            self.response_cache.record_bypass()
+            return None
+        fingerprint = None
+        if self.settings.response_cache_use_memory:
+            fingerprint = memory_fingerprint(session.memory.load_memory_variables({})["chat_history"])
+        return ResponseCache.make_key(
+            self._text_model(session),
+            self.settings.temperature,
+            self.settings.system_prompt,
+            message,
+            fingerprint
+        )
+    
+    def _process_with_langchain(self, message: str, session: SessionState) -> str:
         """LangChain agent ile prompt-based tool entegrasyonu"""
+        cache_key = self._response_cache_key(message, session)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                session.memory.save_context({"input": message}, {"output": cached})
+                logger.info("⚡ Response cache hit")
+                return cached
+        
         try:
+            if not self._agent_available(session):
+                raise RuntimeError(f"{self._text_model(session)} circuit açık")
             # LangChain agent'ını çağır - tool'lar otomatik olarak çağrılacak
-            response = self.agent.run(input=message)
+            response = self._agent_for(session).invoke(
+                self._agent_inputs(message, session),
+                config={"callbacks": [UsageCallbackHandler("agent")]}
+            )["output"]
+            session.memory.save_context({"input": message}, {"output": response})
+            if cache_key:
+                self.response_cache.set(cache_key, response)
             
             logger.info(f"✅ Maverick LangChain yanıt alındı")
             return response
@@ -148,12 +609,11 @@ class LLMAgent:
             
             # Fallback: Direkt LLM çağrısı
             try:
-                completion = self.groq_client.chat.completions.create(
-                    model=self.current_text_model,
-                    messages=[
-                        {"role": "system", "content": self.settings.system_prompt},
-                        {"role": "user", "content": message}
-                    ],
+                completion = complete(
+                    self.groq_client,
+                    "fallback",
+                    model=self._text_model(session),
+                    messages=self._fallback_messages(message, session),
                     max_tokens=self.settings.max_tokens,
                     temperature=self.settings.temperature
                 )
@@ -161,87 +621,664 @@ class LLMAgent:
             except Exception as fallback_e:
                 return f"❌ Sistem hatası: {str(fallback_e)}"
     
-    def _process_with_vision(self, message: str, image) -> str:
-        """Görsel analizi için Meta-Llama Maverick vision"""
+    def _stream_with_langchain(self, message: str, session: SessionState) -> Iterator[str]:
+        """LangChain agent'ını arka planda çalıştır, Final Answer token'larını akıt"""
+        cache_key = self._response_cache_key(message, session)
+        if cache_key:
+            cached = self.response_cache.get(cache_key)
+            if cached is not None:
+                session.memory.save_context({"input": message}, {"output": cached})
+                logger.info("⚡ Response cache hit")
+                yield cached
+                return
+        
+        if not self._agent_available(session):
+            yield from self._stream_fallback(message, self._text_model(session), session)
+            return
+        
+        agent = self._agent_for(session)
+        chunks: "queue.Queue[Any]" = queue.Queue()
+        handler = FinalAnswerStreamHandler(chunks)
+        result: Dict[str, Any] = {}
+        
+        def run_agent():
+            try:
+                output = agent.invoke(
+                    self._agent_inputs(message, session),
+                    config={"callbacks": [handler, UsageCallbackHandler("agent")]}
+                )
+                result["output"] = output.get("output", "")
+                session.memory.save_context({"input": message}, {"output": result["output"]})
+                if cache_key:
+                    self.response_cache.set(cache_key, result["output"])
+            except Exception as e:
+                result["error"] = e
+            finally:
+                chunks.put(STREAM_END)
+        
+        threading.Thread(target=propagate(run_agent), name="agent-stream", daemon=True).start()
+        
+        while True:
+            chunk = chunks.get()
+            if chunk is STREAM_END:
+                break
+            yield chunk
+        
+        if "error" in result:
+            logger.error(f"❌ LangChain Agent hatası: {str(result['error'])}")
+            yield from self._stream_fallback(message, self._text_model(session), session)
+            return
+        
+        # Final Answer JSON dışında geldiyse (parse hatası vb.) kalan metni tek seferde gönder
+        output = result.get("output", "")
+        if output.startswith(handler.streamed_text):
+            remainder = output[len(handler.streamed_text):]
+            if remainder:
+                yield remainder
+        
+        logger.info("✅ Maverick LangChain stream tamamlandı")
+    
+    def _stream_fallback(self, message: str, model: str, session: Optional[SessionState] = None) -> Iterator[str]:
+        """Agent hata verdiğinde direkt Groq çağrısını stream modunda yap"""
         try:
-            # Görseli işle
-            if hasattr(image, 'name'):  # Gradio file objesi
-                img = Image.open(image.name)
-            else:
-                img = image
-            
-            # Maverick için optimize et
-            img.thumbnail((1536, 1536), Image.Resampling.LANCZOS)
-            
-            buffer = io.BytesIO()
-            img.save(buffer, format='JPEG', quality=95)
-            image_base64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-            
-            # Maverick Vision prompt
-            enhanced_prompt = f"""
-[META-LLAMA MAVERICK VISION ANALYSIS]
-
-Kullanıcı mesajı: {message}
-
-Bu görseli Maverick seviyede analiz et:
-
-1. 🔍 DETAYLI ANALİZ:
-   - Ana objeler ve kompozisyon
-   - Renkler, ışık, perspektif
-   - Teknik kalite ve stil
-
-2. 📖 METIN OKUMA (OCR):
-   - Görseldeki tüm yazıları oku
-   - Farklı dillerdeki metinleri çevir
-   - Tabela, logo, işaret vb. tanımla
-
-3. 🧠 CONTEXT ANALYSİS:
-   - Bu görsel hangi amaçla çekilmiş?
-   - Hangi ortam, zaman, durum?
-   - Kültürel ve sosyal context
-
-4. 💡 MAVERICK İNSIGHT:
-   - Dikkat çeken detaylar
-   - Gizli anlamlar veya semboller
-   - Profesyonel değerlendirme
-
-Türkçe'de detaylı ve yapılandırılmış yanıt ver.
-"""
+            stream = self._stream_completion("fallback", model, self._fallback_messages(message, session))
+            yield "⚠️ Fallback mode:\n\n"
+            for chunk in stream:
+                yield chunk
+        except Exception as fallback_e:
+            yield f"❌ Sistem hatası: {str(fallback_e)}"
+    
+    def _build_vision_messages(self, message: str, prepared: PreparedImage) -> List[Dict[str, Any]]:
+        """Ön işlenmiş görsel için Maverick vision mesajlarını hazırla"""
+        # Sabit vision öneki profil yüklenirken kurulur; sadece mesaj ve dil eklenir
+        enhanced_prompt = self.settings.prompts.vision_prompt(message, self._reply_language(message) or "Türkçe")
+        
+        return [
+            {
+                "role": "user",
+                "content": [
+                    {"type": "text", "text": enhanced_prompt},
+                    {
+                        "type": "image_url",
+                        "image_url": {
+                            "url": f"data:{prepared.mime_type};base64,{prepared.base64}",
+                            "detail": "high"
+                        }
+                    }
+                ]
+            }
+        ]
+    
+    def _vision_model(self, session: Optional[SessionState] = None) -> Tuple[str, str]:
+        """Oturumun aktif vision (backend, model) çifti"""
+        selected = session.vision_model if session else None
+        if selected:
+            # "models/gemini-..." Gemini'ye, diğerleri Groq vision'a gider
+            if "gemini" in selected:
+                return "gemini", selected.split("/")[-1]
+            return "groq", selected
+        if self.settings.vision_backend == "groq":
+            return "groq", self.current_vision_model
+        return "gemini", self.settings.gemini_vision_model
+    
+    def _stream_with_vision(self, message: str, image, session: SessionState, remember: bool = True) -> Iterator[str]:
+        """Görseli ön işle; cache'te yoksa oturumun vision backend'inden stream et (remember=False: hafızaya yazma)"""
+        # Decode/resize/encode request thread'inde değil, sınırlı havuzda
+        prepared = prepare_image_async(image).result()
+        backend, model = self._vision_model(session)
+        request_hash = VisionCache.request_key(backend, model, normalize_message(message), self._reply_language(message))
+        display_message = message if message.strip() else "Görsel analizi"
+        
+        if self.vision_cache is not None:
+            cached = self.vision_cache.get(prepared.pixel_hash, prepared.phash, request_hash)
+            if cached is not None:
+                response, tier = cached
+                logger.info(f"⚡ Vision cache hit ({tier})")
+                if remember:
+                    session.memory.save_context({"input": display_message}, {"output": response})
+                yield response
+                return
             
-            messages = [
+            # Aynı görsele yeni bir soru: kayıtlı açıklama + text model (vision çağrısı yok)
+            description = None
+            if message.strip() and self.settings.vision_reuse_descriptions:
+                description = self.vision_cache.get_description(prepared.pixel_hash, prepared.phash)
+            if description:
+                logger.info("⚡ Vision açıklaması yeniden kullanıldı")
+                stream = self._stream_from_description(message, description, self._text_model(session))
+            else:
+                stream = self._shared_vision_stream(backend, model, message, prepared, request_hash)
+        else:
+            stream = self._shared_vision_stream(backend, model, message, prepared, request_hash)
+        
+        parts = []
+        try:
+            for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            label = "Meta-Llama Maverick Vision" if backend == "groq" else "Görsel analizi"
+            yield f"❌ {label} hatası: {str(e)}"
+            return
+        
+        response = "".join(parts)
+        if not response:
+            return
+        if remember:
+            session.memory.save_context({"input": display_message}, {"output": response})
+        if self.vision_cache is not None:
+            self._store_vision(prepared, request_hash, response, not message.strip())
+        logger.info(f"✅ Vision stream tamamlandı ({backend}, {prepared!r})")
+    
+    def _store_vision(self, prepared: PreparedImage, request_hash: str, response: str, general: bool) -> None:
+        """Vision yanıtını cache'e yaz; soru yoksa (general) yanıt görselin açıklaması olarak da saklanır"""
+        self.vision_cache.set(prepared.pixel_hash, prepared.phash, request_hash, response)
+        self.vision_cache.set_description(prepared.pixel_hash, prepared.phash, response, replace=general)
+    
+    def _shared_vision_stream(self, backend: str, model: str, message: str, prepared: PreparedImage,
+                              request_hash: str) -> Iterator[str]:
+        """Aynı görsel + aynı istek uçuştaysa o vision çağrısının stream'ine katıl"""
+        return self.vision_flights.stream(
+            (prepared.pixel_hash, request_hash),
+            lambda: self._stream_vision_backend(backend, model, message, prepared)
+        )
+    
+    def _stream_vision_backend(self, backend: str, model: str, message: str,
+                               prepared: PreparedImage) -> Iterator[str]:
+        """Seçili backend'e göre vision stream'i"""
+        if backend == "groq":
+            return self._stream_groq_vision(model, message, prepared)
+        return get_resilience().stream(
+            "vision:gemini", model, lambda selected: self._stream_gemini_vision(selected, message, prepared))
+    
+    def _stream_groq_vision(self, model: str, message: str, prepared: PreparedImage) -> Iterator[str]:
+        """Groq vision modelini stream modunda çağır"""
+        yield from self._stream_completion("vision:groq", model, self._build_vision_messages(message, prepared))
+    
+    def _gemini_request(self, model: str, message: str, prepared: PreparedImage) -> Tuple[str, Dict[str, Any]]:
+        """Gemini streamGenerateContent URL'i ve gövdesi"""
+        if not self.settings.gemini_api_key:
+            raise ValueError("Gemini API anahtarı bulunamadı. Lütfen .env dosyanıza GEMINI_API_KEY ekleyin.")
+        url = (f"{self.settings.gemini_base_url.rstrip('/')}/v1beta/models/{model}"
+               f":streamGenerateContent?alt=sse&key={self.settings.gemini_api_key}")
+        data = {
+            "contents": [
                 {
-                    "role": "user",
-                    "content": [
-                        {"type": "text", "text": enhanced_prompt},
-                        {
-                            "type": "image_url",
-                            "image_url": {
-                                "url": f"data:image/jpeg;base64,{image_base64}",
-                                "detail": "high"
-                            }
-                        }
+                    "parts": [
+                        {"text": message or "Bu resmi açıkla"},
+                        {"inline_data": {"mime_type": prepared.mime_type, "data": prepared.base64}}
                     ]
                 }
             ]
-            
-            completion = self.groq_client.chat.completions.create(
-                model=self.current_vision_model,
-                messages=messages,
-                max_tokens=self.settings.max_tokens,
-                temperature=self.settings.temperature
+        }
+        return url, data
+    
+    def _gemini_cost(self, message: str) -> int:
+        """Zamanlayıcı için tahmini Gemini token'ı: prompt + görsel + yanıt payı"""
+        return estimate_tokens(message) + GEMINI_IMAGE_TOKENS + self.settings.scheduler_completion_tokens
+    
+    @staticmethod
+    def _gemini_sse_texts(line: str, usage: Dict[str, Any]) -> List[str]:
+        """Tek bir SSE satırındaki metin parçaları; usageMetadata varsa `usage`'a yazılır"""
+        if not line or not line.startswith("data:"):
+            return []
+        event = json.loads(line[len("data:"):].strip())
+        usage.update(event.get("usageMetadata") or {})
+        return [
+            part["text"]
+            for candidate in event.get("candidates", [])[:1]
+            for part in candidate.get("content", {}).get("parts", [])
+            if part.get("text")
+        ]
+    
+    def _stream_gemini_vision(self, model: str, message: str, prepared: PreparedImage) -> Iterator[str]:
+        """Gemini streamGenerateContent (SSE) ile görsel analizi"""
+        url, data = self._gemini_request(model, message, prepared)
+        clients = get_registry()
+        get_scheduler().acquire(model, self._gemini_cost(message))
+        started = time.perf_counter()
+        usage: Dict[str, Any] = {}
+        parts = []
+        try:
+            with clients.gemini_session.post(url, data=json.dumps(data), timeout=clients.gemini_timeout,
+                                             stream=True) as response:
+                if response.status_code != 200:
+                    get_scheduler().observe_headers(model, response.status_code, response.headers)
+                    raise UpstreamHTTPError(f"Gemini Vision API hatası: {response.status_code} - {response.text}",
+                                            response.status_code, parse_retry_after(response.headers.get("retry-after")))
+                for line in response.iter_lines(decode_unicode=True):
+                    for text in self._gemini_sse_texts(line, usage):
+                        parts.append(text)
+                        yield text
+        except Exception as e:
+            record_llm_error("vision:gemini", model, started, e, span_name="gemini_http")
+            raise
+        record_gemini_usage("vision:gemini", usage, data, "".join(parts), started, model)
+    
+    @staticmethod
+    def _description_prompt(message: str, description: str) -> str:
+        """Kayıtlı görsel açıklamasıyla text model prompt'u"""
+        return (
+            "Kullanıcı daha önce analiz edilmiş bir görsel hakkında soru soruyor.\n\n"
+            f"Görsel açıklaması:\n{description}\n\n"
+            f"Soru: {message}\n\n"
+            "Yalnızca bu açıklamaya dayanarak yanıt ver; açıklamada olmayan bir detay sorulursa bunu belirt."
+        )
+    
+    def _description_messages(self, message: str, description: str) -> List[Dict[str, Any]]:
+        """Açıklama tabanlı yanıt için sistem prompt'u + soru"""
+        return self._fallback_messages(message)[:1] + [
+            {"role": "user", "content": self._description_prompt(message, description)}
+        ]
+    
+    def _stream_from_description(self, message: str, description: str, model: str) -> Iterator[str]:
+        """Kayıtlı görsel açıklamasıyla soruyu text modelde yanıtla"""
+        yield from self._stream_completion("vision:description", model,
+                                           self._description_messages(message, description))
+    
+    def process_images(self, message: str, images: List[Any], session_id: Optional[str] = None) -> str:
+        """Birden çok görseli eşzamanlı analiz et ve tek birleşik yanıt döndür"""
+        return "".join(
+            event["text"] for event in self.stream_images(message, images, session_id)
+            if event["type"] == "merged"
+        )
+    
+    def stream_images(self, message: str, images: List[Any], session_id: Optional[str] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Görselleri sınırlı eşzamanlılıkla analiz et.
+        Her görsel bittikçe {"type": "image", "index", "text"} olayı, ardından birleşik yanıt
+        parça parça {"type": "merged", "text"} olayları üretilir.
+        """
+        with request_scope("images", route="vision", images=len(images)), work_scope(session_id=session_id):
+            yield from self._stream_images(message, images, session_id)
+    
+    def _stream_images(self, message: str, images: List[Any], session_id: Optional[str]) -> Iterator[Dict[str, Any]]:
+        """stream_images'ın gövdesi (trace kapsamı dışarıda açılır)"""
+        session = self._session(session_id)
+        if len(images) == 1:
+            for chunk in self._stream_with_vision(message, images[0], session):
+                yield {"type": "merged", "text": chunk}
+            return
+        
+        futures = {
+            self.vision_executor.submit(propagate(self._analyze_image), message, image, session): index
+            for index, image in enumerate(images)
+        }
+        results: List[str] = [""] * len(images)
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                results[index] = future.result()
+            except Exception as e:
+                results[index] = f"❌ Görsel analizi hatası: {str(e)}"
+            yield {"type": "image", "index": index, "text": results[index]}
+        logger.info(f"✅ {len(images)} görsel analiz edildi")
+        
+        parts = []
+        for chunk in self._stream_merged_answer(message, results, self._text_model(session)):
+            parts.append(chunk)
+            yield {"type": "merged", "text": chunk}
+        display_message = f"[{len(images)} görsel] {message}".strip()
+        session.memory.save_context({"input": display_message}, {"output": "".join(parts)})
+    
+    def _analyze_image(self, message: str, image, session: SessionState) -> str:
+        """Tek görselin analizini (hafızaya yazmadan) topla"""
+        return "".join(self._stream_with_vision(message, image, session, remember=False))
+    
+    @staticmethod
+    def _merge_sections(results: List[str]) -> str:
+        """Görsel başına analizleri numaralı bölümler halinde birleştir"""
+        return "\n\n".join(f"### Görsel {index + 1}\n{text}" for index, text in enumerate(results))
+    
+    def _merge_prompt(self, message: str, results: List[str]) -> str:
+        """Görsel başına analizleri tek yanıtta birleştirme prompt'u"""
+        return (
+            f"Kullanıcı {len(results)} görsel yükledi"
+            + (f" ve şunu sordu: {message}" if message.strip() else "")
+            + ".\n\nGörsel başına analizler:\n\n"
+            f"{self._merge_sections(results)}\n\n"
+            "Bu analizleri tek, tutarlı bir yanıtta birleştir; gerekiyorsa görsel numarasına atıf yap."
+        )
+    
+    def _merge_messages(self, message: str, results: List[str]) -> List[Dict[str, Any]]:
+        """Birleştirme çağrısı için sistem prompt'u + prompt"""
+        return self._fallback_messages(message)[:1] + [{"role": "user", "content": self._merge_prompt(message, results)}]
+    
+    def _stream_merged_answer(self, message: str, results: List[str], model: str) -> Iterator[str]:
+        """Görsel başına analizleri text model ile tek yanıtta birleştir; hata olursa bölümleri art arda ver"""
+        sections = self._merge_sections(results)
+        streamed = False
+        try:
+            for chunk in self._stream_completion("vision:merge", model,
+                                                 self._merge_messages(message, results)):
+                streamed = True
+                yield chunk
+        except Exception as e:
+            logger.error(f"❌ Birleştirme hatası: {str(e)}")
+            if not streamed:
+                yield sections
+    
+    # ------------------------------------------------------------------
+    # Async yol (AsyncGroq + httpx.AsyncClient): thread yerine event loop'ta bekler
+    # ------------------------------------------------------------------
+    
+    async def aprocess_message(self, message: str, image=None, session_id: Optional[str] = None) -> str:
+        """process_message'ın async karşılığı"""
+        parts = []
+        async for chunk in self.astream_message(message, image, session_id):
+            parts.append(chunk)
+        return "".join(parts)
+    
+    async def astream_message(self, message: str, image=None, session_id: Optional[str] = None) -> AsyncIterator[str]:
+        """stream_message'ın async karşılığı"""
+        with request_scope("vision" if image is not None else "text"), work_scope(session_id=session_id):
+            try:
+                session = await self._asession(session_id)
+                if image is not None:
+                    annotate(route="vision")
+                    stream = self._astream_with_vision(message, image, session)
+                else:
+                    stream = self._astream_text_shared(message, session)
+                async for chunk in stream:
+                    yield chunk
+            except Exception as e:
+                mark_error(e)
+                error_msg = f"❌ Llama 3.3 işlem hatası: {str(e)}"
+                logger.error(error_msg)
+                yield error_msg
+    
+    async def _astream_completion(self, site: str, model: str, messages: List[Dict[str, Any]]) -> AsyncIterator[str]:
+        """AsyncGroq stream'inden gelen metin parçaları (token muhasebesiyle)"""
+        async for chunk in astream_complete(
+            self.async_groq_client,
+            site,
+            model=model,
+            messages=messages,
+            max_tokens=self.settings.max_tokens,
+            temperature=self.settings.temperature
+        ):
+            yield chunk
+    
+    def _stream_completion(self, site: str, model: str, messages: List[Dict[str, Any]]) -> Iterator[str]:
+        """_astream_completion'ın senkron karşılığı"""
+        return stream_complete(
+            self.groq_client,
+            site,
+            model=model,
+            messages=messages,
+            max_tokens=self.settings.max_tokens,
+            temperature=self.settings.temperature
+        )
+    
+    async def _astream_text_shared(self, message: str, session: SessionState) -> AsyncIterator[str]:
+        """_stream_text_shared'in async karşılığı"""
+        ran = []
+        
+        def run() -> AsyncIterator[str]:
+            ran.append(True)
+            return self._astream_text(message, session)
+        
+        parts = []
+        async for chunk in self.message_flights.astream(self._message_flight_key(message, session), run):
+            parts.append(chunk)
+            yield chunk
+        if not ran:
+            await self._asave(session, message, "".join(parts))
+    
+    async def _astream_text(self, message: str, session: SessionState) -> AsyncIterator[str]:
+        """_stream_text'in async karşılığı"""
+        decision = self._route(message)
+        if decision and decision.route == ROUTE_TOOL:
+            # Yerel tool'lar CPU işi; web_search senkron LLM çağrısı yapar
+            response = await asyncio.to_thread(self._run_routed_tool, decision, message)
+            await self._asave(session, message, response)
+            yield response
+            return
+        if decision and decision.route == ROUTE_DIRECT:
+            stream = self._astream_direct(message, session)
+        elif decision and decision.route == ROUTE_PARALLEL:
+            stream = self._astream_parallel(decision, message, session)
+        else:
+            stream = self._astream_with_langchain(message, session)
+        async for chunk in stream:
+            yield chunk
+    
+    async def _astream_parallel(self, decision: RouteDecision, message: str, session: SessionState) -> AsyncIterator[str]:
+        """_stream_parallel'in async karşılığı"""
+        calls = [(tool, self._tool_input(tool, decision, message)) for tool in decision.tools]
+        results = await self.tool_runner.arun(calls)
+        parts = []
+        async for chunk in self._astream_completion("parallel_synthesis", self._text_model(session), self._parallel_messages(message, results)):
+            parts.append(chunk)
+            yield chunk
+        await self._asave(session, message, "".join(parts))
+    
+    async def _astream_direct(self, message: str, session: SessionState) -> AsyncIterator[str]:
+        """_stream_direct'in async karşılığı"""
+        cache_key = self._response_cache_key(message, session)
+        if cache_key:
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                await self._asave(session, message, cached)
+                logger.info("⚡ Response cache hit")
+                yield cached
+                return
+        
+        parts = []
+        async for chunk in self._astream_completion("direct", self._text_model(session), self._direct_messages(message, session)):
+            parts.append(chunk)
+            yield chunk
+        response = "".join(parts)
+        await self._asave(session, message, response)
+        if cache_key:
+            await asyncio.to_thread(self.response_cache.set, cache_key, response)
+    
+    async def _astream_with_langchain(self, message: str, session: SessionState) -> AsyncIterator[str]:
+        """_stream_with_langchain'in async karşılığı: agent.ainvoke + asyncio kuyruğu"""
+        cache_key = self._response_cache_key(message, session)
+        if cache_key:
+            cached = await asyncio.to_thread(self.response_cache.get, cache_key)
+            if cached is not None:
+                await self._asave(session, message, cached)
+                logger.info("⚡ Response cache hit")
+                yield cached
+                return
+        
+        if not self._agent_available(session):
+            async for chunk in self._astream_fallback(message, self._text_model(session), session):
+                yield chunk
+            return
+        
+        chunks: "asyncio.Queue[Any]" = asyncio.Queue()
+        handler = FinalAnswerStreamHandler(AsyncQueueWriter(chunks))
+        task = asyncio.ensure_future(
+            self._agent_for(session).ainvoke(
+                self._agent_inputs(message, session),
+                config={"callbacks": [handler, UsageCallbackHandler("agent")]}
             )
-            
-            response = completion.choices[0].message.content
-            logger.info("✅ Maverick Vision analizi tamamlandı")
-            return response
-            
+        )
+        task.add_done_callback(lambda _: chunks.put_nowait(STREAM_END))
+        
+        while True:
+            chunk = await chunks.get()
+            if chunk is STREAM_END:
+                break
+            yield chunk
+        
+        try:
+            output = task.result().get("output", "")
+        except Exception as e:
+            logger.error(f"❌ LangChain Agent hatası: {str(e)}")
+            async for chunk in self._astream_fallback(message, self._text_model(session), session):
+                yield chunk
+            return
+        
+        await self._asave(session, message, output)
+        if cache_key:
+            await asyncio.to_thread(self.response_cache.set, cache_key, output)
+        if output.startswith(handler.streamed_text):
+            remainder = output[len(handler.streamed_text):]
+            if remainder:
+                yield remainder
+        logger.info("✅ Maverick LangChain async stream tamamlandı")
+    
+    async def _astream_fallback(self, message: str, model: str,
+                                session: Optional[SessionState] = None) -> AsyncIterator[str]:
+        """_stream_fallback'in async karşılığı"""
+        try:
+            yield "⚠️ Fallback mode:\n\n"
+            async for chunk in self._astream_completion("fallback", model, self._fallback_messages(message, session)):
+                yield chunk
+        except Exception as fallback_e:
+            yield f"❌ Sistem hatası: {str(fallback_e)}"
+    
+    async def _astream_with_vision(self, message: str, image, session: SessionState,
+                                   remember: bool = True) -> AsyncIterator[str]:
+        """_stream_with_vision'ın async karşılığı"""
+        prepared = await asyncio.wrap_future(prepare_image_async(image))
+        backend, model = self._vision_model(session)
+        request_hash = VisionCache.request_key(backend, model, normalize_message(message), self._reply_language(message))
+        display_message = message if message.strip() else "Görsel analizi"
+        
+        stream = None
+        if self.vision_cache is not None:
+            cached = await asyncio.to_thread(self.vision_cache.get, prepared.pixel_hash, prepared.phash, request_hash)
+            if cached is not None:
+                response, tier = cached
+                logger.info(f"⚡ Vision cache hit ({tier})")
+                if remember:
+                    await self._asave(session, display_message, response)
+                yield response
+                return
+            if message.strip() and self.settings.vision_reuse_descriptions:
+                description = await asyncio.to_thread(self.vision_cache.get_description,
+                                                      prepared.pixel_hash, prepared.phash)
+                if description:
+                    logger.info("⚡ Vision açıklaması yeniden kullanıldı")
+                    stream = self._astream_completion("vision:description", self._text_model(session),
+                                                      self._description_messages(message, description))
+        if stream is None:
+            stream = self.vision_flights.astream(
+                (prepared.pixel_hash, request_hash),
+                lambda: self._astream_vision_backend(backend, model, message, prepared)
+            )
+        
+        parts = []
+        try:
+            async for chunk in stream:
+                parts.append(chunk)
+                yield chunk
+        except Exception as e:
+            label = "Meta-Llama Maverick Vision" if backend == "groq" else "Görsel analizi"
+            yield f"❌ {label} hatası: {str(e)}"
+            return
+        
+        response = "".join(parts)
+        if not response:
+            return
+        if remember:
+            await self._asave(session, display_message, response)
+        if self.vision_cache is not None:
+            await asyncio.to_thread(self._store_vision, prepared, request_hash, response, not message.strip())
+        logger.info(f"✅ Vision async stream tamamlandı ({backend}, {prepared!r})")
+    
+    def _astream_vision_backend(self, backend: str, model: str, message: str,
+                                prepared: PreparedImage) -> AsyncIterator[str]:
+        """_stream_vision_backend'in async karşılığı"""
+        if backend == "groq":
+            return self._astream_completion("vision:groq", model, self._build_vision_messages(message, prepared))
+        return get_resilience().astream(
+            "vision:gemini", model, lambda selected: self._astream_gemini_vision(selected, message, prepared))
+    
+    async def _astream_gemini_vision(self, model: str, message: str, prepared: PreparedImage) -> AsyncIterator[str]:
+        """Gemini streamGenerateContent (SSE) çağrısının async karşılığı"""
+        url, data = self._gemini_request(model, message, prepared)
+        client = get_registry().gemini_async_client
+        await get_scheduler().aacquire(model, self._gemini_cost(message))
+        started = time.perf_counter()
+        usage: Dict[str, Any] = {}
+        parts = []
+        try:
+            async with client.stream("POST", url, content=json.dumps(data)) as response:
+                if response.status_code != 200:
+                    get_scheduler().observe_headers(model, response.status_code, response.headers)
+                    body = (await response.aread()).decode("utf-8", "replace")
+                    raise UpstreamHTTPError(f"Gemini Vision API hatası: {response.status_code} - {body}",
+                                            response.status_code, parse_retry_after(response.headers.get("retry-after")))
+                async for line in response.aiter_lines():
+                    for text in self._gemini_sse_texts(line, usage):
+                        parts.append(text)
+                        yield text
         except Exception as e:
-            return f"❌ Meta-Llama Maverick Vision hatası: {str(e)}"
+            record_llm_error("vision:gemini", model, started, e, span_name="gemini_http")
+            raise
+        record_gemini_usage("vision:gemini", usage, data, "".join(parts), started, model)
     
-    def get_conversation_history(self) -> List[Dict[str, Any]]:
-        """Konuşma geçmişini al - LangChain memory'den"""
-        if self.memory and hasattr(self.memory, 'chat_memory'):
-            messages = self.memory.chat_memory.messages
+    async def astream_images(self, message: str, images: List[Any], session_id: Optional[str] = None) -> AsyncIterator[Dict[str, Any]]:
+        """stream_images'ın async karşılığı; eşzamanlılık semaphore ile sınırlı"""
+        with request_scope("images", route="vision", images=len(images)), work_scope(session_id=session_id):
+            async for event in self._astream_images(message, images, session_id):
+                yield event
+    
+    async def _astream_images(self, message: str, images: List[Any],
+                              session_id: Optional[str]) -> AsyncIterator[Dict[str, Any]]:
+        """astream_images'ın gövdesi"""
+        session = await self._asession(session_id)
+        if len(images) == 1:
+            async for chunk in self._astream_with_vision(message, images[0], session):
+                yield {"type": "merged", "text": chunk}
+            return
+        
+        semaphore = asyncio.Semaphore(self.settings.vision_concurrency)
+        
+        async def analyze(index: int, image) -> Tuple[int, str]:
+            async with semaphore:
+                parts = []
+                try:
+                    async for chunk in self._astream_with_vision(message, image, session, remember=False):
+                        parts.append(chunk)
+                except Exception as e:
+                    return index, f"❌ Görsel analizi hatası: {str(e)}"
+                return index, "".join(parts)
+        
+        results: List[str] = [""] * len(images)
+        for next_done in asyncio.as_completed([analyze(i, image) for i, image in enumerate(images)]):
+            index, text = await next_done
+            results[index] = text
+            yield {"type": "image", "index": index, "text": text}
+        logger.info(f"✅ {len(images)} görsel analiz edildi (async)")
+        
+        parts = []
+        streamed = False
+        try:
+            async for chunk in self._astream_completion("vision:merge", self._text_model(session),
+                                                        self._merge_messages(message, results)):
+                streamed = True
+                parts.append(chunk)
+                yield {"type": "merged", "text": chunk}
+        except Exception as e:
+            logger.error(f"❌ Birleştirme hatası: {str(e)}")
+            if not streamed:
+                sections = self._merge_sections(results)
+                parts.append(sections)
+                yield {"type": "merged", "text": sections}
+        display_message = f"[{len(images)} görsel] {message}".strip()
+        await self._asave(session, display_message, "".join(parts))
+    
+    def remember(self, message: str, response: str, session_id: Optional[str] = None) -> None:
+        """Agent dışında üretilen bir yanıtı oturum hafızasına yaz"""
+        self.sessions.get(session_id).memory.save_context({"input": message}, {"output": response})
+    
+    def get_conversation_history(self, session_id: Optional[str] = None, offset: int = 0,
+                                 limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Konuşma geçmişinin bir sayfası - depodan (gerçek zaman damgası ve token ile), yoksa oturum memory'sinden"""
+        limit = limit or self.settings.history_page_size
+        if self.conversation_store is not None:
+            return [msg.as_dict() for msg in
+                    self.conversation_store.page(session_id or DEFAULT_SESSION_ID, offset, limit)]
+        session = self.sessions.peek(session_id)
+        if session and hasattr(session.memory, 'chat_memory'):
+            messages = session.memory.chat_memory.messages[offset:offset + limit]
             history = []
             for msg in messages:
                 history.append({
@@ -252,28 +1289,74 @@ Türkçe'de detaylı ve yapılandırılmış yanıt ver.
             return history
         return []
     
-    def clear_memory(self):
+    def history_count(self, session_id: Optional[str] = None) -> int:
+        """Oturumdaki toplam mesaj sayısı (depoda indeksli sayaç, O(1))"""
+        if self.conversation_store is not None:
+            return self.conversation_store.count(session_id or DEFAULT_SESSION_ID)
+        session = self.sessions.peek(session_id)
+        return len(session.memory.chat_memory.messages) if session else 0
+    
+    def clear_memory(self, session_id: Optional[str] = None):
         """Konuşma geçmişini temizle - eski interface uyumluluğu için"""
-        return self.clear_history()
+        return self.clear_history(session_id)
     
-    def clear_history(self):
-        """LangChain memory'yi temizle"""
-        if self.memory:
-            self.memory.clear()
+    def clear_history(self, session_id: Optional[str] = None):
+        """Sadece bu oturumun LangChain memory'sini temizle"""
+        session = self.sessions.peek(session_id)
+        if session:
+            session.memory.clear()
+        elif self.conversation_store is not None:
+            # Bu süreçte yüklenmemiş oturum: yalnızca depodaki geçmişi gizle
+            self.conversation_store.clear(session_id or DEFAULT_SESSION_ID)
         logger.info("🗑️ Meta-Llama Maverick hafızası temizlendi!")
         return "🗑️ Meta-Llama Maverick hafızası temizlendi!"
     
-    def get_agent_info(self) -> str:
+    def _collect_metrics(self) -> List[Any]:
+        """/metrics için okuma anındaki cache, oturum ve model sayaçları"""
+        hits = Counter("cache_hits_total", "Cache isabetleri", ("cache", "tier"))
+        misses = Counter("cache_misses_total", "Cache ıskaları", ("cache",))
+        hit_ratio = Gauge("cache_hit_ratio", "Cache isabet oranı", ("cache",))
+        if self.response_cache is not None:
+            stats = self.response_cache.stats()
+            hits.inc(stats["memory_hits"], cache="response", tier="memory")
+            hits.inc(stats["disk_hits"], cache="response", tier="disk")
+            misses.inc(stats["misses"], cache="response")
+            hit_ratio.set(stats["hit_rate"], cache="response")
+        if self.vision_cache is not None:
+            stats = self.vision_cache.stats()
+            hits.inc(stats["exact_hits"], cache="vision", tier="exact")
+            hits.inc(stats["perceptual_hits"], cache="vision", tier="perceptual")
+            hits.inc(stats["description_hits"], cache="vision", tier="description")
+            misses.inc(stats["misses"], cache="vision")
+            hit_ratio.set(stats["hit_rate"], cache="vision")
+        sessions = Gauge("agent_sessions_active", "Hafızada tutulan oturum sayısı")
+        sessions.set(len(self.sessions))
+        models = Gauge("agent_models_built", "Kurulmuş model/agent örnekleri")
+        models.set(len(self.models.built()))
+        metrics: List[Any] = [hits, misses, hit_ratio, sessions, models]
+        if self.router is not None:
+            routes = Counter("router_decisions_total", "Yönlendirme kararları", ("route",))
+            for route, count in self.router.stats()["routes"].items():
+                routes.inc(count, route=route)
+            metrics.append(routes)
+        return metrics
+    
+    def get_agent_info(self, session_id: Optional[str] = None) -> str:
         """Agent bilgilerini al"""
-        tool_count = len(create_tools()) if create_tools() else 0
-        memory_count = len(self.get_conversation_history())
+        tool_count = len(self.tools_by_name)
+        memory_count = self.history_count(session_id)
+        usage = get_usage_tracker().stats()
+        prompt_tokens = int(sum(site["prompt_tokens"] for site in usage.values()))
+        completion_tokens = int(sum(site["completion_tokens"] for site in usage.values()))
+        session = self.sessions.peek(session_id)
+        _, vision_model = self._vision_model(session)
         
         return f"""
 🦙 **Meta-Llama Maverick + LangChain Agent**
 
 📊 **Aktif Modeller:**
-- 📝 Text: `{self.current_text_model}`
-- 👁️ Vision: `{self.current_vision_model}`
+- 📝 Text: `{self._text_model(session)}`
+- 👁️ Vision: `{vision_model}`
 - 🛠️ Tool: `{self.settings.tool_model}`
 
 🎯 **Maverick Özellikleri:**
@@ -284,6 +1367,8 @@ Türkçe'de detaylı ve yapılandırılmış yanıt ver.
 - ✅ Vision analysis + OCR
 - ✅ Multi-language support
 - ✅ Conversation memory ({memory_count} mesaj)
+- 🧱 Hazır model örnekleri: {len(self.models.built())}/{len(self.models.available)}
+- 📏 Prompt profili: `{self.settings.prompt_profile}` ({prompt_tokens} prompt / {completion_tokens} completion token)
 
 🛠️ **Mevcut Tool'lar:** {tool_count} adet
 - ⏰ Akıllı zaman/tarih işlemi
@@ -0,0 +1,247 @@
+"""
+Token bütçeli konuşma hafızası.
+Her mesajın tahmini token sayısı tutulur; bütçe aşılınca en eski turlar hafızadan
+çıkarılıp arka planda çalışan bir özetleyiciyle "şu ana kadarki konuşma" özetine katlanır.
+Özet, kullanıcıya yanıt gönderildikten sonra üretilir; prompt boyutu konuşma uzadıkça sabit kalır.
+ConversationBufferWindowMemory ile aynı arayüzü (load_memory_variables, save_context,
+clear, chat_memory) sunar.
+
+Bir ConversationStore verilirse her tur gerçek zaman damgası ve token sayısıyla depoya eklenir, özet de
+kapsadığı son mesajla birlikte kaydedilir. Yeni süreçte (yeniden başlatma, başka worker) hafıza
+tüm geçmişten değil, özet + özetten sonraki bütçe içi son mesajlardan kurulur.
+"""
+
+import math
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Çok dilli metinde ortalama karakter/token oranı (tokenizer'sız tahmin)
+CHARS_PER_TOKEN = 3.5
+# Mesaj başına rol/ayraç ek yükü
+MESSAGE_OVERHEAD_TOKENS = 4
+# Bütçe aşılınca verbatim kısım bu orana inene kadar eski turlar katlanır (her turda özetlememek için)
+FOLD_TARGET_RATIO = 0.6
+
+SUMMARY_PREFIX = "Önceki konuşmanın özeti: "
+
+Summarizer = Callable[[str, List[BaseMessage]], str]
+
+_ROLE_MESSAGES = {"human": HumanMessage, "assistant": AIMessage}
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+class MessageHistory:
+    """Verbatim mesaj listesi (InMemoryChatMessageHistory arayüzü; runnables zincirini import etmez)"""
+
+    def __init__(self):
+        self.messages: List[BaseMessage] = []
+
+    def add_messages(self, messages: List[BaseMessage]) -> None:
+        self.messages.extend(messages)
+
+    def clear(self) -> None:
+        self.messages = []
+
+
+def estimate_tokens(text: str) -> int:
+    """Metnin yaklaşık token sayısı"""
+    return MESSAGE_OVERHEAD_TOKENS + math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    """Tüm oturumların paylaştığı küçük özetleme havuzu"""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="memory-summary")
+        return _executor
+
+
+class TokenBudgetMemory:
+    """Token bütçesini aşan eski turları arka planda özete katlayan hafıza"""
+
+    def __init__(self, summarizer: Summarizer, token_budget: int = 1500, memory_key: str = "chat_history",
+                 store: Optional[Any] = None, session_id: Optional[str] = None):
+        self.summarizer = summarizer
+        self.token_budget = token_budget
+        self.memory_key = memory_key
+        self.chat_memory = MessageHistory()
+        self.summary = ""
+        self._tokens: List[int] = []
+        self._pending: List[BaseMessage] = []  # katlanmayı bekleyen (özeti henüz hazır olmayan) mesajlar
+        self._summarizing = False
+        self._generation = 0  # clear() sonrası biten eski özet işlerini yok saymak için
+        self._lock = threading.Lock()
+        self.store = store
+        self.session_id = session_id
+        self._stored_count = 0  # depoda görünen mesaj sayısı (başka süreç yazdı mı kontrolü)
+        self._next_seq = 0  # depodaki bir sonraki mesajın sıra numarası
+        if self.store is not None:
+            with self._lock:
+                self._restore()
+
+    def _restore(self) -> None:
+        """Özeti ve özetten sonraki bütçe içi son mesajları depodan yükle (kilit tutulurken çağrılır)"""
+        try:
+            count = self.store.count(self.session_id)
+            summary, through = self.store.load_summary(self.session_id)
+            window = self.store.tail(self.session_id, self.token_budget, after_seq=through) if count else []
+        except Exception as e:
+            logger.warning(f"⚠️ Konuşma geçmişi depodan yüklenemedi: {str(e)}")
+            return
+        # Pencere bir turun ortasından başlamasın
+        while len(window) > 2 and window[0].role != "human":
+            window = window[1:]
+        self.summary = summary
+        self.chat_memory.messages = [_ROLE_MESSAGES[msg.role](content=msg.content) for msg in window]
+        self._tokens = [msg.tokens for msg in window]
+        self._pending = []
+        self._stored_count = count
+        self._next_seq = window[-1].seq + 1 if window else through
+        # Uçuştaki özet işleri eski duruma ait
+        self._generation += 1
+        if window or summary:
+            logger.info(f"🗄️ Oturum geçmişi yüklendi: {self.session_id} ({len(window)}/{count} mesaj"
+                        + (", özetli)" if summary else ")"))
+
+    @property
+    def memory_variables(self) -> List[str]:
+        return [self.memory_key]
+
+    @property
+    def token_count(self) -> int:
+        """Prompt'a girecek hafızanın tahmini token sayısı"""
+        with self._lock:
+            pending = sum(estimate_tokens(msg.content) for msg in self._pending)
+            summary = estimate_tokens(self.summary) if self.summary else 0
+            return summary + pending + sum(self._tokens)
+
+    def load_memory_variables(self, inputs: Optional[Dict[str, Any]] = None) -> Dict[str, List[BaseMessage]]:
+        """Özet (varsa) + özeti bekleyen mesajlar + bütçe içindeki son mesajlar"""
+        with self._lock:
+            messages: List[BaseMessage] = []
+            if self.summary:
+                messages.append(SystemMessage(content=f"{SUMMARY_PREFIX}{self.summary}"))
+            messages.extend(self._pending)
+            messages.extend(self.chat_memory.messages)
+        return {self.memory_key: messages}
+
+    def refresh(self) -> None:
+        """Oturuma başka bir süreç/worker yazdıysa hafızayı depodan yeniden kur (istek başına bir kez çağrılır)"""
+        if self.store is None:
+            return
+        with self._lock:
+            self._sync()
+
+    def _sync(self) -> None:
+        try:
+            count = self.store.count(self.session_id)
+        except Exception as e:
+            logger.warning(f"⚠️ Konuşma deposu okunamadı: {str(e)}")
+            return
+        if count != self._stored_count:
+            self._restore()
+
+    def save_context(self, inputs: Dict[str, Any], outputs: Dict[str, Any]) -> None:
+        """Turu ekle; bütçe aşıldıysa eski turları arka plan özetine devret"""
+        human = str(inputs.get("input", ""))
+        ai = str(outputs.get("output", ""))
+        with self._lock:
+            self.chat_memory.add_messages([HumanMessage(content=human), AIMessage(content=ai)])
+            self._tokens.extend([estimate_tokens(human), estimate_tokens(ai)])
+            if self.store is not None:
+                self._persist([("human", human, self._tokens[-2]), ("assistant", ai, self._tokens[-1])])
+            if sum(self._tokens) > self.token_budget:
+                self._fold_oldest()
+            self._schedule_summary()
+
+    def _persist(self, turn: List[Any]) -> None:
+        """Turu depoya ekle; depo hatası yanıtı bozmaz, yalnızca kalıcılık kaybolur"""
+        try:
+            first = self.store.append(self.session_id, turn)
+        except Exception as e:
+            logger.warning(f"⚠️ Tur konuşma deposuna yazılamadı: {str(e)}")
+            return
+        if first != self._next_seq:
+            # Araya başka bir sürecin yazdığı mesajlar girdi; bir sonraki okumada yeniden kurulur
+            self._stored_count = -1
+        else:
+            self._stored_count += len(turn)
+        self._next_seq = first + len(turn)
+
+    def _fold_oldest(self) -> None:
+        """Verbatim kısım hedef orana inene kadar en eski (insan, AI) çiftlerini bekleyenlere taşı"""
+        target = self.token_budget * FOLD_TARGET_RATIO
+        messages = self.chat_memory.messages
+        cut = 0
+        remaining = sum(self._tokens)
+        # Son turu her zaman verbatim tut
+        while remaining > target and cut + 2 < len(messages):
+            remaining -= self._tokens[cut] + self._tokens[cut + 1]
+            cut += 2
+        if not cut:
+            return
+        self._pending.extend(messages[:cut])
+        self.chat_memory.messages = messages[cut:]
+        self._tokens = self._tokens[cut:]
+
+    def _schedule_summary(self) -> None:
+        """Bekleyen mesaj varsa ve çalışan iş yoksa arka planda özetle (kilit tutulurken çağrılır)"""
+        if self._summarizing or not self._pending:
+            return
+        self._summarizing = True
+        batch = list(self._pending)
+        _get_executor().submit(self._summarize, self.summary, batch, self._generation)
+
+    def _summarize(self, previous: str, batch: List[BaseMessage], generation: int) -> None:
+        try:
+            summary = self.summarizer(previous, batch)
+        except Exception as e:
+            logger.warning(f"⚠️ Hafıza özeti üretilemedi: {str(e)}")
+            summary = None
+        with self._lock:
+            self._summarizing = False
+            if generation != self._generation:
+                return
+            if summary:
+                self.summary = summary
+                del self._pending[:len(batch)]
+                if self.store is not None:
+                    self._persist_summary()
+                logger.info(f"🧾 {len(batch)} mesaj özete katlandı (özet ~{estimate_tokens(summary)} token)")
+            else:
+                # Özetleyici başarısız: bütçeyi korumak için mesajları bırak
+                del self._pending[:len(batch)]
+            self._schedule_summary()
+
+    def _persist_summary(self) -> None:
+        """Özeti, kapsadığı son mesajın sırasıyla kaydet (kilit tutulurken çağrılır)"""
+        through = self._next_seq - len(self._pending) - len(self.chat_memory.messages)
+        try:
+            self.store.save_summary(self.session_id, self.summary, through)
+        except Exception as e:
+            logger.warning(f"⚠️ Hafıza özeti depoya yazılamadı: {str(e)}")
+
+    def clear(self) -> None:
+        """Tüm hafızayı ve özeti sil (depoda mesajlar kalır, oturum boş görünür)"""
+        with self._lock:
+            if self.store is not None:
+                try:
+                    self.store.clear(self.session_id)
+                    self._stored_count = 0
+                except Exception as e:
+                    logger.warning(f"⚠️ Konuşma deposu temizlenemedi: {str(e)}")
+            self.chat_memory.clear()
+            self._tokens = []
+            self._pending = []
+            self.summary = ""
+            self._generation += 1
@@ -0,0 +1,214 @@
+"""
+Prometheus metin formatında (text exposition 0.0.4) metrik kaydı, harici bağımlılık yok.
+Counter / Gauge / Histogram etiket değerleri başına sayaç tutar; `/metrics` uç noktası
+`get_metrics().render()` çıktısını döndürür. Okuma anında hesaplanan değerler
+(cache oranları, kuyruk derinliği) collector fonksiyonlarıyla eklenir.
+"""
+
+import math
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+# Saniye; hızlı tool'lardan (ms) uzun LLM stream'lerine (onlarca sn) kadar
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+LabelValues = Tuple[str, ...]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str]) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Metric:
+    """Ortak alanlar: ad, açıklama, etiket adları ve etiket başına değerler"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: Dict[LabelValues, float] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        return tuple(str(labels.get(name, "")) for name in self.labelnames)
+
+    def value(self, **labels: Any) -> float:
+        """Etiket kombinasyonunun güncel değeri"""
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in items]
+
+    def render(self) -> List[str]:
+        return [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"] + self.samples()
+
+
+class Counter(Metric):
+    """Yalnızca artan sayaç"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Artıp azalabilen anlık değer"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels: Any) -> None:
+        with self._lock:
+            self._values[self._key(labels)] = float(value)
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: Any) -> None:
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    """Kümülatif bucket'lı gecikme dağılımı (+ _sum ve _count)"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+        # Etiket başına: bucket sayaçları + [toplam, adet]
+        self._series: Dict[LabelValues, List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [0.0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def count(self, **labels: Any) -> int:
+        """Gözlem sayısı"""
+        with self._lock:
+            series = self._series.get(self._key(labels))
+            return int(series[-1]) if series else 0
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(series)) for key, series in self._series.items())
+        lines = []
+        for key, series in items:
+            for bound, count in zip(self.buckets, series):
+                labels = _format_labels(self.labelnames + ("le",), key + (_format_value(bound),))
+                lines.append(f"{self.name}_bucket{labels} {_format_value(count)}")
+            labels = _format_labels(self.labelnames, key)
+            lines.append(f"{self.name}_sum{labels} {_format_value(series[-2])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(series[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Kayıtlı metrikler + okuma anında çalışan collector'lar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics: Dict[str, Metric] = {}
+        self._collectors: Dict[str, Callable[[], Iterable[Metric]]] = {}
+
+    def _register(self, metric: Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def set_collector(self, name: str, collector: Callable[[], Iterable[Metric]]) -> None:
+        """Okuma anında metrik üreten fonksiyonu (aynı adla tekrar kaydedilirse değiştirerek) ekle"""
+        with self._lock:
+            self._collectors[name] = collector
+
+    def render(self) -> str:
+        """Tüm metrikler Prometheus metin formatında"""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors.items())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for name, collector in collectors:
+            try:
+                for metric in collector():
+                    lines.extend(metric.render())
+            except Exception as e:
+                logger.warning(f"⚠️ Metrik collector hatası ({name}): {str(e)}")
+        return "\n".join(lines) + "\n"
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """Süreç genelindeki metrik kaydı"""
+    return _registry
+
+
+REQUEST_LATENCY = _registry.histogram(
+    "agent_request_duration_seconds", "Mesaj başına uçtan uca süre", ("kind", "route"))
+REQUESTS_IN_FLIGHT = _registry.gauge(
+    "agent_requests_in_flight", "İşlenmekte olan mesaj sayısı")
+LLM_LATENCY = _registry.histogram(
+    "llm_call_duration_seconds", "LLM çağrısı süresi (stream'lerde son parçaya kadar)", ("site", "model"))
+LLM_TOKENS = _registry.counter(
+    "llm_tokens_total", "LLM token sayısı (usage yoksa tahmini)", ("site", "model", "type"))
+LLM_ERRORS = _registry.counter(
+    "llm_errors_total", "Başarısız LLM çağrıları", ("site", "model", "error"))
+TOOL_LATENCY = _registry.histogram(
+    "tool_duration_seconds", "Tool çalışma süresi", ("tool",))
+SPAN_LATENCY = _registry.histogram(
+    "span_duration_seconds", "Span adına göre süre (route, tool, image_prepare, llm, gemini_http)", ("span",))
+ERRORS = _registry.counter(
+    "agent_errors_total", "Aşamaya göre hata sayısı", ("stage",))
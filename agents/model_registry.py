@@ -0,0 +1,61 @@
+"""
+Önceden kurulmuş LLM + agent executor örneklerinin cache'i.
+Her text modeli için bir ChatGroq ve bir agent executor ilk kullanımda bir kez kurulur;
+sonraki model değişimleri O(1) sözlük aramasıdır ve diğer oturumları etkilemez.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ModelEntry:
+    """Bir modelin LLM ve agent örnekleri"""
+
+    def __init__(self, model_name: str, llm: Any, agent: Any):
+        self.model_name = model_name
+        self.llm = llm
+        self.agent = agent
+
+
+class ModelRegistry:
+    """Model adı → (ChatGroq, agent executor) tembel cache'i"""
+
+    def __init__(self, available: Iterable[str], build_llm: Callable[[str], Any], build_agent: Callable[[Any], Any]):
+        self.available: List[str] = list(available)
+        self._build_llm = build_llm
+        self._build_agent = build_agent
+        self._entries: Dict[str, ModelEntry] = {}
+        self._lock = threading.Lock()
+
+    def validate(self, model_name: str) -> str:
+        """Model listede değilse ValueError"""
+        if model_name not in self.available:
+            raise ValueError(f"Bilinmeyen model: {model_name}")
+        return model_name
+
+    def get(self, model_name: str) -> ModelEntry:
+        """Modelin örneklerini döndür; ilk çağrıda kur"""
+        entry = self._entries.get(model_name)
+        if entry is not None:
+            return entry
+        self.validate(model_name)
+        with self._lock:
+            entry = self._entries.get(model_name)
+            if entry is None:
+                llm = self._build_llm(model_name)
+                entry = ModelEntry(model_name, llm, self._build_agent(llm))
+                self._entries[model_name] = entry
+                logger.info(f"🧱 Model örnekleri kuruldu: {model_name}")
+            return entry
+
+    def peek(self, model_name: str) -> Optional[ModelEntry]:
+        """Kurulmuşsa örnekleri döndür, kurmaz"""
+        return self._entries.get(model_name)
+
+    def built(self) -> List[str]:
+        """Şu ana kadar kurulmuş modeller"""
+        return list(self._entries)
@@ -0,0 +1,116 @@
+"""
+Birbirinden bağımsız tool çağrılarını eşzamanlı çalıştırma.
+Router birden çok niyet bulduğunda tool'lar ReAct döngüsündeki gibi sırayla değil,
+sınırlı bir thread havuzunda aynı anda çalışır; her birinin kendi zaman aşımı vardır.
+Sonuçlar tek bir sentez çağrısına girer.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+from agents.tracing import propagate
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Girdisi sadece kullanıcı mesajı olan, birbirinin çıktısına ihtiyaç duymayan tool'lar
+PARALLEL_SAFE_TOOLS = frozenset({
+    "get_current_time", "text_analyzer", "text_summarizer", "language_detector", "web_search",
+})
+
+
+class ToolResult:
+    """Tek tool çağrısının sonucu"""
+
+    def __init__(self, name: str, output: Optional[str] = None, elapsed_ms: float = 0.0,
+                 error: Optional[str] = None, timed_out: bool = False):
+        self.name = name
+        self.output = output
+        self.elapsed_ms = elapsed_ms
+        self.error = error
+        self.timed_out = timed_out
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and not self.timed_out
+
+    def as_text(self) -> str:
+        """Sentez prompt'u için okunabilir çıktı"""
+        if self.timed_out:
+            return "⏱️ Zaman aşımı: sonuç alınamadı"
+        if self.error:
+            return f"❌ Hata: {self.error}"
+        return self.output or ""
+
+    def __repr__(self) -> str:
+        status = "ok" if self.ok else ("timeout" if self.timed_out else "error")
+        return f"ToolResult({self.name!r}, {status}, {self.elapsed_ms:.0f} ms)"
+
+
+class ParallelToolRunner:
+    """Tool'ları sınırlı havuzda eşzamanlı çalıştırır"""
+
+    def __init__(self, tools_by_name: Dict[str, Any], max_workers: int = 8, timeout: float = 20.0):
+        self.tools_by_name = tools_by_name
+        self.timeout = timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tool")
+
+    def _call(self, name: str, tool_input: str) -> ToolResult:
+        started = time.perf_counter()
+        try:
+            output = self.tools_by_name[name].func(tool_input)
+            return ToolResult(name, output, (time.perf_counter() - started) * 1000)
+        except Exception as e:
+            return ToolResult(name, None, (time.perf_counter() - started) * 1000, error=str(e))
+
+    def run(self, calls: List[Tuple[str, str]]) -> List[ToolResult]:
+        """(tool adı, girdi) çiftlerini aynı anda çalıştır; sonuçlar çağrı sırasıyla döner"""
+        started = time.perf_counter()
+        futures = [self.executor.submit(propagate(self._call), name, tool_input) for name, tool_input in calls]
+        wait(futures, timeout=self.timeout)
+        results = []
+        for (name, _), future in zip(calls, futures):
+            if future.done():
+                results.append(future.result())
+            else:
+                # Thread durdurulamaz; sonucu beklemeden zaman aşımı olarak işaretle
+                future.cancel()
+                results.append(ToolResult(name, elapsed_ms=self.timeout * 1000, timed_out=True))
+        self._log(results, started)
+        return results
+
+    async def arun(self, calls: List[Tuple[str, str]]) -> List[ToolResult]:
+        """run'ın async karşılığı: event loop'u bloklamadan aynı havuzu kullanır"""
+        started = time.perf_counter()
+        loop = asyncio.get_running_loop()
+        futures = [loop.run_in_executor(self.executor, propagate(self._call), name, tool_input) for name, tool_input in calls]
+        done, _ = await asyncio.wait(futures, timeout=self.timeout)
+        results = []
+        for (name, _), future in zip(calls, futures):
+            if future in done:
+                results.append(future.result())
+            else:
+                future.cancel()
+                results.append(ToolResult(name, elapsed_ms=self.timeout * 1000, timed_out=True))
+        self._log(results, started)
+        return results
+
+    @staticmethod
+    def _log(results: List[ToolResult], started: float) -> None:
+        wall_ms = (time.perf_counter() - started) * 1000
+        serial_ms = sum(result.elapsed_ms for result in results)
+        logger.info(f"🔀 Paralel tool'lar: {results} | duvar={wall_ms:.0f} ms, seri toplam={serial_ms:.0f} ms")
+
+
+def synthesis_prompt(message: str, results: List[ToolResult]) -> str:
+    """Tool çıktılarını tek yanıtta birleştirme prompt'u"""
+    sections = "\n\n".join(f"### {result.name}\n{result.as_text()}" for result in results)
+    return (
+        f"Kullanıcı mesajı: {message}\n\n"
+        f"Bu mesaj için şu tool'lar eşzamanlı çalıştırıldı:\n\n{sections}\n\n"
+        "Tool sonuçlarını kullanarak kullanıcının isteğinin tüm parçalarını tek, düzenli bir yanıtta cevapla. "
+        "Sonucu alınamayan tool'ları kısaca belirt."
+    )
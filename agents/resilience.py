@@ -0,0 +1,612 @@
+"""
+LLM çağrıları için dayanıklılık katmanı; completions.py ve Gemini çağrıları buradan geçer.
+- 429/5xx ve bağlantı/zaman aşımı hatalarında jitter'lı üstel geri çekilmeyle yeniden deneme
+  (retry-after başlığına uyulur, toplam bekleme bütçesi aşılmaz)
+- Model başına circuit breaker: art arda hatalarda model bir süre çağrılmaz; ikincil model
+  tanımlıysa istek ona yönlendirilir (failover)
+- İsteğe bağlı hedging: birincil model kendi p95 gecikmesi içinde yanıt vermezse aynı istek
+  ikincil modele de gönderilir, ilk gelen kullanılır. Stream'lerde yarış ilk parçaya kadardır;
+  kullanıcıya bir parça yazıldıktan sonra yeniden deneme veya hedge yapılmaz.
+"""
+
+import asyncio
+import math
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, AsyncIterator, Awaitable, Callable, Deque, Dict, Iterator, Optional, Tuple, TypeVar
+
+import httpx
+import requests
+
+from agents.metrics import get_metrics
+from agents.tracing import propagate, record_span
+from config.settings import Settings, get_settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS = frozenset({408, 425, 429})
+# groq SDK'nın durum kodu taşımayan geçici hataları (SDK'yı import etmeden sınıf adıyla)
+RETRYABLE_ERROR_NAMES = frozenset({"APIConnectionError", "APITimeoutError"})
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+CIRCUIT_LEVELS = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_metrics = get_metrics()
+LLM_RETRIES = _metrics.counter("llm_retries_total", "Yeniden denenen LLM çağrıları", ("site", "model"))
+LLM_FAILOVERS = _metrics.counter(
+    "llm_failovers_total", "Circuit açık olduğu için ikincil modele yönlendirilen çağrılar", ("site", "model", "secondary"))
+LLM_HEDGES = _metrics.counter(
+    "llm_hedges_total", "İkincil modele gönderilen hedge istekleri", ("site", "model", "secondary"))
+LLM_HEDGE_WINS = _metrics.counter(
+    "llm_hedge_wins_total", "Hedge'lenmiş çağrılarda kazanan taraf", ("site", "model", "winner"))
+HEDGE_DELAY = _metrics.gauge("llm_hedge_delay_seconds", "Güncel hedge gecikmesi (p95 tabanlı)", ("model", "kind"))
+CIRCUIT_STATE = _metrics.gauge("llm_circuit_state", "Circuit durumu (0 kapalı, 1 yarı açık, 2 açık)", ("model",))
+
+
+class UpstreamHTTPError(RuntimeError):
+    """SDK'sız HTTP çağrılarında (Gemini) durum kodunu ve retry-after'ı taşıyan hata"""
+
+    def __init__(self, message: str, status_code: int, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(RuntimeError):
+    """Modelin circuit'i açık; çağrı yapılmadan reddedildi"""
+
+    def __init__(self, model: str):
+        super().__init__(f"{model} geçici olarak devre dışı (circuit açık)")
+        self.model = model
+
+
+def status_code(error: BaseException) -> Optional[int]:
+    """Hatadaki HTTP durum kodu (SDK, httpx ve requests hataları)"""
+    status = getattr(error, "status_code", None)
+    if status is None:
+        status = getattr(getattr(error, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def is_retryable(error: BaseException) -> bool:
+    """429, 408, 5xx ve bağlantı/zaman aşımı hataları geçicidir"""
+    if isinstance(error, CircuitOpenError):
+        return False
+    status = status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS or status >= 500
+    if type(error).__name__ in RETRYABLE_ERROR_NAMES:
+        return True
+    return isinstance(error, (httpx.TransportError, requests.exceptions.ConnectionError,
+                              requests.exceptions.Timeout, ConnectionError, TimeoutError))
+
+
+def parse_retry_after(value: Any) -> Optional[float]:
+    """retry-after başlığı (saniye); tarih biçimi desteklenmez"""
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Sunucunun önerdiği bekleme süresi"""
+    explicit = getattr(error, "retry_after", None)
+    if explicit is not None:
+        return float(explicit)
+    headers = getattr(getattr(error, "response", None), "headers", None)
+    return parse_retry_after(headers.get("retry-after")) if headers is not None else None
+
+
+class RetryPolicy:
+    """Deneme sayısı, full-jitter üstel bekleme ve çağrı başına toplam bekleme bütçesi"""
+
+    def __init__(self, max_attempts: int = 3, base_delay: float = 0.25, max_delay: float = 4.0,
+                 budget: float = 10.0):
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.budget = budget
+
+    def delay(self, attempt: int, error: BaseException) -> float:
+        hinted = retry_after(error)
+        if hinted is not None:
+            return min(hinted, self.max_delay)
+        return random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """Art arda `failure_threshold` geçici hatada açılır; `reset_timeout` sonra tek deneme çağrısına izin verir"""
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Çağrı yapılabilir mi? Yarı açıkta aynı anda yalnızca bir deneme çağrısı geçer"""
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_timeout:
+                self._set(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def is_open(self) -> bool:
+        """Açık ve bekleme süresi dolmamış (deneme hakkını tüketmeden kontrol)"""
+        with self._lock:
+            return self.state == OPEN and time.monotonic() - self.opened_at < self.reset_timeout
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.failures = 0
+            self._probing = False
+            if self.state != CLOSED:
+                self._set(CLOSED)
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                if self.state != OPEN:
+                    self._set(OPEN)
+
+    def release(self) -> None:
+        """Sonucu bilinmeyen (iptal edilen) deneme çağrısının hakkını geri ver"""
+        with self._lock:
+            self._probing = False
+
+    def _set(self, state: str) -> None:
+        self.state = state
+        CIRCUIT_STATE.set(CIRCUIT_LEVELS[state], model=self.name)
+        if state == OPEN:
+            logger.warning(f"🚧 Circuit açıldı: {self.name} ({self.failures} ardışık hata, {self.reset_timeout:.0f} sn)")
+        else:
+            logger.info(f"🚦 Circuit {state}: {self.name}")
+
+
+class LatencyWindow:
+    """Son N gecikmenin kayan penceresi (hedge gecikmesi için yüzdelik)"""
+
+    def __init__(self, size: int = 200):
+        self._samples: Deque[float] = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, q: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        return samples[min(len(samples) - 1, max(0, math.ceil(q / 100 * len(samples)) - 1))]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._samples)
+
+
+class Resilience:
+    """Retry + circuit breaker + hedging politikaları ve model başına durum"""
+
+    def __init__(self, settings: Optional[Settings] = None):
+        settings = settings or get_settings()
+        self.policy = RetryPolicy(settings.llm_max_attempts, settings.llm_retry_base_delay,
+                                  settings.llm_retry_max_delay, settings.llm_retry_budget)
+        self.failure_threshold = settings.circuit_failure_threshold
+        self.reset_timeout = settings.circuit_reset_timeout
+        self.secondaries: Dict[str, str] = dict(settings.llm_secondary_models)
+        self.hedge_enabled = settings.hedge_enabled
+        self.hedge_percentile = settings.hedge_percentile
+        self.hedge_min_delay = settings.hedge_min_delay_ms / 1000
+        self.hedge_initial_delay = settings.hedge_initial_delay_ms / 1000
+        self.hedge_min_samples = settings.hedge_min_samples
+        self.hedge_workers = settings.hedge_workers
+        self._lock = threading.Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+        self._latency: Dict[Tuple[str, str], LatencyWindow] = {}
+        self._hedges: Dict[str, Dict[str, int]] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    # ------------------------------------------------------------------
+    # Model durumu
+    # ------------------------------------------------------------------
+
+    def breaker(self, model: str) -> CircuitBreaker:
+        with self._lock:
+            breaker = self._breakers.get(model)
+            if breaker is None:
+                breaker = self._breakers[model] = CircuitBreaker(model, self.failure_threshold, self.reset_timeout)
+            return breaker
+
+    def window(self, model: str, kind: str) -> LatencyWindow:
+        """kind: "call" (tam yanıt süresi) veya "stream" (ilk parçaya kadar süre)"""
+        with self._lock:
+            window = self._latency.get((model, kind))
+            if window is None:
+                window = self._latency[(model, kind)] = LatencyWindow()
+            return window
+
+    def available(self, model: str) -> bool:
+        """Modelin circuit'i açık değil"""
+        return not self.breaker(model).is_open()
+
+    def record_outcome(self, model: str, error: Optional[BaseException] = None) -> None:
+        """Bu katmandan geçmeyen çağrıların (LangChain agent turları) sonucunu breaker'a işle"""
+        if model:
+            self._on_result(self.breaker(model), error)
+
+    @staticmethod
+    def _on_result(breaker: CircuitBreaker, error: Optional[BaseException]) -> None:
+        # Kalıcı hatalar (400, 401...) modelin sağlığını göstermez
+        if error is not None and is_retryable(error):
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+
+    def select_model(self, site: str, model: str) -> str:
+        """Circuit açıksa ve ikincil model uygunsa ona yönlendir"""
+        secondary = self.secondaries.get(model)
+        if secondary and self.breaker(model).is_open() and self.available(secondary):
+            LLM_FAILOVERS.inc(site=site, model=model, secondary=secondary)
+            logger.warning(f"↪️ {site}: {model} devre dışı, {secondary} kullanılıyor")
+            return secondary
+        return model
+
+    def hedge_target(self, model: str) -> Optional[str]:
+        if not self.hedge_enabled:
+            return None
+        secondary = self.secondaries.get(model)
+        return secondary if secondary and self.available(secondary) else None
+
+    def hedge_delay(self, model: str, kind: str) -> float:
+        """Birincil modelin p95'i (yeterli örnek yoksa başlangıç değeri), alt sınırla"""
+        window = self.window(model, kind)
+        observed = window.percentile(self.hedge_percentile) if len(window) >= self.hedge_min_samples else None
+        delay = self.hedge_initial_delay if observed is None else max(self.hedge_min_delay, observed)
+        HEDGE_DELAY.set(delay, model=model, kind=kind)
+        return delay
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.hedge_workers, thread_name_prefix="hedge")
+            return self._executor
+
+    # ------------------------------------------------------------------
+    # Retry döngüsü
+    # ------------------------------------------------------------------
+
+    def _retry_delay(self, site: str, model: str, attempt: int, error: BaseException,
+                     started: float) -> Optional[float]:
+        """Yeniden denenecekse bekleme süresi, denenmeyecekse None"""
+        if not is_retryable(error) or attempt + 1 >= self.policy.max_attempts:
+            return None
+        delay = self.policy.delay(attempt, error)
+        if time.monotonic() - started + delay > self.policy.budget:
+            return None
+        LLM_RETRIES.inc(site=site, model=model)
+        logger.warning(
+            f"🔁 {site} [{model}] yeniden deneme {attempt + 1}/{self.policy.max_attempts - 1} "
+            f"({delay * 1000:.0f} ms sonra): {type(error).__name__}"
+        )
+        return delay
+
+    def _admit(self, breaker: CircuitBreaker, last_error: Optional[BaseException]) -> None:
+        if not breaker.allow():
+            raise last_error or CircuitOpenError(breaker.name)
+
+    def _attempts(self, site: str, model: str, fn: Callable[[str], T]) -> T:
+        """Tek model için senkron retry döngüsü"""
+        breaker = self.breaker(model)
+        started = time.monotonic()
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.policy.max_attempts):
+            self._admit(breaker, last_error)
+            call_started = time.perf_counter()
+            try:
+                result = fn(model)
+            except Exception as e:
+                self._on_result(breaker, e)
+                delay = self._retry_delay(site, model, attempt, e, started)
+                if delay is None:
+                    raise
+                last_error = e
+                time.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            self.window(model, "call").add(time.perf_counter() - call_started)
+            return result
+        raise last_error or CircuitOpenError(model)
+
+    async def _aattempts(self, site: str, model: str, fn: Callable[[str], Awaitable[T]]) -> T:
+        """_attempts'in async karşılığı"""
+        breaker = self.breaker(model)
+        started = time.monotonic()
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.policy.max_attempts):
+            self._admit(breaker, last_error)
+            call_started = time.perf_counter()
+            try:
+                result = await fn(model)
+            except Exception as e:
+                self._on_result(breaker, e)
+                delay = self._retry_delay(site, model, attempt, e, started)
+                if delay is None:
+                    raise
+                last_error = e
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            self.window(model, "call").add(time.perf_counter() - call_started)
+            return result
+        raise last_error or CircuitOpenError(model)
+
+    def _open_stream(self, site: str, model: str,
+                     open_stream: Callable[[str], Iterator[str]]) -> Tuple[Optional[str], Iterator[str]]:
+        """Stream'i ilk parçası gelene kadar retry ile aç; (ilk parça, kalan iterator)"""
+        breaker = self.breaker(model)
+        started = time.monotonic()
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.policy.max_attempts):
+            self._admit(breaker, last_error)
+            call_started = time.perf_counter()
+            iterator = iter(open_stream(model))
+            try:
+                first = next(iterator, None)
+            except Exception as e:
+                self._on_result(breaker, e)
+                delay = self._retry_delay(site, model, attempt, e, started)
+                if delay is None:
+                    raise
+                last_error = e
+                time.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            self.window(model, "stream").add(time.perf_counter() - call_started)
+            return first, iterator
+        raise last_error or CircuitOpenError(model)
+
+    async def _aopen_stream(self, site: str, model: str, open_stream: Callable[[str], AsyncIterator[str]]
+                            ) -> Tuple[Optional[str], AsyncIterator[str]]:
+        """_open_stream'in async karşılığı"""
+        breaker = self.breaker(model)
+        started = time.monotonic()
+        last_error: Optional[BaseException] = None
+        for attempt in range(self.policy.max_attempts):
+            self._admit(breaker, last_error)
+            call_started = time.perf_counter()
+            iterator = open_stream(model).__aiter__()
+            try:
+                first = await iterator.__anext__()
+            except StopAsyncIteration:
+                first = None
+            except Exception as e:
+                self._on_result(breaker, e)
+                delay = self._retry_delay(site, model, attempt, e, started)
+                if delay is None:
+                    raise
+                last_error = e
+                await asyncio.sleep(delay)
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+            breaker.record_success()
+            self.window(model, "stream").add(time.perf_counter() - call_started)
+            return first, iterator
+        raise last_error or CircuitOpenError(model)
+
+    # ------------------------------------------------------------------
+    # Hedging
+    # ------------------------------------------------------------------
+
+    def _hedged(self, site: str, model: str, secondary: str, delay: float) -> None:
+        LLM_HEDGES.inc(site=site, model=model, secondary=secondary)
+        with self._lock:
+            counts = self._hedges.setdefault(model, {"hedged": 0, "primary_wins": 0, "secondary_wins": 0})
+            counts["hedged"] += 1
+        logger.info(f"🏁 Hedge: {site} [{model}] {delay * 1000:.0f} ms içinde yanıt vermedi → {secondary}")
+
+    def _hedge_won(self, site: str, model: str, secondary: str, winner: str, started: float) -> None:
+        side = "primary" if winner == model else "secondary"
+        LLM_HEDGE_WINS.inc(site=site, model=model, winner=side)
+        with self._lock:
+            self._hedges[model][f"{side}_wins"] += 1
+        record_span("hedge", (time.perf_counter() - started) * 1000, site=site, model=model,
+                    secondary=secondary, winner=winner)
+
+    def _race(self, site: str, model: str, secondary: str, legs: Dict[Future, str], started: float) -> Future:
+        """İlk başarılı bacağı döndür; hepsi başarısızsa birincilin (yoksa ilk biten) hatalı future'ı"""
+        pending = set(legs)
+        failed: Dict[str, Future] = {}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if len(legs) > 1:
+                        self._hedge_won(site, model, secondary, legs[future], started)
+                    return future
+                failed[legs[future]] = future
+        return failed.get(model) or next(iter(failed.values()))
+
+    async def _arace(self, site: str, model: str, secondary: str, legs: Dict["asyncio.Future[Any]", str],
+                     started: float) -> "asyncio.Future[Any]":
+        """_race'in async karşılığı"""
+        pending = set(legs)
+        failed: Dict[str, "asyncio.Future[Any]"] = {}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if len(legs) > 1:
+                        self._hedge_won(site, model, secondary, legs[task], started)
+                    return task
+                failed[legs[task]] = task
+        return failed.get(model) or next(iter(failed.values()))
+
+    @staticmethod
+    def _close_leg(future: Future) -> None:
+        """Kaybeden stream bacağı açıldığında bağlantısını bırak"""
+        if future.cancelled() or future.exception() is not None:
+            return
+        _, iterator = future.result()
+        close = getattr(iterator, "close", None)
+        if close is not None:
+            close()
+
+    # ------------------------------------------------------------------
+    # Çağrı yerlerinin kullandığı arayüz
+    # ------------------------------------------------------------------
+
+    def call(self, site: str, model: str, fn: Callable[[str], T]) -> T:
+        """Tek seferlik çağrı; fn(model) denenecek modelle çağrılır"""
+        model = self.select_model(site, model)
+        secondary = self.hedge_target(model)
+        if secondary is None:
+            return self._attempts(site, model, fn)
+        started = time.perf_counter()
+        delay = self.hedge_delay(model, "call")
+        executor = self._pool()
+        legs = {executor.submit(propagate(self._attempts), site, model, fn): model}
+        done, _ = wait(legs, timeout=delay)
+        if not done:
+            self._hedged(site, model, secondary, delay)
+            legs[executor.submit(propagate(self._attempts), site, secondary, fn)] = secondary
+        # Senkron çağrı iptal edilemez; kaybeden arka planda biter ve sonucu atılır
+        return self._race(site, model, secondary, legs, started).result()
+
+    async def acall(self, site: str, model: str, fn: Callable[[str], Awaitable[T]]) -> T:
+        """call'ın async karşılığı; kaybeden bacak iptal edilir"""
+        model = self.select_model(site, model)
+        secondary = self.hedge_target(model)
+        if secondary is None:
+            return await self._aattempts(site, model, fn)
+        started = time.perf_counter()
+        delay = self.hedge_delay(model, "call")
+        legs = {asyncio.ensure_future(self._aattempts(site, model, fn)): model}
+        done, _ = await asyncio.wait(legs, timeout=delay)
+        if not done:
+            self._hedged(site, model, secondary, delay)
+            legs[asyncio.ensure_future(self._aattempts(site, secondary, fn))] = secondary
+        winner = await self._arace(site, model, secondary, legs, started)
+        for task in legs:
+            if task is not winner:
+                task.cancel()
+        return winner.result()
+
+    def stream(self, site: str, model: str, open_stream: Callable[[str], Iterator[str]]) -> Iterator[str]:
+        """Stream çağrısı; open_stream(model) yeni bir parça iterator'ı döndürür"""
+        model = self.select_model(site, model)
+        secondary = self.hedge_target(model)
+        if secondary is None:
+            first, iterator = self._open_stream(site, model, open_stream)
+            winner = model
+        else:
+            started = time.perf_counter()
+            delay = self.hedge_delay(model, "stream")
+            executor = self._pool()
+            legs = {executor.submit(propagate(self._open_stream), site, model, open_stream): model}
+            done, _ = wait(legs, timeout=delay)
+            if not done:
+                self._hedged(site, model, secondary, delay)
+                legs[executor.submit(propagate(self._open_stream), site, secondary, open_stream)] = secondary
+            future = self._race(site, model, secondary, legs, started)
+            for other in legs:
+                if other is not future:
+                    other.add_done_callback(self._close_leg)
+            first, iterator = future.result()
+            winner = legs[future]
+        if first is None:
+            return
+        yield first
+        try:
+            yield from iterator
+        except Exception as e:
+            self._on_result(self.breaker(winner), e)
+            raise
+
+    async def astream(self, site: str, model: str,
+                      open_stream: Callable[[str], AsyncIterator[str]]) -> AsyncIterator[str]:
+        """stream'in async karşılığı"""
+        model = self.select_model(site, model)
+        secondary = self.hedge_target(model)
+        if secondary is None:
+            first, iterator = await self._aopen_stream(site, model, open_stream)
+            winner = model
+        else:
+            started = time.perf_counter()
+            delay = self.hedge_delay(model, "stream")
+            legs = {asyncio.ensure_future(self._aopen_stream(site, model, open_stream)): model}
+            done, _ = await asyncio.wait(legs, timeout=delay)
+            if not done:
+                self._hedged(site, model, secondary, delay)
+                legs[asyncio.ensure_future(self._aopen_stream(site, secondary, open_stream))] = secondary
+            task = await self._arace(site, model, secondary, legs, started)
+            for other in legs:
+                if other is task:
+                    continue
+                if other.done() and not other.cancelled() and other.exception() is None:
+                    await other.result()[1].aclose()
+                else:
+                    other.cancel()
+            first, iterator = task.result()
+            winner = legs[task]
+        if first is None:
+            return
+        yield first
+        try:
+            async for chunk in iterator:
+                yield chunk
+        except Exception as e:
+            self._on_result(self.breaker(winner), e)
+            raise
+
+    def stats(self) -> Dict[str, Any]:
+        """Circuit durumları ve model başına hedge sayıları (gecikme ayarı için)"""
+        with self._lock:
+            breakers = {name: breaker.state for name, breaker in self._breakers.items()}
+            hedges = {model: dict(counts) for model, counts in self._hedges.items()}
+        return {"circuits": breakers, "hedges": hedges}
+
+
+_resilience: Optional[Resilience] = None
+_resilience_lock = threading.Lock()
+
+
+def get_resilience() -> Resilience:
+    """Süreç genelindeki dayanıklılık katmanı"""
+    global _resilience
+    if _resilience is None:
+        with _resilience_lock:
+            if _resilience is None:
+                _resilience = Resilience()
+    return _resilience
@@ -0,0 +1,205 @@
+"""
+LLM yanıtları için kalıcı exact-match cache.
+Önde süreç içi LRU katmanı, arkada SQLite disk katmanı; her kayıt kendi TTL'ine sahip.
+"""
+
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Yanıtı zamana bağlı olan niyetler cache'lenmez
+TIME_SENSITIVE_PATTERN = re.compile(
+    r"\b(saat|tarih|bugün|bugun|yarın|yarin|dün|dun|şimdi|simdi|güncel|guncel|son dakika|"
+    r"hava durumu|haber|kur|borsa|now|today|tomorrow|yesterday|time|date|current|latest|"
+    r"weather|news|price)\b",
+    re.IGNORECASE,
+)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_message(message: str) -> str:
+    """Mesajı cache anahtarı için normalize et (Unicode NFC, casefold, boşluklar)"""
+    text = unicodedata.normalize("NFC", message).casefold()
+    text = _WHITESPACE_RE.sub(" ", text).strip()
+    return text.rstrip(" .!?…")
+
+
+def is_time_sensitive(message: str) -> bool:
+    """Mesaj zamana bağlı bir niyet içeriyor mu?"""
+    return bool(TIME_SENSITIVE_PATTERN.search(message))
+
+
+def memory_fingerprint(messages: Iterable[Any]) -> str:
+    """Konuşma geçmişinin kısa özeti (hash)"""
+    digest = hashlib.sha256()
+    for msg in messages:
+        digest.update(msg.__class__.__name__.encode("utf-8"))
+        digest.update(b"\x00")
+        digest.update(str(getattr(msg, "content", msg)).encode("utf-8"))
+        digest.update(b"\x01")
+    return digest.hexdigest()[:16]
+
+
+class ResponseCache:
+    """LRU (bellek) + SQLite (disk) iki katmanlı yanıt cache'i"""
+
+    def __init__(self, db_path: Optional[str] = None, memory_entries: int = 512,
+                 disk_entries: int = 10000, default_ttl: float = 3600):
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+        self.default_ttl = default_ttl
+        self._memory: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats_counters: Dict[str, int] = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypasses": 0,
+            "stores": 0,
+        }
+        if db_path:
+            self._open_disk(db_path)
+
+    def _open_disk(self, db_path: str) -> None:
+        """SQLite katmanını aç; açılamazsa sadece bellek katmanıyla devam et"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses(last_access)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Response cache diski açılamadı, sadece bellek kullanılacak: {str(e)}")
+
+    @staticmethod
+    def make_key(model: str, temperature: float, system_prompt: str, message: str,
+                 fingerprint: Optional[str] = None) -> str:
+        """(model, temperature, system prompt hash, mesaj, hafıza izi) için anahtar üret"""
+        payload = json.dumps([
+            model,
+            round(float(temperature), 4),
+            hashlib.sha256(system_prompt.encode("utf-8")).hexdigest(),
+            normalize_message(message),
+            fingerprint or "",
+        ], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """Önce bellek, sonra disk katmanına bak"""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at > now:
+                    self._memory.move_to_end(key)
+                    self.stats_counters["memory_hits"] += 1
+                    return value
+                del self._memory[key]
+
+            if self._conn is not None:
+                try:
+                    row = self._conn.execute(
+                        "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+                    ).fetchone()
+                    if row is not None:
+                        value, expires_at = row
+                        if expires_at > now:
+                            self._conn.execute(
+                                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+                            )
+                            self._conn.commit()
+                            self._remember(key, value, expires_at)
+                            self.stats_counters["disk_hits"] += 1
+                            return value
+                        self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                        self._conn.commit()
+                except sqlite3.Error as e:
+                    logger.warning(f"⚠️ Response cache okuma hatası: {str(e)}")
+
+            self.stats_counters["misses"] += 1
+            return None
+
+    def set(self, key: str, value: str, ttl: Optional[float] = None) -> None:
+        """Yanıtı iki katmana da yaz"""
+        now = time.time()
+        expires_at = now + (self.default_ttl if ttl is None else ttl)
+        with self._lock:
+            self._remember(key, value, expires_at)
+            self.stats_counters["stores"] += 1
+            if self._conn is None:
+                return
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, value, expires_at, last_access) VALUES (?, ?, ?, ?)",
+                    (key, value, expires_at, now)
+                )
+                self._evict_disk(now)
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Response cache yazma hatası: {str(e)}")
+
+    def record_bypass(self) -> None:
+        """Cache'in bilerek atlandığını say"""
+        with self._lock:
+            self.stats_counters["bypasses"] += 1
+
+    def _remember(self, key: str, value: str, expires_at: float) -> None:
+        """Bellek katmanına ekle ve LRU sınırını uygula"""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self, now: float) -> None:
+        """Süresi dolanları ve disk sınırını aşan en eski kayıtları sil"""
+        self._conn.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        overflow = count - self.disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                " SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def clear(self) -> None:
+        """Tüm katmanları temizle"""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss sayaçları ve oranı"""
+        with self._lock:
+            counters = dict(self.stats_counters)
+            counters["memory_entries"] = len(self._memory)
+        lookups = counters["memory_hits"] + counters["disk_hits"] + counters["misses"]
+        counters["hit_rate"] = (counters["memory_hits"] + counters["disk_hits"]) / lookups if lookups else 0.0
+        return counters
@@ -0,0 +1,278 @@
+"""
+ReAct agent'ının önündeki hızlı niyet yönlendirici.
+1. aşama: tek bir derlenmiş regex (system prompt'taki tetikleyiciler + saat kalıpları);
+   gevşek anahtar kelimeler yalnızca ipucu olarak agent'a iletilir. Bilinmeyen bir yerin saati veya
+   tarih hesabı içeren saat soruları da agent'a düşer
+2. aşama: ucuz yerel anahtar kelime sınıflandırıcısı
+Emin olunan mesajlar doğrudan tool'a ya da tek bir direkt completion'a gider;
+birden çok bağımsız tool isteyen mesajlar paralel çalıştırılıp tek sentez çağrısına girer;
+sadece belirsiz mesajlar ReAct agent'ına düşer.
+"""
+
+import re
+import threading
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from agents.clock import find_timezone
+from agents.parallel_tools import PARALLEL_SAFE_TOOLS
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+ROUTE_TOOL = "tool"
+ROUTE_DIRECT = "direct"
+ROUTE_AGENT = "agent"
+ROUTE_PARALLEL = "parallel"
+
+SMALLTALK = "smalltalk"
+
+# 1. aşama tetikleyicileri (Settings.system_prompt'taki TOOL MANAGEMENT LOGIC + arayüzün saat kalıpları).
+# Yalnızca soru biçimli, niyeti açık kalıplar; eşleşen mesaj LLM'siz doğrudan tool'a gider.
+TRIGGERS: Dict[str, List[str]] = {
+    "get_current_time": [
+        r"^\s*saat\s*\??\s*$", r"\bsaat kaç\b(?!\w)", r"\bwhat time is it\b", r"\bwhat'?s the time\b",
+        r"\bcurrent time\b", r"\bbugünün tarihi\b", r"\bbugün (?:ayın )?kaçı\b", r"\bbugün (?:ne|hangi) gün(?:ü|dür)?\s*\??\s*$",
+        r"\bhangi gündeyiz\b", r"\bwhat(?:'s| is) (?:the )?date today\b", r"\btoday'?s date\b",
+        r"^\s*(?:tarih|date)\s*\??\s*$",
+    ],
+    "text_analyzer": [
+        r"analiz et", r"kaç kelime", r"istatistik", r"\banaly[sz]e\b", r"word count", r"how many words",
+    ],
+    "text_summarizer": [
+        r"özetle", r"kısalt", r"\bsummar(?:y|ize|ise)\b", r"\brésume\b", r"zusammenfass",
+    ],
+    "language_detector": [
+        r"hangi dil", r"dil analizi", r"dilini (?:tespit|bul|belirle)", r"which language", r"what language",
+        r"detect (?:the |its )?language",
+    ],
+    "web_search": [
+        r"\b(?:internette|webde|web'de|google'da) ara\b", r"\bsearch (?:the web|online|for)\b", r"hava durumu",
+    ],
+    SMALLTALK: [
+        r"^\s*(?:merhaba|selam|selamlar|hello|hi|hey|günaydın|iyi akşamlar|iyi geceler|bonjour|salut|"
+        r"hallo|guten (?:tag|morgen|abend)|teşekkürler|teşekkür ederim|sağ ol|thanks|thank you|merci|danke|"
+        r"nasılsın|how are you)\b[\s!.?,]*",
+    ],
+}
+
+# Tek başına niyet kanıtı olmayan gevşek anahtar kelimeler ("tarih dersi", "bir ara görüşelim"):
+# kısa devre yapılmaz, mesaj ipucuyla birlikte eşik altı güvenle agent'a gider
+HINT_TRIGGERS: Dict[str, List[str]] = {
+    "get_current_time": [
+        r"\btime now\b", r"\bkaç saat\b", r"\bzaman nedir\b", r"\bdate\b", r"\btarih", r"\bbugün ne\b",
+        r"\bhangi gün\b", r"\bsaat\b",
+    ],
+    "web_search": [r"\bara\b", r"\bsearch\b", r"\bweather\b", r"\bhaberler?\b"],
+}
+HINT_CONFIDENCE = 0.3
+
+# Saat sorusunu yerel saatle yanıtlanamaz kılan nitelikler: tarih hesabı ("3 gün sonra", "saat farkı")
+# ve yer ("in Springfield", "Springfield'da"). Yer bilinen bir zaman dilimine çözülürse tool'a gider.
+DATE_ARITHMETIC_PATTERN = re.compile(
+    r"\b\d+\s*(?:gün|hafta|ay|yıl|saat|dakika|days?|weeks?|months?|years?|hours?|minutes?)\b|"
+    r"\b(?:sonra|önce|kala|kadar|fark|denk gel|yarın|dün|kaç gün)|"
+    r"\b(?:later|ago|from now|after|before|until|difference|tomorrow|yesterday|how many days)\b",
+    re.IGNORECASE,
+)
+LOCATION_PATTERN = re.compile(r"\b(?:in|at)\s+(?!the\b)[^\W\d_]|[^\W\d_]'n?[dt][ae]\b", re.IGNORECASE)
+
+# 2. aşama: kelime kökü önekleri ve ağırlıkları (Türkçe ekler için önek eşleşmesi)
+KEYWORD_WEIGHTS: Dict[str, Dict[str, float]] = {
+    "text_analyzer": {"analiz": 1.0, "incele": 0.6, "kelime": 0.6, "cümle": 0.5, "karakter": 0.6,
+                      "okunabilir": 0.8, "statistic": 0.8, "readab": 0.8},
+    "text_summarizer": {"özet": 1.0, "kısaca": 0.6, "ana fikir": 0.8, "tl;dr": 1.0, "tldr": 1.0, "brief": 0.5},
+    "language_detector": {"dil": 0.5, "language": 0.7, "langue": 0.7, "sprache": 0.7},
+    "web_search": {"bilgi": 0.4, "hava": 0.6, "güncel": 0.6, "nedir": 0.3, "kimdir": 0.5, "latest": 0.5},
+}
+
+# Bu tool'lar metin olmadan çalışamaz; metin çıkarılamazsa agent'a bırakılır
+TEXT_TOOLS = frozenset({"text_analyzer", "text_summarizer", "language_detector"})
+LOCAL_TOOLS = frozenset({"get_current_time", "text_analyzer", "text_summarizer", "language_detector"})
+
+# ReAct agent'ı bir tool için en az iki tur yapar (tool seçimi + final cevap)
+AGENT_TOOL_ROUND_TRIPS = 2
+
+_WORD_RE = re.compile(r"[^\W\d_]+", re.UNICODE)
+_PAYLOAD_RE = re.compile(r"[:\n]\s*(.+)$", re.DOTALL)
+_QUOTED_RE = re.compile(r"[\"“«](.+?)[\"”»]", re.DOTALL)
+
+
+def _compile_triggers(triggers: Dict[str, List[str]]) -> re.Pattern:
+    """Tüm tetikleyicileri named group'lu tek bir regex'te birleştir"""
+    groups = [f"(?P<{intent}>{'|'.join(patterns)})" for intent, patterns in triggers.items()]
+    return re.compile("|".join(groups), re.IGNORECASE | re.MULTILINE)
+
+
+def extract_payload(message: str) -> Optional[str]:
+    """'Bu metni analiz et: ...' gibi mesajlardan işlenecek metni ayıkla"""
+    match = _PAYLOAD_RE.search(message)
+    if match and match.group(1).strip():
+        return match.group(1).strip()
+    quoted = _QUOTED_RE.search(message)
+    if quoted and quoted.group(1).strip():
+        return quoted.group(1).strip()
+    return None
+
+
+class RouteDecision:
+    """Yönlendirme kararı"""
+
+    def __init__(self, route: str, intents: Tuple[str, ...] = (), payload: Optional[str] = None,
+                 confidence: float = 0.0, stage: str = ""):
+        self.route = route
+        self.intents = intents
+        self.payload = payload
+        self.confidence = confidence
+        self.stage = stage
+
+    @property
+    def tools(self) -> Tuple[str, ...]:
+        """Paralel kararlarda çalıştırılacak tool'lar"""
+        return self.intents if self.route in (ROUTE_TOOL, ROUTE_PARALLEL) else ()
+
+    @property
+    def tool(self) -> Optional[str]:
+        """Tek tool'luk kararlarda tool adı"""
+        return self.intents[0] if self.route == ROUTE_TOOL and len(self.intents) == 1 else None
+
+    def __repr__(self) -> str:
+        return (f"RouteDecision(route={self.route!r}, intents={self.intents!r}, "
+                f"confidence={self.confidence:.2f}, stage={self.stage!r})")
+
+
+class IntentRouter:
+    """İki aşamalı yerel niyet yönlendirici"""
+
+    def __init__(self, confidence_threshold: float = 0.6, smalltalk_max_words: int = 6,
+                 parallel_enabled: bool = True):
+        self.confidence_threshold = confidence_threshold
+        self.smalltalk_max_words = smalltalk_max_words
+        self.parallel_enabled = parallel_enabled
+        self.matcher = _compile_triggers(TRIGGERS)
+        self.hint_matcher = _compile_triggers(HINT_TRIGGERS)
+        self._lock = threading.Lock()
+        self.route_counts: Counter = Counter()
+        self.intent_counts: Counter = Counter()
+        self.round_trips_saved = 0
+
+    def match_intents(self, message: str, matcher: Optional[re.Pattern] = None) -> Tuple[str, ...]:
+        """1. aşama: mesajda tetiklenen niyetler (ilk görünme sırasıyla)"""
+        found: List[str] = []
+        for match in (matcher or self.matcher).finditer(message):
+            intent = match.lastgroup
+            if intent and intent not in found:
+                found.append(intent)
+        return tuple(found)
+
+    def classify(self, message: str) -> Tuple[Optional[str], float]:
+        """2. aşama: önek eşleşmeli anahtar kelime skoru"""
+        lowered = message.replace("İ", "i").lower()
+        words = _WORD_RE.findall(lowered)
+        scores: Dict[str, float] = {}
+        for intent, weights in KEYWORD_WEIGHTS.items():
+            score = 0.0
+            for keyword, weight in weights.items():
+                if " " in keyword or not keyword.isalpha():
+                    if keyword in lowered:
+                        score += weight
+                elif any(word.startswith(keyword) for word in words):
+                    score += weight
+            if score:
+                scores[intent] = score
+        if not scores:
+            return None, 0.0
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        best, best_score = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        # Skor ve ikinciyle fark arttıkça güven 1'e yaklaşır
+        confidence = (best_score - runner_up) / (best_score - runner_up + 0.5)
+        return best, confidence
+
+    def route(self, message: str) -> RouteDecision:
+        """Mesaj için yönlendirme kararı ver ve kaydet"""
+        decision = self._decide(message)
+        self._record(decision)
+        return decision
+
+    def _decide(self, message: str) -> RouteDecision:
+        text = message.strip()
+        if not text:
+            return RouteDecision(ROUTE_AGENT, stage="empty")
+
+        intents = self.match_intents(text)
+        tools = tuple(intent for intent in intents if intent != SMALLTALK)
+        payload = extract_payload(text)
+
+        # Paralel istekte işlenecek metin (payload) saat sorusunun parçası sayılmaz
+        question = text.replace(payload, "") if payload and len(tools) > 1 else text
+        if "get_current_time" in tools and not self._answerable_by_clock(question):
+            return RouteDecision(ROUTE_AGENT, tools, payload, HINT_CONFIDENCE, "regex-qualified")
+
+        if len(tools) > 1:
+            independent = all(tool in PARALLEL_SAFE_TOOLS for tool in tools)
+            needs_text = any(tool in TEXT_TOOLS for tool in tools)
+            if self.parallel_enabled and independent and (payload or not needs_text):
+                return RouteDecision(ROUTE_PARALLEL, tools, payload or text, 1.0, "multi")
+            return RouteDecision(ROUTE_AGENT, tools, payload, 0.0, "multi")
+
+        if len(tools) == 1:
+            tool = tools[0]
+            if tool in TEXT_TOOLS:
+                if payload:
+                    return RouteDecision(ROUTE_TOOL, tools, payload, 1.0, "regex")
+                return RouteDecision(ROUTE_AGENT, tools, None, 0.5, "regex-no-payload")
+            return RouteDecision(ROUTE_TOOL, tools, payload or text, 1.0, "regex")
+
+        if SMALLTALK in intents and len(_WORD_RE.findall(text)) <= self.smalltalk_max_words:
+            return RouteDecision(ROUTE_DIRECT, (SMALLTALK,), None, 1.0, "regex")
+
+        intent, confidence = self.classify(text)
+        if intent and confidence >= self.confidence_threshold:
+            if intent in TEXT_TOOLS and not payload:
+                return RouteDecision(ROUTE_AGENT, (intent,), None, confidence, "classifier-no-payload")
+            return RouteDecision(ROUTE_TOOL, (intent,), payload or text, confidence, "classifier")
+
+        hints = self.match_intents(text, self.hint_matcher)
+        if hints:
+            return RouteDecision(ROUTE_AGENT, hints, payload, min(confidence, HINT_CONFIDENCE), "regex-hint")
+        return RouteDecision(ROUTE_AGENT, (intent,) if intent else (), payload, confidence, "fallback")
+
+    @staticmethod
+    def _answerable_by_clock(text: str) -> bool:
+        """Saat tool'u soruyu tek başına yanıtlayabilir mi? (tarih hesabı yok, yer varsa zaman dilimi bilinir)"""
+        if DATE_ARITHMETIC_PATTERN.search(text):
+            return False
+        return not LOCATION_PATTERN.search(text) or find_timezone(text) is not None
+
+    def _record(self, decision: RouteDecision) -> None:
+        """Karar sayaçlarını güncelle ve logla"""
+        saved = 0
+        if decision.route == ROUTE_TOOL:
+            # Yerel tool'lar hiç LLM çağrısı yapmaz; web_search tek çağrıdır
+            saved = AGENT_TOOL_ROUND_TRIPS if decision.tool in LOCAL_TOOLS else AGENT_TOOL_ROUND_TRIPS - 1
+        elif decision.route == ROUTE_PARALLEL:
+            # Agent: tool başına bir tur + final cevap; paralel yol: tek sentez çağrısı
+            saved = len(decision.intents)
+        with self._lock:
+            self.route_counts[decision.route] += 1
+            for intent in decision.intents:
+                self.intent_counts[intent] += 1
+            self.round_trips_saved += saved
+        logger.info(
+            f"🧭 Route: {decision.route} | intents={','.join(decision.intents) or '-'} | "
+            f"stage={decision.stage} | confidence={decision.confidence:.2f} | saved_round_trips={saved}"
+        )
+
+    def stats(self) -> Dict[str, object]:
+        """Yönlendirme istatistikleri"""
+        with self._lock:
+            total = sum(self.route_counts.values())
+            return {
+                "total": total,
+                "routes": dict(self.route_counts),
+                "intents": dict(self.intent_counts),
+                "fast_path_ratio": (total - self.route_counts[ROUTE_AGENT]) / total if total else 0.0,
+                "round_trips_saved": self.round_trips_saved,
+            }
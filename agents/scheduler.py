@@ -0,0 +1,464 @@
+"""
+Hız sınırı farkındalıklı istek zamanlayıcısı; tüm Groq ve Gemini çağrıları gönderilmeden önce buradan geçer.
+- Model başına istek ve token kovaları (token bucket). Başlangıç sınırları ayarlardan gelir;
+  Groq'un x-ratelimit-* yanıt başlıkları ve 429'ların retry-after'ı kovaları sunucunun gördüğü değere çeker
+- Bütçe yetmezse çağrı kuyruğa girer: önce öncelik (etkileşimli sohbet > arka plan özet > batch),
+  aynı öncelikte oturum başına adil paylaşım (start-time fair queuing: token harcayan oturum geriye düşer)
+- Kuyrukta geçen süre `llm_queue_wait_seconds` metriğine ve trace'e "queue" span'i olarak yazılır
+
+Groq çağrıları (SDK ve ChatGroq aynı httpx havuzunu kullanır) istemcinin event hook'larından,
+Gemini çağrıları doğrudan `acquire` / `aacquire` ile geçer. Oturum ve öncelik çağıranın context'inden
+(`work_scope`) okunur; thread havuzlarına `tracing.propagate` ile taşınır.
+"""
+
+import asyncio
+import contextvars
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from agents.metrics import Gauge, get_metrics
+from agents.tracing import record_span
+from config.settings import Settings, get_settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE, PRIORITY_BACKGROUND, PRIORITY_BATCH = 0, 1, 2
+PRIORITY_NAMES = {PRIORITY_INTERACTIVE: "interactive", PRIORITY_BACKGROUND: "background", PRIORITY_BATCH: "batch"}
+DEFAULT_SESSION = "default"
+# Gemini görsel başına sabit token sayar
+GEMINI_IMAGE_TOKENS = 258
+# 429'da retry-after yoksa kovaların bekletileceği süre (saniye)
+DEFAULT_HOLD = 1.0
+# Oturum başına sanal bitiş zamanları bu sayıyı aşınca boşta kalanlar temizlenir
+MAX_TRACKED_SESSIONS = 1000
+
+_MODEL_PATTERN = re.compile(rb'"model"\s*:\s*"([^"]+)"')
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+_metrics = get_metrics()
+QUEUE_WAIT = _metrics.histogram(
+    "llm_queue_wait_seconds", "Hız sınırı kuyruğunda bekleme süresi", ("model", "priority"))
+QUEUE_DEPTH = _metrics.gauge("llm_queue_depth", "Bütçe bekleyen LLM çağrıları", ("priority",))
+RATE_LIMIT_HOLDS = _metrics.counter(
+    "llm_rate_limit_holds_total", "Sunucu sınırı (429 veya kalan=0) nedeniyle bekletilen kovalar", ("model", "reason"))
+
+_session_id: "contextvars.ContextVar[Optional[str]]" = contextvars.ContextVar("scheduler_session", default=None)
+_priority: "contextvars.ContextVar[int]" = contextvars.ContextVar("scheduler_priority", default=PRIORITY_INTERACTIVE)
+
+
+class SchedulerTimeoutError(RuntimeError):
+    """Çağrı `scheduler_max_wait` içinde bütçe alamadı"""
+
+    def __init__(self, model: str, waited: float):
+        super().__init__(f"{model} hız sınırı kuyruğunda {waited:.1f} sn beklendi, istek gönderilmedi")
+        self.model = model
+
+
+@contextmanager
+def work_scope(session_id: Optional[str] = None, priority: Optional[int] = None) -> Iterator[None]:
+    """
+    Bu blokta yapılan LLM çağrılarının oturumunu ve önceliğini belirle.
+    tracing.request_scope gibi önceki değere geri alınır (stream'ler başka context'te devam edebilir).
+    """
+    previous = (_session_id.get(), _priority.get())
+    if session_id is not None:
+        _session_id.set(session_id)
+    if priority is not None:
+        _priority.set(priority)
+    try:
+        yield
+    finally:
+        _session_id.set(previous[0])
+        _priority.set(previous[1])
+
+
+def parse_duration(value: Any) -> Optional[float]:
+    """Groq'un reset başlıkları ("7.66s", "2m59.56s", "120ms") veya düz saniye"""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    matches = _DURATION_PATTERN.findall(str(value))
+    if not matches:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+
+def _header_int(headers: Any, name: str) -> Optional[int]:
+    try:
+        return int(float(headers.get(name)))
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """`capacity` birimlik, `period` saniyede dolan kova; sunucu başlıklarıyla yeniden ayarlanabilir"""
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.period = period
+        self.rate = self.capacity / period
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.hold_until = 0.0
+
+    def _refill(self, now: float) -> None:
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """`amount` birim için beklenecek süre (0: hemen); kapasiteden büyük istek kapasiteye indirgenir"""
+        self._refill(now)
+        held = max(0.0, self.hold_until - now)
+        missing = min(amount, self.capacity) - self.tokens
+        if missing <= 0:
+            return held
+        return max(held, missing / self.rate if self.rate > 0 else self.period)
+
+    def take(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.tokens -= min(amount, self.capacity)
+
+    def level(self, now: float) -> float:
+        """Şu an kovada kalan miktar"""
+        self._refill(now)
+        return self.tokens
+
+    def refund(self, amount: float, now: float) -> None:
+        self._refill(now)
+        self.tokens = min(self.capacity, self.tokens + min(amount, self.capacity))
+
+    def sync(self, limit: Optional[int], remaining: Optional[int], reset: Optional[float], now: float) -> None:
+        """Sunucunun bildirdiği sınır/kalan/dolma süresini benimse"""
+        if limit:
+            self.capacity = float(limit)
+        if remaining is None:
+            return
+        self.tokens = min(self.capacity, float(remaining))
+        self.updated = now
+        # Kalan bütçe reset süresi sonunda tekrar dolar; başlık yoksa periyot hızı
+        if reset and self.tokens < self.capacity:
+            self.rate = max(self.capacity / self.period, (self.capacity - self.tokens) / reset)
+        else:
+            self.rate = self.capacity / self.period
+
+    def clamp(self, remaining: Optional[int], now: float) -> None:
+        """Sunucu daha az kaldığını söylüyorsa yerel sayacı düşür (ör. günlük istek sınırı)"""
+        if remaining is not None:
+            self._refill(now)
+            self.tokens = min(self.tokens, float(remaining))
+
+    def hold(self, seconds: float, now: float) -> None:
+        self.hold_until = max(self.hold_until, now + seconds)
+
+
+class ModelBudget:
+    """Bir modelin dakikalık istek ve token kovaları"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+
+    def wait_time(self, cost: int, now: float) -> float:
+        return max(self.requests.wait_time(1, now), self.tokens.wait_time(cost, now))
+
+    def take(self, cost: int, now: float) -> None:
+        self.requests.take(1, now)
+        self.tokens.take(cost, now)
+
+    def refund(self, cost: int, now: float) -> None:
+        self.requests.refund(1, now)
+        self.tokens.refund(cost, now)
+
+
+class _Waiter:
+    """Kuyruktaki tek çağrı; sync çağıran Event'le, async çağıran Future'la uyandırılır"""
+
+    def __init__(self, model: str, cost: int, priority: int, session: str, seq: int, start_tag: float,
+                 loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.model = model
+        self.cost = cost
+        self.priority = priority
+        self.session = session
+        self.seq = seq
+        self.start_tag = start_tag
+        self.enqueued = time.perf_counter()
+        self.granted = False
+        self.event = threading.Event() if loop is None else None
+        self.loop = loop
+        self.future: Optional[asyncio.Future] = loop.create_future() if loop is not None else None
+
+    def order(self) -> Tuple[int, float, int]:
+        return self.priority, self.start_tag, self.seq
+
+    def wake(self) -> None:
+        self.granted = True
+        if self.event is not None:
+            self.event.set()
+        else:
+            self.loop.call_soon_threadsafe(_resolve, self.future)
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class RequestScheduler:
+    """Model başına bütçeler, öncelik kuyruğu ve oturum başına adil paylaşım"""
+
+    def __init__(self, settings: Optional[Settings] = None):
+        self.settings = settings or get_settings()
+        self.enabled = self.settings.scheduler_enabled
+        self.max_wait = self.settings.scheduler_max_wait
+        self._lock = threading.Condition()
+        self._budgets: Dict[str, ModelBudget] = {}
+        self._waiters: List[_Waiter] = []
+        # Adil paylaşım: oturumların sanal bitiş zamanı ve en son hizmet verilen başlangıç etiketi
+        self._finish: Dict[str, float] = {}
+        self._virtual = 0.0
+        self._seq = 0
+        self._worker: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------------
+    # Bütçeler
+    # ------------------------------------------------------------------
+
+    def _limits(self, model: str) -> Tuple[int, int]:
+        override = self.settings.rate_limit_overrides.get(model)
+        if override and ":" in override:
+            rpm, tpm = override.split(":", 1)
+            return int(rpm), int(tpm)
+        if model.startswith("gemini"):
+            return self.settings.gemini_rate_limit_rpm, self.settings.gemini_rate_limit_tpm
+        return self.settings.rate_limit_rpm, self.settings.rate_limit_tpm
+
+    def _budget(self, model: str) -> ModelBudget:
+        budget = self._budgets.get(model)
+        if budget is None:
+            budget = self._budgets[model] = ModelBudget(*self._limits(model))
+        return budget
+
+    def observe_headers(self, model: str, status: int, headers: Any) -> None:
+        """Yanıt başlıklarındaki (x-ratelimit-*, retry-after) sınırları kovalara işle"""
+        if not self.enabled or not model:
+            return
+        now = time.monotonic()
+        with self._lock:
+            budget = self._budget(model)
+            budget.tokens.sync(_header_int(headers, "x-ratelimit-limit-tokens"),
+                               _header_int(headers, "x-ratelimit-remaining-tokens"),
+                               parse_duration(headers.get("x-ratelimit-reset-tokens")), now)
+            # Groq'un istek başlıkları günlük sınırdır; dakikalık kovayı yalnızca aşağı çeker
+            remaining_requests = _header_int(headers, "x-ratelimit-remaining-requests")
+            budget.requests.clamp(remaining_requests, now)
+            if remaining_requests == 0:
+                reset = parse_duration(headers.get("x-ratelimit-reset-requests")) or DEFAULT_HOLD
+                budget.requests.hold(reset, now)
+                RATE_LIMIT_HOLDS.inc(model=model, reason="exhausted")
+            if status == 429:
+                hold = parse_duration(headers.get("retry-after"))
+                hold = DEFAULT_HOLD if hold is None else hold
+                budget.requests.hold(hold, now)
+                budget.tokens.hold(hold, now)
+                RATE_LIMIT_HOLDS.inc(model=model, reason="429")
+                logger.warning(f"🚦 {model} hız sınırına takıldı, kuyruk {hold:.1f} sn bekletiliyor")
+            self._lock.notify_all()
+
+    # ------------------------------------------------------------------
+    # Kuyruk
+    # ------------------------------------------------------------------
+
+    def _enqueue(self, model: str, cost: int, loop: Optional[asyncio.AbstractEventLoop] = None) -> _Waiter:
+        session = _session_id.get() or DEFAULT_SESSION
+        priority = _priority.get()
+        with self._lock:
+            self._seq += 1
+            start_tag = max(self._virtual, self._finish.get(session, 0.0))
+            self._finish[session] = start_tag + cost
+            if len(self._finish) > MAX_TRACKED_SESSIONS:
+                self._finish = {key: tag for key, tag in self._finish.items() if tag > self._virtual}
+            waiter = _Waiter(model, cost, priority, session, self._seq, start_tag, loop)
+            self._waiters.append(waiter)
+            QUEUE_DEPTH.inc(priority=PRIORITY_NAMES.get(priority, priority))
+            self._dispatch()
+            if not waiter.granted:
+                self._ensure_worker()
+                self._lock.notify_all()
+        return waiter
+
+    def _dispatch(self) -> Optional[float]:
+        """Bütçesi yeten bekleyenleri sırayla uyandır; bir sonraki dolum için beklenecek süreyi döndür"""
+        now = time.monotonic()
+        blocked: Dict[str, float] = {}
+        granted = []
+        for waiter in sorted(self._waiters, key=_Waiter.order):
+            # Sırası gelmeyen küçük istekler, modelin öndeki bekleyenini geçemez
+            if waiter.model in blocked:
+                continue
+            budget = self._budget(waiter.model)
+            wait = budget.wait_time(waiter.cost, now)
+            if wait > 0:
+                blocked[waiter.model] = wait
+                continue
+            budget.take(waiter.cost, now)
+            self._virtual = max(self._virtual, waiter.start_tag)
+            granted.append(waiter)
+        for waiter in granted:
+            self._waiters.remove(waiter)
+            QUEUE_DEPTH.dec(priority=PRIORITY_NAMES.get(waiter.priority, waiter.priority))
+            waiter.wake()
+        return min(blocked.values()) if blocked else None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="llm-scheduler", daemon=True)
+            self._worker.start()
+
+    def _run(self) -> None:
+        """Kova dolum zamanlarında kuyruğu yeniden dağıtan arka plan thread'i"""
+        with self._lock:
+            while True:
+                delay = self._dispatch()
+                self._lock.wait(timeout=delay if self._waiters else None)
+
+    def _withdraw(self, waiter: _Waiter, refund: bool = False) -> bool:
+        """Bekleyeni kuyruktan çıkar (çıkarıldıysa True); izin almışsa ve `refund` ise bütçeyi iade et"""
+        with self._lock:
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+                QUEUE_DEPTH.dec(priority=PRIORITY_NAMES.get(waiter.priority, waiter.priority))
+                self._lock.notify_all()
+                return True
+            if refund and waiter.granted:
+                self._budget(waiter.model).refund(waiter.cost, time.monotonic())
+                self._lock.notify_all()
+            return False
+
+    def _granted(self, waiter: _Waiter) -> None:
+        waited = time.perf_counter() - waiter.enqueued
+        priority = PRIORITY_NAMES.get(waiter.priority, waiter.priority)
+        QUEUE_WAIT.observe(waited, model=waiter.model, priority=priority)
+        if waited >= 0.001:
+            record_span("queue", waited * 1000, model=waiter.model, priority=priority, session=waiter.session)
+
+    def acquire(self, model: str, cost: int) -> None:
+        """Model bütçesinden bir istek ve `cost` token al; gerekirse sırası gelene kadar bekle"""
+        if not self.enabled:
+            return
+        waiter = self._enqueue(model, cost)
+        if not waiter.event.wait(self.max_wait) and self._withdraw(waiter):
+            raise SchedulerTimeoutError(model, time.perf_counter() - waiter.enqueued)
+        self._granted(waiter)
+
+    async def aacquire(self, model: str, cost: int) -> None:
+        """acquire'ın event loop'u bloklamayan karşılığı"""
+        if not self.enabled:
+            return
+        waiter = self._enqueue(model, cost, asyncio.get_running_loop())
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter.future), self.max_wait)
+        except asyncio.TimeoutError:
+            if self._withdraw(waiter):
+                raise SchedulerTimeoutError(model, time.perf_counter() - waiter.enqueued)
+        except asyncio.CancelledError:
+            # Hedge'i kaybeden veya kullanıcının kapattığı istek bütçeyi boşa tutmasın
+            self._withdraw(waiter, refund=True)
+            raise
+        self._granted(waiter)
+
+    def stats(self) -> Dict[str, Any]:
+        """Model başına kalan bütçe ve kuyruk uzunluğu"""
+        now = time.monotonic()
+        with self._lock:
+            budgets = {}
+            for model, budget in self._budgets.items():
+                budgets[model] = {
+                    "requests": round(budget.requests.level(now), 1),
+                    "requests_capacity": budget.requests.capacity,
+                    "tokens": round(budget.tokens.level(now)),
+                    "tokens_capacity": budget.tokens.capacity,
+                }
+            queued: Dict[str, int] = {}
+            for waiter in self._waiters:
+                name = PRIORITY_NAMES.get(waiter.priority, str(waiter.priority))
+                queued[name] = queued.get(name, 0) + 1
+        return {"budgets": budgets, "queued": queued}
+
+    def collect_metrics(self) -> List[Any]:
+        """/metrics için okuma anındaki kalan bütçeler"""
+        remaining = Gauge("llm_budget_remaining", "Model kovasında kalan bütçe", ("model", "kind"))
+        for model, budget in self.stats()["budgets"].items():
+            remaining.set(budget["requests"], model=model, kind="requests")
+            remaining.set(budget["tokens"], model=model, kind="tokens")
+        return [remaining]
+
+    # ------------------------------------------------------------------
+    # Groq httpx event hook'ları
+    # ------------------------------------------------------------------
+
+    def request_cost(self, content: bytes) -> Tuple[str, int]:
+        """chat.completions gövdesinden (model, tahmini prompt + yanıt token'ı)"""
+        from agents.completions import estimate_messages_tokens
+        try:
+            body = json.loads(content)
+        except (TypeError, ValueError):
+            return "", 0
+        completion = min(body.get("max_tokens") or self.settings.scheduler_completion_tokens,
+                         self.settings.scheduler_completion_tokens)
+        return body.get("model", ""), estimate_messages_tokens(body.get("messages", [])) + completion
+
+    @staticmethod
+    def _is_completion(request: httpx.Request) -> bool:
+        return request.method == "POST" and request.url.path.endswith("/chat/completions")
+
+    def on_request(self, request: httpx.Request) -> None:
+        if self.enabled and self._is_completion(request):
+            self.acquire(*self.request_cost(request.content))
+
+    def on_response(self, response: httpx.Response) -> None:
+        if self.enabled and self._is_completion(response.request):
+            match = _MODEL_PATTERN.search(response.request.content)
+            self.observe_headers(match.group(1).decode() if match else "", response.status_code, response.headers)
+
+    async def aon_request(self, request: httpx.Request) -> None:
+        if self.enabled and self._is_completion(request):
+            await self.aacquire(*self.request_cost(request.content))
+
+    async def aon_response(self, response: httpx.Response) -> None:
+        self.on_response(response)
+
+    def event_hooks(self) -> Dict[str, List[Any]]:
+        """Senkron Groq httpx istemcisi için hook'lar"""
+        return {"request": [self.on_request], "response": [self.on_response]}
+
+    def async_event_hooks(self) -> Dict[str, List[Any]]:
+        """Async Groq httpx istemcisi için hook'lar"""
+        return {"request": [self.aon_request], "response": [self.aon_response]}
+
+
+_scheduler: Optional[RequestScheduler] = None
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler() -> RequestScheduler:
+    """Süreç genelindeki zamanlayıcı"""
+    global _scheduler
+    if _scheduler is None:
+        with _scheduler_lock:
+            if _scheduler is None:
+                _scheduler = RequestScheduler()
+                get_metrics().set_collector("scheduler", _scheduler.collect_metrics)
+    return _scheduler
@@ -0,0 +1,120 @@
+"""
+Oturum (session) yöneticisi.
+Her Gradio oturumuna hafif bir konuşma hafızası verir; pahalı ChatGroq,
+tool'lar ve agent executor tüm oturumlar arasında paylaşılır.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION_ID = "default"
+# Bu önekli oturumlar tek istek içindir: konuşma deposuna yazılmaz, istek bitince havuzdan çıkarılır
+EPHEMERAL_PREFIX = "ephemeral-"
+
+
+def is_ephemeral(session_id: Optional[str]) -> bool:
+    return bool(session_id) and session_id.startswith(EPHEMERAL_PREFIX)
+
+
+class SessionState:
+    """Tek bir oturuma ait durum"""
+
+    def __init__(self, session_id: str, memory: Any):
+        self.session_id = session_id
+        self.memory = memory
+        # None: LLMAgent'ın varsayılan modeli kullanılır
+        self.text_model: Optional[str] = None
+        self.vision_model: Optional[str] = None
+        # Son güvenle tespit edilen yanıt dili; kısa/belirsiz mesajlarda korunur
+        self.reply_language: Optional[str] = None
+        self.created_at = time.monotonic()
+        self.last_access = self.created_at
+
+
+class SessionManager:
+    """Maksimum oturum sayısı, idle TTL ve LRU eviction ile oturum havuzu"""
+
+    def __init__(self, memory_factory: Callable[[str], Any], max_sessions: int = 1000, idle_ttl: float = 3600):
+        if max_sessions < 1:
+            raise ValueError("max_sessions en az 1 olmalı")
+        self.memory_factory = memory_factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self._sessions: "OrderedDict[str, SessionState]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def get(self, session_id: Optional[str] = None) -> SessionState:
+        """Oturumu getir, yoksa oluştur; erişim LRU sırasını günceller"""
+        session_id = session_id or DEFAULT_SESSION_ID
+        now = time.monotonic()
+        with self._lock:
+            self._evict_expired(now)
+            state = self._touch(session_id, now)
+        if state is not None:
+            return state
+        # Hafıza depodan geri yüklenir (disk I/O); diğer oturumlar bunu kilit altında beklemesin
+        memory = self.memory_factory(session_id)
+        with self._lock:
+            state = self._touch(session_id, now)
+            if state is None:
+                state = SessionState(session_id, memory)
+                state.last_access = now
+                self._sessions[session_id] = state
+                self._evict_overflow()
+            return state
+
+    def _touch(self, session_id: str, now: float) -> Optional[SessionState]:
+        """Varsa oturumu LRU sırasının sonuna al ve erişim zamanını güncelle"""
+        state = self._sessions.get(session_id)
+        if state is not None:
+            self._sessions.move_to_end(session_id)
+            state.last_access = now
+        return state
+
+    def peek(self, session_id: Optional[str] = None) -> Optional[SessionState]:
+        """Oturumu oluşturmadan ve LRU sırasını değiştirmeden getir"""
+        with self._lock:
+            return self._sessions.get(session_id or DEFAULT_SESSION_ID)
+
+    def remove(self, session_id: Optional[str] = None) -> bool:
+        """Oturumu havuzdan çıkar"""
+        with self._lock:
+            return self._sessions.pop(session_id or DEFAULT_SESSION_ID, None) is not None
+
+    def _evict_expired(self, now: float) -> None:
+        """Süresi dolan oturumları at (OrderedDict en eski erişimden başlar)"""
+        while self._sessions:
+            session_id, state = next(iter(self._sessions.items()))
+            if now - state.last_access < self.idle_ttl:
+                break
+            del self._sessions[session_id]
+            self.evictions += 1
+            logger.info(f"⌛ Oturum zaman aşımı ile silindi: {session_id}")
+
+    def _evict_overflow(self) -> None:
+        """Kapasite aşıldıysa en az kullanılan oturumları at"""
+        while len(self._sessions) > self.max_sessions:
+            session_id, _ = self._sessions.popitem(last=False)
+            self.evictions += 1
+            logger.info(f"♻️ LRU ile oturum silindi: {session_id}")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._sessions)
+
+    def stats(self) -> Dict[str, Any]:
+        """Havuz istatistikleri"""
+        with self._lock:
+            return {
+                "active_sessions": len(self._sessions),
+                "max_sessions": self.max_sessions,
+                "idle_ttl": self.idle_ttl,
+                "evictions": self.evictions,
+            }
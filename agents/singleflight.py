@@ -0,0 +1,219 @@
+"""
+Uçuştaki özdeş çağrıları birleştirme (single-flight).
+Cache ancak ilk çağrı bittikten sonra işe yarar; ani yoğunlukta aynı popüler prompt veya aynı paylaşılan
+görsel aynı saniyede defalarca gelir. Aynı anahtarla eşzamanlı gelen istekler ilk isteğin (lider)
+upstream çağrısını bekler ve sonucunu ya da hatasını paylaşır. Anahtar çağrı bitince silinir;
+sonuç saklanmaz (bu response/vision cache'inin işi).
+
+Stream'lerde upstream ayrı bir pompa thread'inde (async'te task'ta) tampona okunur ve her tüketici
+tamponu baştan izler; birinin erken bırakması diğerlerini kesmez.
+"""
+
+import asyncio
+import threading
+from typing import Any, AsyncIterator, Callable, Dict, Hashable, Iterator, List, Optional, TypeVar
+
+from agents.metrics import get_metrics
+from agents.tracing import annotate, propagate
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+SINGLEFLIGHT_CALLS = get_metrics().counter(
+    "singleflight_calls_total", "Single-flight çağrıları (leader: upstream'e giden, follower: paylaşan)",
+    ("group", "role"))
+
+
+class _Call:
+    """Tek seferlik çağrının sonucu veya hatası"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class _StreamBuffer:
+    """Pompanın doldurduğu, her tüketicinin baştan okuduğu parça tamponu"""
+
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.chunks: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+
+    def append(self, chunk: Any) -> None:
+        with self.cond:
+            self.chunks.append(chunk)
+            self.cond.notify_all()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        with self.cond:
+            self.finished = True
+            self.error = error
+            self.cond.notify_all()
+
+    def replay(self) -> Iterator[Any]:
+        index = 0
+        while True:
+            with self.cond:
+                while index >= len(self.chunks) and not self.finished:
+                    self.cond.wait()
+                if index < len(self.chunks):
+                    chunk = self.chunks[index]
+                elif self.error is not None:
+                    raise self.error
+                else:
+                    return
+            index += 1
+            yield chunk
+
+
+class _AsyncStreamBuffer:
+    """_StreamBuffer'ın event loop içindeki karşılığı"""
+
+    def __init__(self):
+        self.changed = asyncio.Event()
+        self.chunks: List[Any] = []
+        self.finished = False
+        self.error: Optional[BaseException] = None
+        self.task: Optional[asyncio.Task] = None
+
+    def _notify(self) -> None:
+        # Bekleyenleri uyandır, bir sonraki değişiklik için yeni event
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def append(self, chunk: Any) -> None:
+        self.chunks.append(chunk)
+        self._notify()
+
+    def finish(self, error: Optional[BaseException] = None) -> None:
+        self.finished = True
+        self.error = error
+        self._notify()
+
+    async def replay(self) -> AsyncIterator[Any]:
+        index = 0
+        while True:
+            while index >= len(self.chunks) and not self.finished:
+                await self.changed.wait()
+            if index < len(self.chunks):
+                yield self.chunks[index]
+                index += 1
+            elif self.error is not None:
+                raise self.error
+            else:
+                return
+
+
+class SingleFlight:
+    """Anahtar başına uçuştaki tek çağrı; aynı anahtarlı eşzamanlı çağıranlar onu paylaşır"""
+
+    def __init__(self, name: str, enabled: bool = True):
+        self.name = name
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, _Call] = {}
+        self._streams: Dict[Hashable, _StreamBuffer] = {}
+        self._astreams: Dict[Hashable, _AsyncStreamBuffer] = {}
+
+    def _count(self, leader: bool) -> None:
+        SINGLEFLIGHT_CALLS.inc(group=self.name, role="leader" if leader else "follower")
+        if not leader:
+            annotate(singleflight=self.name)
+
+    def do(self, key: Optional[Hashable], func: Callable[[], T]) -> T:
+        """func'ı çağır; aynı anahtarla uçuşta bir çağrı varsa onun sonucunu bekle (key=None: birleştirme yok)"""
+        if not self.enabled or key is None:
+            return func()
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+        self._count(leader)
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = func()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stream(self, key: Optional[Hashable], factory: Callable[[], Iterator[T]]) -> Iterator[T]:
+        """factory'nin stream'ini paylaş; ilk çağıranın context'inde (trace, zamanlayıcı oturumu) pompalanır"""
+        if not self.enabled or key is None:
+            yield from factory()
+            return
+        with self._lock:
+            buffer = self._streams.get(key)
+            leader = buffer is None
+            if leader:
+                buffer = self._streams[key] = _StreamBuffer()
+                threading.Thread(target=propagate(self._pump), args=(key, buffer, factory),
+                                 name=f"singleflight-{self.name}", daemon=True).start()
+        self._count(leader)
+        yield from buffer.replay()
+
+    def _pump(self, key: Hashable, buffer: _StreamBuffer, factory: Callable[[], Iterator[Any]]) -> None:
+        error = None
+        try:
+            for chunk in factory():
+                buffer.append(chunk)
+        except Exception as e:
+            error = e
+        finally:
+            # Bitmiş stream'e yeni katılan olmasın; sonraki istek cache'e veya yeni uçuşa gider
+            with self._lock:
+                if self._streams.get(key) is buffer:
+                    del self._streams[key]
+            buffer.finish(error)
+
+    async def astream(self, key: Optional[Hashable], factory: Callable[[], AsyncIterator[T]]) -> AsyncIterator[T]:
+        """stream'in async karşılığı; pompa event loop'ta ayrı bir task"""
+        if not self.enabled or key is None:
+            async for chunk in factory():
+                yield chunk
+            return
+        buffer = self._astreams.get(key)
+        leader = buffer is None
+        if leader:
+            buffer = self._astreams[key] = _AsyncStreamBuffer()
+            buffer.task = asyncio.ensure_future(self._apump(key, buffer, factory))
+        self._count(leader)
+        async for chunk in buffer.replay():
+            yield chunk
+
+    async def _apump(self, key: Hashable, buffer: _AsyncStreamBuffer,
+                     factory: Callable[[], AsyncIterator[Any]]) -> None:
+        error = None
+        try:
+            async for chunk in factory():
+                buffer.append(chunk)
+        except Exception as e:
+            error = e
+        except asyncio.CancelledError:
+            # Loop kapanırken iptal: bekleyenler yarım yanıtı tamamlanmış sanmasın
+            error = RuntimeError("Paylaşılan istek iptal edildi")
+            raise
+        finally:
+            if self._astreams.get(key) is buffer:
+                del self._astreams[key]
+            buffer.finish(error)
+
+    def in_flight(self) -> int:
+        """Şu an uçuştaki çağrı ve stream sayısı"""
+        with self._lock:
+            return len(self._calls) + len(self._streams) + len(self._astreams)
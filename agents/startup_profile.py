@@ -0,0 +1,93 @@
+"""
+Soğuk başlangıç profili.
+`python main.py --profile-startup` süreci PYTHONPROFILEIMPORTTIME=1 ile yeniden çalıştırır;
+CPython'un kendi import ölçümü (stderr) modül ve paket başına toplanır, başlangıç
+aşamalarının süreleri hedef süreyle birlikte raporlanır. Sadece standart kütüphane kullanır.
+"""
+
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from typing import Dict, Iterable, Iterator, List
+
+PHASE_MARKER = "STARTUP_PHASES "
+IMPORTTIME_PREFIX = "import time:"
+
+
+class ImportTiming:
+    """-X importtime çıktısındaki tek satır"""
+
+    def __init__(self, name: str, self_ms: float, cumulative_ms: float, depth: int):
+        self.name = name
+        self.self_ms = self_ms
+        self.cumulative_ms = cumulative_ms
+        self.depth = depth
+
+    @property
+    def package(self) -> str:
+        return self.name.split(".", 1)[0]
+
+
+class StartupTimer:
+    """Başlangıç aşamalarının sıralı süreleri (ms)"""
+
+    def __init__(self):
+        self.phases: "OrderedDict[str, float]" = OrderedDict()
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000
+
+
+def parse_importtime(lines: Iterable[str]) -> List[ImportTiming]:
+    """`import time: self [us] | cumulative | paket` satırlarını çöz (başlık satırı atlanır)"""
+    timings = []
+    for line in lines:
+        if not line.startswith(IMPORTTIME_PREFIX):
+            continue
+        fields = line[len(IMPORTTIME_PREFIX):].split("|")
+        if len(fields) != 3 or not fields[0].strip().isdigit():
+            continue
+        name_field = fields[2].rstrip()
+        # Her iç içe seviye iki boşluk girintilidir
+        depth = (len(name_field) - len(name_field.lstrip()) - 1) // 2
+        timings.append(ImportTiming(name_field.strip(), int(fields[0]) / 1000, int(fields[1]) / 1000, depth))
+    return timings
+
+
+def package_totals(timings: List[ImportTiming]) -> Dict[str, float]:
+    """Kök paket başına toplam (self) import süresi, büyükten küçüğe"""
+    totals: Dict[str, float] = defaultdict(float)
+    for timing in timings:
+        totals[timing.package] += timing.self_ms
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+
+
+def format_report(phases: Dict[str, float], timings: List[ImportTiming], target_ms: float,
+                  core_phases: Iterable[str], process_ms: float = 0.0, top: int = 15) -> str:
+    """Aşama süreleri, en pahalı paketler/modüller ve hedef karşılaştırması"""
+    core_phases = list(core_phases)
+    core_ms = sum(phases.get(name, 0.0) for name in core_phases)
+    lines = ["⏱️ Başlangıç profili", "", "Aşamalar:"]
+    for name, elapsed in phases.items():
+        lines.append(f"  {name:<16} {elapsed:8.0f} ms")
+    lines.append("")
+    status = "✅" if core_ms <= target_ms else "⚠️"
+    lines.append(f"{status} Agent hazır ({' + '.join(core_phases)}): {core_ms:.0f} ms / hedef {target_ms:.0f} ms")
+    ready_ms = sum(elapsed for name, elapsed in phases.items() if not name.startswith("warm"))
+    lines.append(f"   UI dahil hazır: {ready_ms:.0f} ms")
+    if process_ms:
+        lines.append(f"   Süreç (yorumlayıcı başlangıcı dahil): {process_ms:.0f} ms")
+
+    lines.extend(["", f"En pahalı paketler (self süre toplamı, ilk {top}):"])
+    for package, elapsed in list(package_totals(timings).items())[:top]:
+        lines.append(f"  {package:<32} {elapsed:8.1f} ms")
+
+    lines.extend(["", f"En pahalı modüller (kümülatif, ilk {top}):"])
+    for timing in sorted(timings, key=lambda t: t.cumulative_ms, reverse=True)[:top]:
+        lines.append(f"  {timing.name:<48} {timing.cumulative_ms:8.1f} ms")
+    return "\n".join(lines)
@@ -0,0 +1,117 @@
+"""
+Token-by-token streaming yardımcıları.
+LangChain ReAct agent'ının ürettiği JSON blob'dan "Final Answer" metnini
+token'lar geldikçe ayıklar ve bir kuyruğa aktarır.
+"""
+
+import asyncio
+import json
+import queue
+import re
+from typing import Any, Dict, List, Optional
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+# Kuyruğun sonunu işaret eden nesne
+STREAM_END = object()
+
+_FINAL_ANSWER_RE = re.compile(
+    r'"action"\s*:\s*"Final Answer"\s*,\s*"action_input"\s*:\s*"'
+)
+
+_SIMPLE_ESCAPES = {
+    '"': '"',
+    "\\": "\\",
+    "/": "/",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+}
+
+
+class AsyncQueueWriter:
+    """asyncio.Queue'yu handler'ın beklediği put() arayüzüyle sarar (aynı event loop içinde)."""
+
+    def __init__(self, output_queue: "asyncio.Queue[Any]"):
+        self.queue = output_queue
+
+    def put(self, item: Any) -> None:
+        self.queue.put_nowait(item)
+
+
+class FinalAnswerStreamHandler(BaseCallbackHandler):
+    """ReAct çıktısındaki Final Answer metnini parça parça kuyruğa yazar."""
+
+    # Async agent çağrılarında executor'a atılmadan event loop içinde çalışsın
+    run_inline = True
+
+    def __init__(self, output_queue: "queue.Queue[Any]"):
+        self.queue = output_queue
+        self.streamed_text = ""
+        self._buffer = ""
+        self._cursor: Optional[int] = None
+        self._done = False
+
+    def _reset(self) -> None:
+        """Her yeni LLM çağrısında parser durumunu sıfırla."""
+        self._buffer = ""
+        self._cursor = None
+        self._done = False
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> None:
+        self._reset()
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any) -> None:
+        self._reset()
+
+    def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Gelen token'ı tampona ekle, Final Answer içindeyse çözülmüş metni yayınla."""
+        if self._done or not token:
+            return
+        self._buffer += token
+
+        if self._cursor is None:
+            match = _FINAL_ANSWER_RE.search(self._buffer)
+            if not match:
+                return
+            self._cursor = match.end()
+
+        chunk = self._decode_available()
+        if chunk:
+            self.streamed_text += chunk
+            self.queue.put(chunk)
+
+    def _decode_available(self) -> str:
+        """JSON string içeriğini, tamamlanmış escape'lere kadar çöz."""
+        out = []
+        buffer = self._buffer
+        i = self._cursor
+        while i < len(buffer):
+            char = buffer[i]
+            if char == '"':
+                self._done = True
+                i += 1
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            # Escape dizisi henüz tamamlanmadıysa sonraki token'ı bekle
+            if i + 1 >= len(buffer):
+                break
+            code = buffer[i + 1]
+            if code == "u":
+                if i + 6 > len(buffer):
+                    break
+                try:
+                    out.append(json.loads(f'"{buffer[i:i + 6]}"'))
+                except ValueError:
+                    out.append(buffer[i:i + 6])
+                i += 6
+                continue
+            out.append(_SIMPLE_ESCAPES.get(code, code))
+            i += 2
+        self._cursor = i
+        return "".join(out)
@@ -0,0 +1,133 @@
+"""
+Yerel extractive özetleyici (TextRank).
+Cümle bölme, TF-IDF cümle vektörleri ve ağırlıklı graf sıralaması; istatistikler
+Python'da kesin olarak hesaplanır. Graf boyutu sınırlıdır, bu yüzden on binlerce
+kelimelik metinler de bellek patlamadan saniyenin altında özetlenir.
+"""
+
+import math
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Optional
+
+from agents.text_stats import STOPWORDS, WORD_RE, looks_turkish, split_sentences, turkish_lower
+
+# Graf sıralamasına girecek en fazla cümle; fazlası önce merkez benzerliğiyle elenir
+MAX_GRAPH_SENTENCES = 300
+DAMPING = 0.85
+MAX_ITERATIONS = 50
+TOLERANCE = 1e-6
+
+
+def _sentence_terms(sentences: List[str], turkish: bool) -> List[List[str]]:
+    """Her cümlenin stopword'süz terimleri"""
+    lower = turkish_lower if turkish else str.lower
+    return [
+        [word for word in WORD_RE.findall(lower(sentence)) if word not in STOPWORDS and len(word) > 1]
+        for sentence in sentences
+    ]
+
+
+def _tfidf_vectors(term_lists: List[List[str]]) -> List[Dict[str, float]]:
+    """L2-normalize seyrek TF-IDF vektörleri"""
+    doc_freq: Counter = Counter()
+    for terms in term_lists:
+        doc_freq.update(set(terms))
+    total = len(term_lists)
+
+    vectors = []
+    for terms in term_lists:
+        counts = Counter(terms)
+        vector = {term: count * (math.log(total / doc_freq[term]) + 1.0) for term, count in counts.items()}
+        norm = math.sqrt(sum(weight * weight for weight in vector.values()))
+        vectors.append({term: weight / norm for term, weight in vector.items()} if norm else {})
+    return vectors
+
+
+def _prefilter(vectors: List[Dict[str, float]], limit: int) -> List[int]:
+    """Çok uzun metinlerde merkez vektöre en yakın `limit` cümleyi seç (orijinal sırayla)"""
+    if len(vectors) <= limit:
+        return list(range(len(vectors)))
+    centroid: Dict[str, float] = defaultdict(float)
+    for vector in vectors:
+        for term, weight in vector.items():
+            centroid[term] += weight
+    scores = [sum(weight * centroid[term] for term, weight in vector.items()) for vector in vectors]
+    best = sorted(range(len(vectors)), key=lambda i: scores[i], reverse=True)[:limit]
+    return sorted(best)
+
+
+def _textrank(vectors: List[Dict[str, float]]) -> List[float]:
+    """Kosinüs benzerliği grafında PageRank (ters indeks ile sadece ortak terimli çiftler)"""
+    count = len(vectors)
+    if count == 1:
+        return [1.0]
+
+    postings: Dict[str, List[tuple]] = defaultdict(list)
+    for index, vector in enumerate(vectors):
+        for term, weight in vector.items():
+            postings[term].append((index, weight))
+
+    edges: List[Dict[int, float]] = [defaultdict(float) for _ in range(count)]
+    for entries in postings.values():
+        for a in range(len(entries)):
+            i, weight_i = entries[a]
+            for b in range(a + 1, len(entries)):
+                j, weight_j = entries[b]
+                similarity = weight_i * weight_j
+                edges[i][j] += similarity
+                edges[j][i] += similarity
+
+    out_weights = [sum(neighbors.values()) for neighbors in edges]
+    scores = [1.0 / count] * count
+    base = (1.0 - DAMPING) / count
+    for _ in range(MAX_ITERATIONS):
+        # Bağlantısız cümlelerin skoru tüm grafa eşit dağıtılır
+        dangling = sum(scores[i] for i in range(count) if not out_weights[i]) / count
+        updated = []
+        for i in range(count):
+            rank = sum(scores[j] * weight / out_weights[j] for j, weight in edges[i].items())
+            updated.append(base + DAMPING * (rank + dangling))
+        delta = sum(abs(new - old) for new, old in zip(updated, scores))
+        scores = updated
+        if delta < TOLERANCE:
+            break
+    return scores
+
+
+def summarize(text: str, sentence_count: Optional[int] = None, ratio: float = 0.2, key_terms: int = 5) -> Dict[str, Any]:
+    """Metni extractive olarak özetle ve kesin istatistikleri döndür"""
+    sentences = split_sentences(text)
+    turkish = looks_turkish(text)
+    original_words = len(WORD_RE.findall(text))
+
+    if not sentences:
+        return {"summary": "", "sentences": [], "original_words": 0, "summary_words": 0,
+                "compression_ratio": 0.0, "key_terms": []}
+
+    if sentence_count is None:
+        sentence_count = max(1, min(10, round(len(sentences) * ratio)))
+    sentence_count = min(sentence_count, len(sentences))
+
+    term_lists = _sentence_terms(sentences, turkish)
+    vectors = _tfidf_vectors(term_lists)
+    candidates = _prefilter(vectors, MAX_GRAPH_SENTENCES)
+    ranks = _textrank([vectors[i] for i in candidates])
+
+    ranked = sorted(range(len(candidates)), key=lambda k: ranks[k], reverse=True)[:sentence_count]
+    chosen = sorted(candidates[k] for k in ranked)
+    summary_sentences = [sentences[i] for i in chosen]
+    summary = " ".join(summary_sentences)
+    summary_words = len(WORD_RE.findall(summary))
+
+    term_frequency: Counter = Counter()
+    for terms in term_lists:
+        term_frequency.update(terms)
+
+    return {
+        "summary": summary,
+        "sentences": summary_sentences,
+        "original_words": original_words,
+        "summary_words": summary_words,
+        "compression_ratio": round(100 * (1 - summary_words / original_words), 1) if original_words else 0.0,
+        "key_terms": [term for term, _ in term_frequency.most_common(key_terms)],
+    }
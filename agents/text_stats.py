@@ -0,0 +1,136 @@
+"""
+Yerel (LLM'siz) metin istatistikleri motoru.
+Unicode/Türkçe uyumlu tokenization ile kelime, cümle, karakter sayıları,
+tür/token oranı, ortalama uzunluklar, öne çıkan terimler ve okunabilirlik hesaplar.
+"""
+
+import re
+from collections import Counter
+from typing import Any, Dict, List
+
+# Harf tabanlı kelimeler (kesme işaretli ekler dahil: "Türkiye'nin", "don't")
+WORD_RE = re.compile(r"[^\W\d_]+(?:['’][^\W\d_]+)*")
+NUMBER_RE = re.compile(r"\d+(?:[.,]\d+)*")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?…])\s+|\n\s*\n")
+PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n")
+
+TURKISH_CHARS = frozenset("çğıöşüÇĞİÖŞÜ")
+TURKISH_VOWELS = frozenset("aeıioöuüâîû")
+ENGLISH_VOWEL_GROUP_RE = re.compile(r"[aeiouy]+")
+
+STOPWORDS = frozenset("""
+ve veya ile de da ki bu şu o bir için gibi çok daha en ama fakat ancak çünkü ne mi mı mu mü
+ben sen biz siz onlar bunu şunu onu olarak olan oldu var yok her hem ya kadar sonra önce
+the a an and or but of to in on at for with is are was were be been it this that these those
+as by from not no so if then than i you he she we they my your our their its do does did
+me us him her them what which who whom how why when where there here all some any very also
+just can could will would should about into over more most such only own same too
+nasıl neden niye şey bazı tüm bütün hiç ise diye kendi sadece yani böyle şöyle öyle artık
+le la les un une des du de et ou mais est sont je tu il elle nous vous ils elles ce cette que qui
+dans sur pour par avec pas ne au aux son sa ses leur mon ma mes
+der die das ein eine einen und oder aber ist sind ich du er sie es wir ihr nicht mit von zu
+im in auf für den dem des bei aus auch noch wie was hat haben
+""".split())
+
+WORDS_PER_MINUTE = 200
+
+
+def turkish_lower(text: str) -> str:
+    """Türkçe I/İ dönüşümünü doğru yapan küçük harfe çevirme"""
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def looks_turkish(text: str) -> bool:
+    """Türkçeye özgü harf içeriyor mu?"""
+    return any(char in TURKISH_CHARS for char in text)
+
+
+def split_sentences(text: str) -> List[str]:
+    """Metni cümlelere böl"""
+    return [" ".join(s.split()) for s in SENTENCE_SPLIT_RE.split(text) if s and s.strip()]
+
+
+def count_syllables(word: str, turkish: bool) -> int:
+    """Hece sayısı: Türkçede ünlü sayısı, İngilizcede ünlü grubu sezgisi"""
+    if turkish:
+        return max(1, sum(1 for char in word if char in TURKISH_VOWELS))
+    groups = len(ENGLISH_VOWEL_GROUP_RE.findall(word))
+    if word.endswith("e") and not word.endswith("le") and groups > 1:
+        groups -= 1
+    return max(1, groups)
+
+
+def readability(words: List[str], sentence_count: int, turkish: bool) -> Dict[str, Any]:
+    """Türkçe için Ateşman, diğerleri için Flesch Reading Ease"""
+    if not words or not sentence_count:
+        return {"formula": "atesman" if turkish else "flesch", "score": None, "level": None}
+
+    syllables = sum(count_syllables(word, turkish) for word in words)
+    syllables_per_word = syllables / len(words)
+    words_per_sentence = len(words) / sentence_count
+
+    if turkish:
+        score = 198.825 - 40.175 * syllables_per_word - 2.610 * words_per_sentence
+        formula = "atesman"
+    else:
+        score = 206.835 - 84.6 * syllables_per_word - 1.015 * words_per_sentence
+        formula = "flesch"
+    score = max(0.0, min(100.0, score))
+
+    if score >= 90:
+        level = "çok kolay"
+    elif score >= 70:
+        level = "kolay"
+    elif score >= 50:
+        level = "orta"
+    elif score >= 30:
+        level = "zor"
+    else:
+        level = "çok zor"
+
+    return {
+        "formula": formula,
+        "score": round(score, 2),
+        "level": level,
+        "syllables": syllables,
+        "syllables_per_word": round(syllables_per_word, 3),
+    }
+
+
+def analyze_text(text: str, top_n: int = 10) -> Dict[str, Any]:
+    """Metnin tüm istatistiklerini tek geçişte hesapla"""
+    turkish = looks_turkish(text)
+    lowered = turkish_lower(text) if turkish else text.lower()
+
+    words = WORD_RE.findall(lowered)
+    sentences = split_sentences(text)
+    paragraphs = [p for p in PARAGRAPH_SPLIT_RE.split(text) if p.strip()]
+    counts = Counter(words)
+
+    word_count = len(words)
+    letter_count = sum(len(word) for word in words)
+    sentence_count = len(sentences)
+
+    top_terms = [
+        {"term": term, "count": count}
+        for term, count in counts.most_common()
+        if term not in STOPWORDS and len(term) > 1
+    ][:top_n]
+
+    return {
+        "characters": len(text),
+        "characters_no_spaces": sum(1 for char in text if not char.isspace()),
+        "letters": letter_count,
+        "words": word_count,
+        "unique_words": len(counts),
+        "numbers": len(NUMBER_RE.findall(text)),
+        "sentences": sentence_count,
+        "paragraphs": len(paragraphs),
+        "type_token_ratio": round(len(counts) / word_count, 4) if word_count else 0.0,
+        "avg_word_length": round(letter_count / word_count, 2) if word_count else 0.0,
+        "avg_sentence_length": round(word_count / sentence_count, 2) if sentence_count else 0.0,
+        "reading_time_seconds": round(word_count / WORDS_PER_MINUTE * 60, 1),
+        "top_terms": top_terms,
+        "readability": readability(words, sentence_count, turkish),
+        "script_hint": "tr" if turkish else "latin",
+    }
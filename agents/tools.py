@@ -3,32 +3,51 @@ LangChain + Meta-Llama Maverick Prompt-Based Tool Integration
 Tool'lar artık LLM'in kendi yetenekleri ile entegre çalışıyor
 """
 
-from langchain.tools import Tool
-from typing import List
-import datetime
+from typing import TYPE_CHECKING, Callable, List
+import functools
 import json
-import requests
-from typing import Optional
-from groq import Groq
-import os
+import time
+from agents.text_stats import analyze_text, WORD_RE
+from agents.summarizer import summarize
+from agents.clock import find_timezone, format_now
+from agents.language_detection import get_detector
+from config.settings import get_settings
+from agents.clients import get_groq_client
+from agents.completions import complete
+from agents.metrics import TOOL_LATENCY
+from agents.singleflight import SingleFlight
+from agents.tracing import span
+
+if TYPE_CHECKING:
+    from langchain_core.tools import Tool
 
 class PromptBasedToolEngine:
     """Gerçek Llama 4 Maverick ile prompt-based tool engine"""
     
     def __init__(self):
-        self.client = Groq(api_key=os.getenv("GROQ_API_KEY"))
         self.model = "llama-4-maverick-17b-128e-instruct"  # GERÇEK Llama 4 Maverick!
-
-    def _call_llm(self, prompt: str) -> str:
-        """Gerçek Llama 4 Maverick'i çağır ve sonucu al"""
+        # Aynı anda gelen özdeş tool prompt'ları tek çağrıyı paylaşır
+        self.flights = SingleFlight("tool_llm")
+    
+    @property
+    def client(self):
+        """Paylaşımlı, connection pool'lu Groq istemcisi"""
+        return get_groq_client()
+
+    def _call_llm(self, prompt: str, site: str = "tool") -> str:
+        """Gerçek Llama 4 Maverick'i çağır ve sonucu al (uçuştaki özdeş prompt varsa onu bekle)"""
+        key = (self.model, prompt) if get_settings().singleflight_enabled else None
+        return self.flights.do(key, lambda: self._complete(prompt, site))
+
+    def _complete(self, prompt: str, site: str) -> str:
+        """Tek upstream Maverick çağrısı; hata metin olarak döner"""
         try:
-            completion = self.client.chat.completions.create(
+            completion = complete(
+                self.client,
+                site,
                 model=self.model,
                 messages=[
-                    {
-                        "role": "system", 
-                        "content": "Sen gerçek Llama 4 Maverick'sin. 17B parametre, 128K context ile güçlü tool işlemleri yapıyorsun. Sorulan görev için doğru ve yapılandırılmış yanıt ver."
-                    },
+                    {"role": "system", "content": get_settings().prompts.tool_system},
                     {"role": "user", "content": prompt}
                 ],
                 max_tokens=2048,  # Maverick için artırıldı
@@ -41,192 +60,163 @@ class PromptBasedToolEngine:
 # Global tool engine instance
 tool_engine = PromptBasedToolEngine()
 
-def get_current_time(_: str = "") -> str:
-    """Gerçek Llama 4 Maverick ile akıllı zaman işlemi"""
-    prompt = f"""
-Şu anki tarih ve saat bilgisini ver:
-- Tarih: 7 Ağustos 2025, Perşembe
-- Tahmini saat: Günün hangi saati olabileceğini tahmin et (sabah/öğle/akşam context'ine göre)
-
-Sen gerçek Llama 4 Maverick'sin (17B parametre). Şu formatta yanıt ver:
-📅 Tarih: [gün] [ay] [yıl]
-🗓️ Gün: [gün adı]
-🕐 Saat: [tahmin edilen saat]
-📍 Zaman Dilimi: Türkiye Saati (UTC+3)
-🚀 Model: Llama 4 Maverick 17B
-
-Türkçe ay isimleri kullan: Ocak, Şubat, Mart, Nisan, Mayıs, Haziran, Temmuz, Ağustos, Eylül, Ekim, Kasım, Aralık
-"""
-    return tool_engine._call_llm(prompt)
+def _parse_tool_input(raw: str) -> dict:
+    """
+    Tool girdisini çöz. Düz metin ya da {"text": "...", ...} şeklinde JSON kabul edilir;
+    JSON içindeki ek alanlar (ör. "tone") seçenek olarak döner.
+    """
+    stripped = raw.strip()
+    if stripped.startswith("{"):
+        try:
+            data = json.loads(stripped)
+            if isinstance(data, dict):
+                if not isinstance(data.get("text"), str):
+                    data["text"] = ""
+                return data
+        except ValueError:
+            pass
+    return {"text": raw}
+
+def get_current_time(query: str = "") -> str:
+    """Sistem saatinden gerçek tarih/saat (zoneinfo, LLM çağrısı yok)"""
+    options = _parse_tool_input(query or "")
+    timezone = options.get("timezone")
+    # Düz girdi bir IANA zaman dilimi ("Europe/London", "UTC") veya şehir adı ("Tokyo") olabilir
+    if not timezone and options["text"].strip():
+        timezone = find_timezone(options["text"])
+    return format_now(
+        timezone=timezone,
+        language=options.get("language", "tr"),
+        default_timezone=get_settings().default_timezone
+    )
 
 def text_analyzer(text: str) -> str:
-    """Meta-Llama Maverick ile gelişmiş metin analizi"""
-    prompt = f""
-    # Prompt-based intent classifier
-    def classify_intent_with_llm(message: str, tools: List[Tool]) -> Optional[str]:
-        """
-        LLM tabanlı: Kullanıcı mesajından en uygun tool'u seçer. Sadece tool adını (name) döndürür.
-        """
-        from groq import Groq
-        import os
-        import json
-        # Tool açıklamalarını al
-        tool_descriptions = {tool.name: tool.description for tool in tools}
-        prompt = f"""
-Kullanıcı mesajı: {message}
-
-Aşağıda kullanabileceğin tool'lar ve açıklamaları var:
-{json.dumps(tool_descriptions, ensure_ascii=False, indent=2)}
-
-En uygun tool'un sadece adını (name) tek kelime olarak döndür.
-Ekstra açıklama, kod veya başka bir şey yazma.
-"""
-        client = Groq(api_key=os.getenv("GROQ_API_KEY"))
-        try:
-            completion = client.chat.completions.create(
-                model="llama-3.3-70b-versatile",
-                messages=[
-                    {"role": "system", "content": "Sen bir AI asistanısın. Sadece en uygun tool adını (name) döndür."},
-                    {"role": "user", "content": prompt}
-                ],
-                max_tokens=16,
-                temperature=0.0
-            )
-            tool_name = completion.choices[0].message.content.strip().split()[0]
-            if tool_name in tool_descriptions:
-                return tool_name
-            return None
-        except Exception as e:
-            return None
-    return tool_engine._call_llm(prompt)
+    """Yerel metin istatistikleri; istenirse LLM ile ton yorumu ekler"""
+    options = _parse_tool_input(text)
+    content = options["text"]
+    result = analyze_text(content)
+    
+    # Ton yorumu sadece açıkça istendiğinde LLM'e gider
+    if options.get("tone"):
+        prompt = f"{get_settings().prompts.tone}\n\nMETİN:\n{content}"
+        result["tone"] = tool_engine._call_llm(prompt, site="tool:text_analyzer")
+    
+    return json.dumps(result, ensure_ascii=False, indent=2)
 
 def language_detector(text: str) -> str:
-    """Meta-Llama Maverick ile gelişmiş dil analizi"""
-    prompt = f"""
-Aşağıdaki metnin dilini ve dil özelliklerini analiz et:
-
-METİN:
-{text}
-
-Analiz şu bilgileri içermeli:
-1. Ana dil tespiti
-2. Güven skoru (yüzde olarak)
-3. Tespit edilen dil özellik kelimeleri
-4. Karıştırılan diller varsa onları da belirt
-5. Metindeki kültürel referanslar
-6. Dil seviyesi (günlük/resmi/teknik/akademik)
-7. Bölgesel dialekt ipuçları varsa
-
-JSON formatında detaylı rapor ver ve linguistic insight'lar ekle.
-"""
-    return tool_engine._call_llm(prompt)
-
-def text_summarizer(text: str) -> str:
-    """Meta-Llama Maverick ile akıllı özetleme"""
-    prompt = f"""
-Aşağıdaki metni Maverick seviyede akıllı özetleme ile özetle:
+    """Yerel n-gram dil tespiti; güven eşiğin altındaysa Maverick ile detaylı analiz"""
+    report = get_detector().analyze(text)
+    if report["confidence"] >= get_settings().language_confidence_threshold:
+        report["source"] = "local"
+        return json.dumps(report, ensure_ascii=False, indent=2)
+    
+    prompt = f"{get_settings().prompts.language}\n\nMETİN:\n{text}"
+    report["source"] = "local+llm"
+    report["llm_analysis"] = tool_engine._call_llm(prompt, site="tool:language_detector")
+    return json.dumps(report, ensure_ascii=False, indent=2)
 
-METİN:
-{text}
+def _format_summary(summary: str, original_words: int, summary_words: int, key_points: List[str], mode: str) -> str:
+    """Özet çıktısını Python'da hesaplanan kesin istatistiklerle biçimlendir"""
+    ratio = round(100 * (1 - summary_words / original_words), 1) if original_words else 0.0
+    points = "\n".join(f"- {point}" for point in key_points)
+    return f"""📝 ÖZET: {summary}
 
-Özetleme kuralları:
-1. Ana fikirleri koru ve vurgula
-2. Önemli detayları kaçırma
-3. Orijinal tonunu muhafaza et
-4. Key insight'ları korumaya odaklan
-5. Özet oranını belirt (örn: 500→100 kelime)
+📊 İSTATİSTİK:
+- Orijinal: {original_words} kelime
+- Özet: {summary_words} kelime
+- Sıkıştırma oranı: {ratio}%
+- Mod: {mode}
 
-Şu formatta sun:
-📝 ÖZET: [özetlenmiş metin]
+💡 ANAHTAR TERİMLER:
+{points}"""
 
-📊 İSTATİSTİK:
-- Orijinal: [kelime sayısı] kelime
-- Özet: [kelime sayısı] kelime  
-- Sıkıştırma oranı: [yüzde]%
-
-💡 ANA FİKİRLER:
-- [ana fikir 1]
-- [ana fikir 2]
-- [ana fikir 3]
-"""
-    return tool_engine._call_llm(prompt)
+def text_summarizer(text: str) -> str:
+    """Yerel TextRank özetleme; abstractive LLM özeti isteğe bağlı"""
+    options = _parse_tool_input(text)
+    content = options["text"]
+    mode = options.get("mode", get_settings().summarizer_mode)
+    result = summarize(content, sentence_count=options.get("sentences"))
+    
+    if mode != "abstractive":
+        return _format_summary(result["summary"], result["original_words"], result["summary_words"], result["key_terms"], "extractive")
+    
+    prompt = f"{get_settings().prompts.summarize}\n\nMETİN:\n{content}"
+    summary = tool_engine._call_llm(prompt, site="tool:text_summarizer").strip()
+    return _format_summary(summary, result["original_words"], len(WORD_RE.findall(summary)), result["key_terms"], "abstractive")
 
 def web_search(query: str) -> str:
     """Meta-Llama Maverick ile akıllı arama simülasyonu"""
-    prompt = f"""
-Aşağıdaki arama sorgusuna Maverick seviyede bilgi ver:
-
-SORGU: {query}
-
-Yapman gerekenler:
-1. Sorguyu analiz et ve ne tür bilgi arandığını tespit et
-2. Genel bilgi databasen'den relevan bilgileri çek
-3. Güncel kontekst ile birleştir (2025 Ağustos bazlı)
-4. Yapılandırılmış ve değerli yanıt oluştur
+    prompt = f"{get_settings().prompts.search}\n\nSORGU: {query}"
+    return tool_engine._call_llm(prompt, site="tool:web_search")
+
+def _traced(name: str, func: Callable[[str], str]) -> Callable[[str], str]:
+    """Tool çağrısını span + süre metriğiyle sar (agent, router ve paralel yol aynı sarmalı kullanır)"""
+    @functools.wraps(func)
+    def run(tool_input: str) -> str:
+        started = time.perf_counter()
+        try:
+            with span("tool", tool=name):
+                return func(tool_input)
+        finally:
+            TOOL_LATENCY.observe(time.perf_counter() - started, tool=name)
+    return run
 
-Özel konular:
-- Hava durumu: Genel tahmin ver
-- Teknoloji: Güncel trends dahil et
-- Haberler: 2025 kontekstinde genel bilgi
-- Programlama: Best practices ve örnekler
 
-Şu formatta yanıt ver:
-🔍 ARAMA SONUCU: [ana bilgi]
+class ToolSpec:
+    """Tool tanımı; router ve paralel çalıştırıcı LangChain'i yüklemeden `func`'ı doğrudan çağırır"""
 
-📊 DETAYLAR:
-- [detay 1]
-- [detay 2]  
-- [detay 3]
+    def __init__(self, name: str, description: str, func: Callable[[str], str]):
+        self.name = name
+        self.description = description
+        self.func = _traced(name, func)
 
-� ÖNERİLER:
-- [öneri/insight 1]
-- [öneri/insight 2]
 
-Eğer bilgi yoksa, en iyi tahminini ve alternatifleri sun.
-"""
-    return tool_engine._call_llm(prompt)
-
-def create_tools() -> List[Tool]:
-    """Meta-Llama Maverick ile prompt-based tool'ları oluştur"""
+def tool_specs() -> List[ToolSpec]:
+    """Meta-Llama Maverick ile prompt-based tool tanımları"""
     
-    tools = [
-        Tool(
+    return [
+        ToolSpec(
             name="get_current_time",
             description=(
-                "Meta-Llama Maverick ile akıllı zaman/tarih işlemi. "
+                "Sistem saatinden gerçek tarih/saat bilgisi (anında, LLM çağrısı yok). "
                 "Kullanıcı 'Saat kaç?', 'Bugün ne günü?', 'Tarih nedir?' sorduğunda çağır. "
-                "LLM ile tahminli saat ve detaylı zaman bilgisi verir."
+                "Girdi boş olabilir ya da 'Europe/London' gibi bir zaman dilimi veya 'Tokyo' gibi "
+                "bir şehir adı olabilir; "
+                "JSON nesnesi verilirse 'timezone' ve 'language' ('tr'/'en') alanları okunur."
             ),
             func=get_current_time
         ),
-        Tool(
+        ToolSpec(
             name="text_analyzer",
             description=(
-                "Meta-Llama Maverick ile gelişmiş metin analizi. "
+                "Yerel ve anında metin istatistikleri (LLM çağrısı yok). "
                 "Kullanıcı 'Bu metni analiz et', 'Kaç kelime var?', 'İstatistik ver' dediğinde çağır. "
-                "LLM ile detaylı analiz, dil tespiti, ton analizi yapar."
+                "Kelime/cümle/karakter sayısı, tür/token oranı, öne çıkan terimler ve okunabilirlik "
+                "JSON olarak döner. Ton yorumu gerekiyorsa girdiyi 'text' ve 'tone': true alanlı JSON nesnesi olarak ver."
             ),
             func=text_analyzer
         ),
-        Tool(
+        ToolSpec(
             name="text_summarizer",
             description=(
-                "Meta-Llama Maverick ile akıllı özetleme. "
+                "Yerel extractive (TextRank) özetleme, kesin kelime istatistikleriyle. "
                 "Kullanıcı 'Özetle', 'Kısalt', 'Summary' istediğinde çağır. "
-                "LLM ile key insight'ları koruyarak özetler."
+                "Yeniden yazılmış (abstractive) LLM özeti gerekiyorsa girdiyi "
+                "'text' ve 'mode': 'abstractive' alanlı JSON nesnesi olarak ver."
             ),
             func=text_summarizer
         ),
-        Tool(
+        ToolSpec(
             name="language_detector",
             description=(
-                "Meta-Llama Maverick ile gelişmiş dil analizi. "
+                "Yerel n-gram dil tespiti (Türkçe, English, Français, Deutsch). "
                 "Kullanıcı 'Hangi dilde?', 'Dil analizi yap' dediğinde çağır. "
-                "LLM ile kültürel context ve linguistic insight'lar verir."
+                "Güven skoru ve karışık dil aralıklarını JSON olarak verir; "
+                "güven düşükse LLM ile kültürel context ve linguistic insight ekler."
             ),
             func=language_detector
         ),
-        Tool(
+        ToolSpec(
             name="web_search",
             description=(
                 "Meta-Llama Maverick ile akıllı bilgi arama. "
@@ -236,4 +226,10 @@ def create_tools() -> List[Tool]:
             func=web_search
         )
     ]
-    return tools
+
+
+def create_tools() -> List["Tool"]:
+    """Tool tanımlarından LangChain Tool'ları oluştur (agent kurulurken çağrılır)"""
+    # langchain.tools yerine langchain_core.tools: aynı sınıf, import süresi ~5 kat kısa
+    from langchain_core.tools import Tool
+    return [Tool(name=spec.name, description=spec.description, func=spec.func) for spec in tool_specs()]
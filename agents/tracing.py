@@ -0,0 +1,200 @@
+"""
+İstek başına yapılandırılmış span'ler.
+Her kullanıcı mesajı request id'li bir Trace açar; yönlendirme, LLM çağrıları, tool'lar,
+görsel ön işleme ve Gemini HTTP çağrısı bu trace'e span olarak eklenir. İstek bitince
+span'ler tek JSON satırı olarak loglanır; süreler metriklere her durumda yazılır.
+Context thread havuzlarına kendiliğinden geçmez: submit edilen işler `propagate` ile sarılır.
+"""
+
+import contextvars
+import json
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from agents.metrics import ERRORS, REQUEST_LATENCY, REQUESTS_IN_FLIGHT, SPAN_LATENCY
+from config.settings import get_settings
+
+import logging
+
+logger = logging.getLogger(__name__)
+# Trace satırları ayrı logger'da: JSON olarak toplanabilir veya seviyesiyle kapatılabilir
+trace_logger = logging.getLogger("agents.trace")
+
+
+class Span:
+    """Trace içindeki tek bir zamanlanmış işlem"""
+
+    def __init__(self, name: str, parent_id: Optional[str] = None, attrs: Optional[Dict[str, Any]] = None):
+        self.span_id = uuid.uuid4().hex[:8]
+        self.name = name
+        self.parent_id = parent_id
+        self.attrs: Dict[str, Any] = dict(attrs or {})
+        self.started = time.perf_counter()
+        self.duration_ms: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def set(self, **attrs: Any) -> None:
+        """Span'e öznitelik ekle"""
+        self.attrs.update(attrs)
+
+    def finish(self, error: Optional[str] = None) -> None:
+        self.duration_ms = (time.perf_counter() - self.started) * 1000
+        self.error = error
+
+    def as_dict(self, origin: float) -> Dict[str, Any]:
+        data = {
+            "span": self.name,
+            "id": self.span_id,
+            "parent": self.parent_id,
+            "start_ms": round((self.started - origin) * 1000, 1),
+            "ms": round(self.duration_ms or 0.0, 1),
+        }
+        data.update(self.attrs)
+        if self.error:
+            data["error"] = self.error
+        return data
+
+
+class Trace:
+    """Bir isteğin kök span'i ve tamamlanan alt span'leri"""
+
+    def __init__(self, kind: str, attrs: Optional[Dict[str, Any]] = None):
+        self.request_id = uuid.uuid4().hex[:12]
+        self.kind = kind
+        self.root = Span("request", attrs=attrs)
+        self._lock = threading.Lock()
+        self.spans: List[Span] = []
+
+    def add(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def as_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = sorted(self.spans, key=lambda span: span.started)
+        return {
+            "request_id": self.request_id,
+            "kind": self.kind,
+            "ms": round(self.root.duration_ms or 0.0, 1),
+            **self.root.attrs,
+            **({"error": self.root.error} if self.root.error else {}),
+            "spans": [span.as_dict(self.root.started) for span in spans],
+        }
+
+
+_current_trace: "contextvars.ContextVar[Optional[Trace]]" = contextvars.ContextVar("trace", default=None)
+_current_span: "contextvars.ContextVar[Optional[Span]]" = contextvars.ContextVar("span", default=None)
+
+
+def current_request_id() -> Optional[str]:
+    """Aktif isteğin id'si (istek dışında None)"""
+    trace = _current_trace.get()
+    return trace.request_id if trace else None
+
+
+def annotate(**attrs: Any) -> None:
+    """Aktif isteğin kök span'ine öznitelik ekle (ör. route)"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.root.set(**attrs)
+
+
+def mark_error(error: BaseException) -> None:
+    """Yakalanıp kullanıcıya mesaj olarak dönen hatayı aktif isteğe işle"""
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.root.error = type(error).__name__
+
+
+@contextmanager
+def request_scope(kind: str, **attrs: Any) -> Iterator[Optional[Trace]]:
+    """
+    Bir kullanıcı mesajının trace'ini aç. İç içe çağrılarda dıştaki (henüz bitmemiş) trace kullanılır.
+    ContextVar'lar token yerine önceki değere geri alınır: stream'ler farklı
+    thread/context'lerde devam ettirilebildiği için reset(token) güvenli değil.
+    """
+    active = _current_trace.get()
+    # Bitmiş trace: stream'i başka context'te kapatılmış bir istekten kalmış olabilir
+    if active is not None and active.root.duration_ms is None:
+        yield active
+        return
+    trace = Trace(kind, attrs)
+    previous_span = _current_span.get()
+    _current_trace.set(trace)
+    _current_span.set(trace.root)
+    REQUESTS_IN_FLIGHT.inc()
+    error = None
+    try:
+        yield trace
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        REQUESTS_IN_FLIGHT.dec()
+        _current_trace.set(None)
+        _current_span.set(previous_span)
+        _finish_request(trace, error)
+
+
+def _finish_request(trace: Trace, error: Optional[str]) -> None:
+    trace.root.finish(error or trace.root.error)
+    if trace.root.error:
+        ERRORS.inc(stage="request")
+    REQUEST_LATENCY.observe(trace.root.duration_ms / 1000, kind=trace.kind,
+                            route=trace.root.attrs.get("route", "agent"))
+    settings = get_settings()
+    if settings.tracing_enabled and trace.root.duration_ms >= settings.trace_log_min_ms:
+        trace_logger.info(json.dumps(trace.as_dict(), ensure_ascii=False, default=str))
+
+
+@contextmanager
+def span(name: str, **attrs: Any) -> Iterator[Span]:
+    """Senkron bir bloğu span olarak ölç (içinde yield olan stream'ler için record_span kullanın)"""
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attrs)
+    _current_span.set(current)
+    error = None
+    try:
+        yield current
+    except Exception as e:
+        error = type(e).__name__
+        raise
+    finally:
+        _current_span.set(parent)
+        current.finish(error)
+        _observe(current)
+
+
+def record_span(name: str, elapsed_ms: float, error: Optional[str] = None, **attrs: Any) -> None:
+    """Süresi zaten ölçülmüş (ör. stream bittiğinde) bir span'i kaydet"""
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attrs)
+    current.started = time.perf_counter() - elapsed_ms / 1000
+    current.duration_ms = elapsed_ms
+    current.error = error
+    _observe(current)
+
+
+def _observe(current: Span) -> None:
+    SPAN_LATENCY.observe((current.duration_ms or 0.0) / 1000, span=current.name)
+    if current.error:
+        ERRORS.inc(stage=current.name)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(current)
+
+
+def propagate(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Çağrının context'ini (trace + üst span) başka thread'de çalışacak fonksiyona taşı.
+    Her sarma ayrı bir context kopyasıdır; aynı sarmalı iki thread'de çalıştırmayın.
+    """
+    context = contextvars.copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> Any:
+        return context.run(func, *args, **kwargs)
+
+    return run
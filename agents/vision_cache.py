@@ -0,0 +1,237 @@
+"""
+Vision analiz sonuçları için içerik adresli cache.
+Anahtar: normalize piksellerin hash'i + (backend, model, prompt) hash'i.
+İsteğe bağlı algısal hash (dHash) katmanı yeniden sıkıştırılmış kopyaları da yakalar;
+görsel başına tutulan kısa "açıklama" kaydı, aynı görsel hakkındaki takip sorularında
+yeniden vision çağrısı yapmadan kullanılabilir. Disk boyutu LRU ile sınırlıdır.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+EXACT = "exact"
+PERCEPTUAL = "perceptual"
+
+# Tek renkli/boş görsellerin dHash'i anlamsızdır; algısal katmanda eşleştirilmez
+_DEGENERATE_PHASHES = (0, (1 << 64) - 1)
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """İki 64-bit hash arasındaki farklı bit sayısı"""
+    return bin(a ^ b).count("1")
+
+
+class VisionCache:
+    """SQLite tabanlı, boyutu sınırlı vision sonuç + görsel açıklama cache'i"""
+
+    def __init__(self, db_path: str, max_entries: int = 2000, max_bytes: int = 50_000_000,
+                 phash_distance: int = 4):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.phash_distance = phash_distance
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        self.stats_counters: Dict[str, int] = {
+            "exact_hits": 0,
+            "perceptual_hits": 0,
+            "description_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+        }
+        self._open_disk(db_path)
+
+    def _open_disk(self, db_path: str) -> None:
+        """SQLite dosyasını aç; açılamazsa cache devre dışı kalır"""
+        try:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            conn = sqlite3.connect(db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS vision_results ("
+                " key TEXT PRIMARY KEY,"
+                " image_hash TEXT NOT NULL,"
+                " phash TEXT NOT NULL,"
+                " request_hash TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS vision_descriptions ("
+                " image_hash TEXT PRIMARY KEY,"
+                " phash TEXT NOT NULL,"
+                " value TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " last_access REAL NOT NULL)"
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vision_request ON vision_results(request_hash)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vision_last_access ON vision_results(last_access)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_vision_desc_access ON vision_descriptions(last_access)")
+            conn.commit()
+            self._conn = conn
+        except sqlite3.Error as e:
+            logger.warning(f"⚠️ Vision cache açılamadı, devre dışı: {str(e)}")
+
+    @staticmethod
+    def request_key(backend: str, model: str, prompt: str, language: Optional[str] = None) -> str:
+        """(backend, model, normalize prompt, yanıt dili) için hash"""
+        payload = json.dumps([backend, model, prompt, language or ""], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    @staticmethod
+    def _entry_key(image_hash: str, request_hash: str) -> str:
+        return hashlib.sha256(f"{image_hash}:{request_hash}".encode("ascii")).hexdigest()
+
+    def _perceptual_enabled(self, phash: int) -> bool:
+        return self.phash_distance > 0 and phash not in _DEGENERATE_PHASHES
+
+    def _closest(self, rows, phash: int) -> Optional[Tuple[Any, ...]]:
+        """phash'i eşik içinde en yakın satır"""
+        best, best_distance = None, self.phash_distance + 1
+        for row in rows:
+            distance = hamming_distance(phash, int(row[1], 16))
+            if distance < best_distance:
+                best, best_distance = row, distance
+        return best
+
+    def get(self, image_hash: str, phash: int, request_hash: str) -> Optional[Tuple[str, str]]:
+        """(değer, katman) döndür; önce birebir piksel eşleşmesi, sonra algısal eşleşme"""
+        if self._conn is None:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                key = self._entry_key(image_hash, request_hash)
+                row = self._conn.execute("SELECT value FROM vision_results WHERE key = ?", (key,)).fetchone()
+                tier = EXACT
+                if row is None and self._perceptual_enabled(phash):
+                    candidates = self._conn.execute(
+                        "SELECT key, phash, value FROM vision_results WHERE request_hash = ?", (request_hash,)
+                    ).fetchall()
+                    match = self._closest(candidates, phash)
+                    if match is not None:
+                        key, row, tier = match[0], (match[2],), PERCEPTUAL
+                if row is None:
+                    self.stats_counters["misses"] += 1
+                    return None
+                self._conn.execute("UPDATE vision_results SET last_access = ? WHERE key = ?", (now, key))
+                self._conn.commit()
+                self.stats_counters[f"{tier}_hits"] += 1
+                return row[0], tier
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Vision cache okuma hatası: {str(e)}")
+                return None
+
+    def set(self, image_hash: str, phash: int, request_hash: str, value: str) -> None:
+        """Vision sonucunu kaydet ve boyut sınırını uygula"""
+        if self._conn is None:
+            return
+        now = time.time()
+        with self._lock:
+            try:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO vision_results"
+                    " (key, image_hash, phash, request_hash, value, size, last_access)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self._entry_key(image_hash, request_hash), image_hash, f"{phash:016x}", request_hash,
+                     value, len(value.encode("utf-8")), now)
+                )
+                self._evict("vision_results", "key")
+                self._conn.commit()
+                self.stats_counters["stores"] += 1
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Vision cache yazma hatası: {str(e)}")
+
+    def get_description(self, image_hash: str, phash: int) -> Optional[str]:
+        """Görselin daha önce üretilmiş açıklaması"""
+        if self._conn is None:
+            return None
+        now = time.time()
+        with self._lock:
+            try:
+                row = self._conn.execute(
+                    "SELECT image_hash, value FROM vision_descriptions WHERE image_hash = ?", (image_hash,)
+                ).fetchone()
+                if row is None and self._perceptual_enabled(phash):
+                    candidates = self._conn.execute(
+                        "SELECT image_hash, phash, value FROM vision_descriptions"
+                    ).fetchall()
+                    match = self._closest(candidates, phash)
+                    if match is not None:
+                        row = (match[0], match[2])
+                if row is None:
+                    return None
+                self._conn.execute(
+                    "UPDATE vision_descriptions SET last_access = ? WHERE image_hash = ?", (now, row[0])
+                )
+                self._conn.commit()
+                self.stats_counters["description_hits"] += 1
+                return row[1]
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Vision cache okuma hatası: {str(e)}")
+                return None
+
+    def set_description(self, image_hash: str, phash: int, value: str, replace: bool = False) -> None:
+        """Görsel açıklamasını kaydet; replace=False ise mevcut açıklama korunur"""
+        if self._conn is None:
+            return
+        verb = "INSERT OR REPLACE" if replace else "INSERT OR IGNORE"
+        with self._lock:
+            try:
+                self._conn.execute(
+                    f"{verb} INTO vision_descriptions (image_hash, phash, value, size, last_access)"
+                    " VALUES (?, ?, ?, ?, ?)",
+                    (image_hash, f"{phash:016x}", value, len(value.encode("utf-8")), time.time())
+                )
+                self._evict("vision_descriptions", "image_hash")
+                self._conn.commit()
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Vision cache yazma hatası: {str(e)}")
+
+    def _evict(self, table: str, key_column: str) -> None:
+        """Kayıt ve byte sınırını aşan en eski (LRU) kayıtları sil"""
+        count, total = self._conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {table}").fetchone()
+        if count <= self.max_entries and total <= self.max_bytes:
+            return
+        evicted = 0
+        for key, size in self._conn.execute(
+            f"SELECT {key_column}, size FROM {table} ORDER BY last_access ASC"
+        ).fetchall():
+            if count <= self.max_entries and total <= self.max_bytes:
+                break
+            self._conn.execute(f"DELETE FROM {table} WHERE {key_column} = ?", (key,))
+            count -= 1
+            total -= size
+            evicted += 1
+        self.stats_counters["evictions"] += evicted
+
+    def clear(self) -> None:
+        """Tüm kayıtları sil"""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM vision_results")
+            self._conn.execute("DELETE FROM vision_descriptions")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss sayaçları ve oranı"""
+        with self._lock:
+            counters = dict(self.stats_counters)
+        hits = counters["exact_hits"] + counters["perceptual_hits"]
+        lookups = hits + counters["misses"]
+        counters["hit_rate"] = hits / lookups if lookups else 0.0
+        return counters
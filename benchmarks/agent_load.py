@@ -0,0 +1,424 @@
+"""
+Uçtan uca yük benchmark'ı (API kotası harcamaz).
+Yerel mock sunucuyu (benchmarks.mock_servers) ayrı bir süreçte başlatır, Groq/Gemini
+uç noktalarını ona yönlendirir ve LLMAgent.process_message, vision yolu ve Gradio
+handler'ı senaryolar üzerinden çalıştırır.
+
+Senaryo başına p50/p95/p99 gecikme, throughput, kullanıcı mesajı başına LLM çağrısı ve
+tepe RSS raporlanır; sonuçlar JSON olarak yazılır ve önceki bir sonuçla karşılaştırılabilir.
+
+Kullanım:
+    python -m benchmarks.agent_load --output bench.json
+    python -m benchmarks.agent_load --scenarios single_chat,concurrent_users --users 32 --compare bench.json
+    python -m benchmarks.agent_load --latency-ms 800 --error-rate 0.05 --error-status 429
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from benchmarks.mock_servers import READY_PREFIX
+
+SCENARIOS = ("single_chat", "tool_chat", "image_upload", "concurrent_users", "gradio_users")
+
+CHAT_MESSAGES = [
+    "Merhaba, bana Python'da liste ve demet farkını anlatır mısın?",
+    "Yazılım ekipleri için iyi bir kod inceleme süreci nasıl olmalı?",
+    "Explain the difference between a process and a thread.",
+    "Bana kısa bir motivasyon konuşması yaz.",
+    "HTTP keep-alive bağlantıları neden önemlidir?",
+]
+
+TOOL_MESSAGES = [
+    "Saat kaç?",
+    "Bu metni analiz et: Yapay zeka sistemleri her geçen gün daha fazla alanda kullanılıyor ve verimlilik sağlıyor.",
+    "Şu metni özetle: Benchmark'lar performans gerilemelerini erken yakalar. Her commit'te aynı senaryolar "
+    "çalıştırılır. Sonuçlar karşılaştırılır ve büyük farklar incelenir.",
+    "Bu metni analiz et, özetle ve dilini tespit et: The quick brown fox jumps over the lazy dog. "
+    "It was a sunny day and everyone was outside.",
+    "İnternette yapay zeka haberlerini ara",
+    "Hava durumu hakkında araştırma yapar mısın?",
+]
+
+VISION_MESSAGES = ["Bu görselde ne var?", "", "Görseldeki renkleri açıkla"]
+
+
+# ---------------------------------------------------------------------- ölçüm yardımcıları
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank yüzdelik"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def peak_rss_mb() -> float:
+    """Sürecin şimdiye kadarki tepe RSS'i (Linux'ta KB, macOS'ta byte döner)"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class MockServerProcess:
+    """benchmarks.mock_servers'ı alt süreçte çalıştırır"""
+
+    def __init__(self, args: argparse.Namespace):
+        command = [
+            sys.executable, "-m", "benchmarks.mock_servers", "--port", "0",
+            "--latency-ms", str(args.latency_ms),
+            "--tokens-per-second", str(args.tokens_per_second),
+            "--reply-tokens", str(args.reply_tokens),
+            "--error-rate", str(args.error_rate),
+            "--error-status", str(args.error_status),
+            "--tail-rate", str(args.tail_rate),
+            "--tail-latency-ms", str(args.tail_latency_ms),
+            "--tail-models", args.tail_models,
+            "--rate-limit-rpm", str(args.rate_limit_rpm),
+            "--rate-limit-tpm", str(args.rate_limit_tpm),
+            "--seed", "1",
+        ]
+        self.process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+        line = self.process.stdout.readline()
+        if not line.startswith(READY_PREFIX):
+            self.process.kill()
+            raise RuntimeError(f"Mock sunucu başlatılamadı: {line!r}")
+        self.url = f"http://127.0.0.1:{int(line[len(READY_PREFIX):])}"
+
+    def _call(self, method: str, path: str) -> Dict[str, Any]:
+        request = urllib.request.Request(self.url + path, method=method, data=b"" if method == "POST" else None)
+        with urllib.request.urlopen(request, timeout=10) as response:
+            return json.loads(response.read())
+
+    def counters(self) -> Dict[str, int]:
+        return self._call("GET", "/_stats")["counters"]
+
+    def reset(self) -> None:
+        self._call("POST", "/_reset")
+
+    def close(self) -> None:
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def synthetic_images(count: int, directory: str) -> List[str]:
+    """Birbirinden farklı (cache'e takılmayan) sentetik JPEG'ler"""
+    from PIL import Image
+
+    paths = []
+    for index in range(count):
+        noise = Image.effect_noise((1600, 1200), 30 + index)
+        gradient = Image.linear_gradient("L").resize((1600, 1200)).rotate(index * 37)
+        img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+        path = os.path.join(directory, f"bench_{index}.jpg")
+        img.save(path, format="JPEG", quality=90)
+        paths.append(path)
+    return paths
+
+
+class FakeRequest:
+    """Gradio handler'ına verilen gr.Request yerine (sadece session_hash okunur)"""
+
+    def __init__(self, session_hash: str):
+        self.session_hash = session_hash
+
+
+# ---------------------------------------------------------------------- senaryolar
+
+class ScenarioResult:
+    def __init__(self, name: str):
+        self.name = name
+        self.latencies_ms: List[float] = []
+        self.first_chunk_ms: List[float] = []
+        self.errors = 0
+        self.wall_s = 0.0
+        self.llm_calls = 0
+        self.counters: Dict[str, int] = {}
+
+    def record(self, started: float, response: str) -> None:
+        self.latencies_ms.append((time.perf_counter() - started) * 1000)
+        self.record_error(response)
+
+    def record_error(self, response: str) -> None:
+        if not response or response.lstrip().startswith(("❌", "⚠️ Fallback")) or "hata oluştu" in response:
+            self.errors += 1
+
+    def as_dict(self) -> Dict[str, Any]:
+        count = len(self.latencies_ms)
+        result = {
+            "messages": count,
+            "errors": self.errors,
+            "wall_s": round(self.wall_s, 3),
+            "throughput_msg_s": round(count / self.wall_s, 3) if self.wall_s else 0.0,
+            "latency_ms": {
+                "p50": round(percentile(self.latencies_ms, 50), 1),
+                "p95": round(percentile(self.latencies_ms, 95), 1),
+                "p99": round(percentile(self.latencies_ms, 99), 1),
+                "mean": round(sum(self.latencies_ms) / count, 1) if count else 0.0,
+                "max": round(max(self.latencies_ms), 1) if count else 0.0,
+            },
+            "llm_calls": self.llm_calls,
+            "llm_calls_per_message": round(self.llm_calls / count, 3) if count else 0.0,
+            "peak_rss_mb": round(peak_rss_mb(), 1),
+            "mock_counters": self.counters,
+        }
+        if self.first_chunk_ms:
+            result["first_chunk_ms"] = {
+                "p50": round(percentile(self.first_chunk_ms, 50), 1),
+                "p95": round(percentile(self.first_chunk_ms, 95), 1),
+            }
+        return result
+
+
+def _messages(pool: List[str], count: int, salt: str) -> List[str]:
+    """Havuzdan mesaj üret; yanıt cache'i açıksa bile her mesaj benzersiz olsun diye ek yapılır"""
+    return [f"{pool[i % len(pool)]} ({salt}-{i})" if pool[i % len(pool)] else "" for i in range(count)]
+
+
+def run_sequential(agent, name: str, messages: List[str], images: Optional[List[str]] = None) -> ScenarioResult:
+    result = ScenarioResult(name)
+    started_all = time.perf_counter()
+    for index, message in enumerate(messages):
+        image = images[index % len(images)] if images else None
+        started = time.perf_counter()
+        response = agent.process_message(message, image=image, session_id=f"{name}-{index % 4}")
+        result.record(started, response)
+    result.wall_s = time.perf_counter() - started_all
+    return result
+
+
+def run_concurrent(agent, name: str, users: int, per_user: int) -> ScenarioResult:
+    """N kullanıcı aynı anda, her biri kendi oturumunda sırayla mesaj gönderir (senkron yol)"""
+    result = ScenarioResult(name)
+
+    def user(index: int) -> List[Tuple[float, str]]:
+        timings = []
+        for message in _messages(CHAT_MESSAGES + TOOL_MESSAGES[:2], per_user, f"u{index}"):
+            started = time.perf_counter()
+            response = agent.process_message(message, session_id=f"{name}-{index}")
+            timings.append(((time.perf_counter() - started) * 1000, response))
+        return timings
+
+    started_all = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=users) as pool:
+        timings = [item for future in [pool.submit(user, i) for i in range(users)] for item in future.result()]
+    result.wall_s = time.perf_counter() - started_all
+    for latency_ms, response in timings:
+        result.latencies_ms.append(latency_ms)
+        result.record_error(response)
+    return result
+
+
+def run_gradio(interface, name: str, users: int, per_user: int, images: List[str]) -> ScenarioResult:
+    """Gradio handler'ını (GradioInterface.handle_message) N eşzamanlı kullanıcıyla sür"""
+    result = ScenarioResult(name)
+
+    async def user(index: int) -> List[Tuple[float, Optional[float], str]]:
+        history: List[List[str]] = []
+        timings = []
+        for turn, message in enumerate(_messages(CHAT_MESSAGES, per_user, f"g{index}")):
+            image = images[(index + turn) % len(images)] if images and turn == 0 and index % 4 == 0 else None
+            started = time.perf_counter()
+            first_chunk = None
+            async for updated, *_ in interface.handle_message(message, image, None, history,
+                                                             FakeRequest(f"{name}-{index}")):
+                if first_chunk is None and updated and updated[-1][1]:
+                    first_chunk = time.perf_counter()
+                history = updated
+            timings.append((started, first_chunk, history[-1][1] if history else ""))
+            result.latencies_ms.append((time.perf_counter() - started) * 1000)
+        return timings
+
+    async def drive() -> List[Tuple[float, Optional[float], str]]:
+        batches = await asyncio.gather(*(user(index) for index in range(users)))
+        return [item for batch in batches for item in batch]
+
+    started_all = time.perf_counter()
+    timings = asyncio.run(drive())
+    result.wall_s = time.perf_counter() - started_all
+    for started, first_chunk, response in timings:
+        if first_chunk is not None:
+            result.first_chunk_ms.append((first_chunk - started) * 1000)
+        result.record_error(response)
+    return result
+
+
+# ---------------------------------------------------------------------- rapor
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any]) -> str:
+    """İki sonuç dosyası arasındaki farklar (pozitif gecikme farkı = yavaşlama)"""
+    lines = [f"Karşılaştırma: {baseline['meta'].get('commit')} → {current['meta'].get('commit')}"]
+    header = f"{'senaryo':<18}{'p50 ms':>18}{'p95 ms':>18}{'msg/s':>16}{'LLM/msg':>14}"
+    lines.append(header)
+    for name, stats in current["scenarios"].items():
+        old = baseline["scenarios"].get(name)
+        if not old:
+            continue
+
+        def delta(new_value: float, old_value: float) -> str:
+            change = ((new_value - old_value) / old_value * 100) if old_value else 0.0
+            return f"{new_value:.1f} ({change:+.0f}%)"
+
+        lines.append(
+            f"{name:<18}"
+            f"{delta(stats['latency_ms']['p50'], old['latency_ms']['p50']):>18}"
+            f"{delta(stats['latency_ms']['p95'], old['latency_ms']['p95']):>18}"
+            f"{delta(stats['throughput_msg_s'], old['throughput_msg_s']):>16}"
+            f"{delta(stats['llm_calls_per_message'], old['llm_calls_per_message']):>14}"
+        )
+    return "\n".join(lines)
+
+
+def summary_table(results: Dict[str, Dict[str, Any]]) -> str:
+    lines = [f"{'senaryo':<18}{'n':>5}{'err':>5}{'p50':>9}{'p95':>9}{'p99':>9}{'msg/s':>8}{'LLM/msg':>9}{'RSS MB':>8}"]
+    for name, stats in results.items():
+        latency = stats["latency_ms"]
+        lines.append(
+            f"{name:<18}{stats['messages']:>5}{stats['errors']:>5}{latency['p50']:>9.0f}{latency['p95']:>9.0f}"
+            f"{latency['p99']:>9.0f}{stats['throughput_msg_s']:>8.2f}{stats['llm_calls_per_message']:>9.2f}"
+            f"{stats['peak_rss_mb']:>8.0f}"
+        )
+    return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------- giriş noktası
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Mock sunucuya karşı uçtan uca agent benchmark'ı")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"Virgülle ayrılmış: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=12, help="Sıralı senaryolarda mesaj sayısı")
+    parser.add_argument("--users", type=int, default=16, help="Eşzamanlı kullanıcı sayısı")
+    parser.add_argument("--per-user", type=int, default=3, help="Eşzamanlı senaryolarda kullanıcı başına mesaj")
+    parser.add_argument("--latency-ms", type=float, default=300.0)
+    parser.add_argument("--tokens-per-second", type=float, default=200.0)
+    parser.add_argument("--reply-tokens", type=int, default=60)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=500)
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="Mock'ta kuyruk gecikmesi olasılığı")
+    parser.add_argument("--tail-latency-ms", type=float, default=0.0)
+    parser.add_argument("--tail-models", default="", help="Kuyruk gecikmesi yaşayan modeller (boş: hepsi)")
+    parser.add_argument("--hedge", action="store_true", help="İkincil modele hedging'i aç (HEDGE_ENABLED)")
+    parser.add_argument("--rate-limit-rpm", type=int, default=0, help="Mock'un model başına dakikalık istek sınırı")
+    parser.add_argument("--rate-limit-tpm", type=int, default=0, help="Mock'un model başına dakikalık token sınırı")
+    parser.add_argument("--no-scheduler", action="store_true", help="Hız sınırı zamanlayıcısını kapat (SCHEDULER_ENABLED)")
+    parser.add_argument("--with-cache", action="store_true", help="Yanıt ve vision cache'lerini açık bırak")
+    parser.add_argument("--output", help="Sonuçların yazılacağı JSON dosyası")
+    parser.add_argument("--compare", help="Karşılaştırılacak önceki sonuç dosyası")
+    args = parser.parse_args()
+
+    selected = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(selected) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"Bilinmeyen senaryo: {', '.join(sorted(unknown))}")
+
+    server = MockServerProcess(args)
+    cache_dir = tempfile.mkdtemp(prefix="bench-")
+    # Ayarlar ilk get_settings() çağrısında okunur; agent import edilmeden önce yönlendir
+    os.environ.update({
+        "GROQ_API_KEY": "bench",
+        "GEMINI_API_KEY": "bench",
+        "GROQ_BASE_URL": server.url,
+        "GEMINI_BASE_URL": server.url,
+        "RESPONSE_CACHE_PATH": os.path.join(cache_dir, "response.sqlite3"),
+        "VISION_CACHE_PATH": os.path.join(cache_dir, "vision.sqlite3"),
+        "CONVERSATION_STORE_PATH": os.path.join(cache_dir, "conversations.sqlite3"),
+        "PRELOAD_DEFAULT_MODEL": "false",
+    })
+    if args.hedge:
+        os.environ["HEDGE_ENABLED"] = "true"
+    if args.no_scheduler:
+        os.environ["SCHEDULER_ENABLED"] = "false"
+    if not args.with_cache:
+        os.environ["RESPONSE_CACHE_ENABLED"] = "false"
+        os.environ["VISION_CACHE_ENABLED"] = "false"
+
+    results: Dict[str, Dict[str, Any]] = {}
+    try:
+        # Agent'ın verbose zincir çıktısı ve INFO logları ölçüm çıktısını boğmasın
+        import logging
+        from agents.llm_agent import LLMAgent
+        logging.getLogger().setLevel(logging.WARNING)
+        for handler in logging.getLogger().handlers:
+            handler.setLevel(logging.WARNING)
+
+        with contextlib.redirect_stdout(io.StringIO()):
+            agent = LLMAgent()
+            agent.warm_up()
+            agent.process_message("Isınma mesajı", session_id="warm-up")
+        images = synthetic_images(4, cache_dir) if {"image_upload", "gradio_users"} & set(selected) else []
+        interface = None
+        if "gradio_users" in selected:
+            from ui.interface import GradioInterface
+            interface = GradioInterface(agent)
+
+        runners: Dict[str, Callable[[], ScenarioResult]] = {
+            "single_chat": lambda: run_sequential(agent, "single_chat", _messages(CHAT_MESSAGES, args.requests, "s")),
+            "tool_chat": lambda: run_sequential(agent, "tool_chat", _messages(TOOL_MESSAGES, args.requests, "t")),
+            "image_upload": lambda: run_sequential(agent, "image_upload",
+                                                   _messages(VISION_MESSAGES, args.requests, "v"), images),
+            "concurrent_users": lambda: run_concurrent(agent, "concurrent_users", args.users, args.per_user),
+            "gradio_users": lambda: run_gradio(interface, "gradio_users", args.users, args.per_user, images),
+        }
+        for name in selected:
+            server.reset()
+            print(f"▶️ {name} ...", flush=True)
+            with contextlib.redirect_stdout(io.StringIO()):
+                result = runners[name]()
+            result.counters = server.counters()
+            result.llm_calls = result.counters.get("groq_requests", 0) + result.counters.get("gemini_requests", 0)
+            results[name] = result.as_dict()
+    finally:
+        server.close()
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "args": vars(args),
+        },
+        "scenarios": results,
+    }
+    if "agents.resilience" in sys.modules:
+        # Hedge/circuit sayaçları tüm senaryolar boyunca birikir (hedge gecikmesi ayarı için)
+        report["resilience"] = sys.modules["agents.resilience"].get_resilience().stats()
+    if "agents.scheduler" in sys.modules:
+        # Mock'un x-ratelimit-* başlıklarından öğrenilen son bütçeler
+        report["scheduler"] = sys.modules["agents.scheduler"].get_scheduler().stats()
+    print(summary_table(results))
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"💾 Sonuçlar yazıldı: {args.output}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            print(compare(report, json.load(f)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Görsel ön işleme mikro-benchmark'ı.
+Eski yol (tam decode + thumbnail + JPEG q95) ile prepare_image'i karşılaştırır;
+görsel başına ms ve byte raporlar.
+
+Kullanım:
+    python -m benchmarks.image_preprocessing                # sentetik görseller
+    python -m benchmarks.image_preprocessing foto1.jpg ...  # kendi görselleriniz
+"""
+
+import argparse
+import io
+import statistics
+import time
+from typing import Callable, List, Tuple
+
+from PIL import Image
+
+from agents.image_processing import prepare_image
+
+SYNTHETIC_SIZES = [(640, 480), (1920, 1080), (4032, 3024), (6000, 4000)]
+
+
+def _synthetic_jpeg(width: int, height: int) -> bytes:
+    """Gradyan + gürültü içeren sentetik JPEG (kamera fotoğrafına yakın entropi)"""
+    gradient = Image.linear_gradient("L").resize((width, height))
+    noise = Image.effect_noise((width, height), 40)
+    img = Image.merge("RGB", (gradient, noise, gradient.transpose(Image.Transpose.FLIP_LEFT_RIGHT)))
+    buffer = io.BytesIO()
+    img.save(buffer, format="JPEG", quality=92)
+    return buffer.getvalue()
+
+
+def _legacy(data: bytes) -> bytes:
+    """Önceki inline yol: tam decode, thumbnail(1536), JPEG q95"""
+    img = Image.open(io.BytesIO(data))
+    img.thumbnail((1536, 1536), Image.Resampling.LANCZOS)
+    buffer = io.BytesIO()
+    img.convert("RGB").save(buffer, format="JPEG", quality=95)
+    return buffer.getvalue()
+
+
+def _measure(func: Callable[[bytes], bytes], data: bytes, repeat: int) -> Tuple[float, int]:
+    timings: List[float] = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(func(data))
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings), size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Görsel ön işleme benchmark'ı")
+    parser.add_argument("images", nargs="*", help="Ölçülecek görsel dosyaları (boşsa sentetik)")
+    parser.add_argument("--repeat", type=int, default=5, help="Görsel başına tekrar sayısı")
+    args = parser.parse_args()
+
+    samples: List[Tuple[str, bytes]] = []
+    if args.images:
+        for path in args.images:
+            with open(path, "rb") as handle:
+                samples.append((path, handle.read()))
+    else:
+        samples = [(f"synthetic {w}x{h}", _synthetic_jpeg(w, h)) for w, h in SYNTHETIC_SIZES]
+
+    print(f"{'görsel':<24}{'girdi':>12}{'eski ms':>10}{'eski byte':>12}{'yeni ms':>10}{'yeni byte':>12}")
+    for name, data in samples:
+        legacy_ms, legacy_bytes = _measure(_legacy, data, args.repeat)
+        new_ms, new_bytes = _measure(lambda raw: prepare_image(raw).data, data, args.repeat)
+        print(f"{name:<24}{len(data):>12}{legacy_ms:>10.1f}{legacy_bytes:>12}{new_ms:>10.1f}{new_bytes:>12}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+"""
+Groq chat-completions ve Gemini generateContent uç noktalarını taklit eden yerel sunucu.
+Gerçek API kotası harcamadan benchmark çalıştırmak içindir; sadece standart kütüphane kullanır.
+
+- Groq:   POST /openai/v1/chat/completions (stream ve tek seferlik, usage ile)
+- Gemini: POST /v1beta/models/<model>:generateContent ve :streamGenerateContent?alt=sse
+- GET /_stats sayaçları döndürür, POST /_reset sıfırlar
+
+Gecikme (ilk token'a kadar), token hızı, hata oranı ve seçili modellerde kuyruk gecikmesi
+(tail latency sıçramaları) ayarlanabilir. İsteğe bağlı dakikalık istek/token sınırı Groq gibi
+x-ratelimit-* başlıkları döndürür ve aşılınca retry-after'lı 429 verir. Agent (ReAct) prompt'larına
+mesajdaki anahtar kelimelere göre önce bir tool aksiyonu, tool yanıtından sonra Final Answer döner.
+
+Kullanım:
+    python -m benchmarks.mock_servers --port 8765 --latency-ms 300 --tokens-per-second 200
+"""
+
+import argparse
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+READY_PREFIX = "MOCK_READY "
+
+AGENT_MARKER = "RESPONSE FORMAT INSTRUCTIONS"
+TOOL_RESPONSE_MARKER = "TOOL RESPONSE"
+USER_INPUT_MARKER = "Here is the user's input"
+
+# Agent prompt'unda bu kelimeler geçerse model ilgili tool'u çağırıyormuş gibi davranır
+TOOL_KEYWORDS = [
+    ("saat", "get_current_time"),
+    ("time", "get_current_time"),
+    ("analiz", "text_analyzer"),
+    ("özet", "text_summarizer"),
+    ("summar", "text_summarizer"),
+    ("dil", "language_detector"),
+    ("language", "language_detector"),
+    ("ara", "web_search"),
+    ("search", "web_search"),
+    ("hava", "web_search"),
+]
+
+FILLER_WORDS = (
+    "Bu yanıt yerel mock sunucu tarafından üretildi ve gerçek bir model çıktısının uzunluğunu "
+    "ve akış hızını taklit eder . Performans ölçümü için içerik önemli değildir ; token sayısı , "
+    "gecikme ve hata davranışı önemlidir ."
+).split()
+
+
+class MockConfig:
+    """Sunucu davranışı"""
+
+    def __init__(self, latency_ms: float = 300.0, tokens_per_second: float = 200.0, reply_tokens: int = 60,
+                 error_rate: float = 0.0, error_status: int = 500, seed: Optional[int] = None,
+                 tail_rate: float = 0.0, tail_latency_ms: float = 0.0, tail_models: Tuple[str, ...] = (),
+                 rate_limit_rpm: int = 0, rate_limit_tpm: int = 0):
+        self.latency_ms = latency_ms
+        self.tokens_per_second = tokens_per_second
+        self.reply_tokens = reply_tokens
+        self.error_rate = error_rate
+        self.error_status = error_status
+        # İsteklerin tail_rate kadarına ek gecikme (tail_models boşsa tüm modeller)
+        self.tail_rate = tail_rate
+        self.tail_latency_ms = tail_latency_ms
+        self.tail_models = tuple(tail_models)
+        # Model başına dakikalık sınırlar (0: sınırsız, başlık da gönderilmez)
+        self.rate_limit_rpm = rate_limit_rpm
+        self.rate_limit_tpm = rate_limit_tpm
+        self.random = random.Random(seed)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": self.latency_ms,
+            "tokens_per_second": self.tokens_per_second,
+            "reply_tokens": self.reply_tokens,
+            "error_rate": self.error_rate,
+            "error_status": self.error_status,
+            "tail_rate": self.tail_rate,
+            "tail_latency_ms": self.tail_latency_ms,
+            "tail_models": list(self.tail_models),
+            "rate_limit_rpm": self.rate_limit_rpm,
+            "rate_limit_tpm": self.rate_limit_tpm,
+        }
+
+
+class MockStats:
+    """Uç nokta ve istek türü başına sayaçlar"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+
+    def incr(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self.counters[key] = self.counters.get(key, 0) + 1
+
+    def snapshot(self) -> Dict[str, int]:
+        with self._lock:
+            return dict(self.counters)
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+
+
+class RateLimiter:
+    """Model başına 60 sn'lik sabit pencerede istek ve token sayacı"""
+
+    WINDOW = 60.0
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._windows: Dict[str, List[float]] = {}
+
+    def check(self, model: str, tokens: int, rpm: int, tpm: int) -> Tuple[bool, Dict[str, str]]:
+        """(izin verildi mi, x-ratelimit-* başlıkları)"""
+        now = time.monotonic()
+        with self._lock:
+            started, requests, used = self._windows.get(model, (now, 0, 0))
+            if now - started >= self.WINDOW:
+                started, requests, used = now, 0, 0
+            allowed = (not rpm or requests + 1 <= rpm) and (not tpm or used + tokens <= tpm)
+            if allowed:
+                requests, used = requests + 1, used + tokens
+            self._windows[model] = [started, requests, used]
+        reset = f"{max(0.0, started + self.WINDOW - now):.2f}s"
+        headers = {}
+        if rpm:
+            headers.update({"x-ratelimit-limit-requests": str(rpm),
+                            "x-ratelimit-remaining-requests": str(max(0, rpm - requests)),
+                            "x-ratelimit-reset-requests": reset})
+        if tpm:
+            headers.update({"x-ratelimit-limit-tokens": str(tpm),
+                            "x-ratelimit-remaining-tokens": str(max(0, tpm - used)),
+                            "x-ratelimit-reset-tokens": reset})
+        if not allowed:
+            headers["retry-after"] = f"{max(0.0, started + self.WINDOW - now):.2f}"
+        return allowed, headers
+
+
+def _content_text(content: Any) -> str:
+    if isinstance(content, list):
+        return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content or "")
+
+
+def _has_image(messages: List[Dict[str, Any]]) -> bool:
+    return any(
+        isinstance(message.get("content"), list)
+        and any(part.get("type") == "image_url" for part in message["content"] if isinstance(part, dict))
+        for message in messages
+    )
+
+
+def _filler(tokens: int) -> str:
+    return " ".join(FILLER_WORDS[i % len(FILLER_WORDS)] for i in range(tokens))
+
+
+def _agent_blob(action: str, action_input: str) -> str:
+    return "```json\n" + json.dumps({"action": action, "action_input": action_input}, ensure_ascii=False) + "\n```"
+
+
+def groq_reply(messages: List[Dict[str, Any]], reply_tokens: int) -> Tuple[str, str]:
+    """(istek türü, yanıt metni)"""
+    texts = [_content_text(message.get("content")) for message in messages]
+    if any(AGENT_MARKER in text for text in texts):
+        last = texts[-1] if texts else ""
+        if TOOL_RESPONSE_MARKER in last:
+            return "agent_final", _agent_blob("Final Answer", _filler(reply_tokens))
+        # Girdinin ilk paragrafı kullanıcı mesajıdır (sonrasında "(Yanıt dili: ...)" gibi ekler gelir)
+        user_input = last.split(USER_INPUT_MARKER, 1)[-1].split("\n\n", 1)[-1].strip().split("\n\n", 1)[0]
+        lowered = user_input.lower()
+        for keyword, tool in TOOL_KEYWORDS:
+            if re.search(rf"\b{re.escape(keyword)}", lowered):
+                return "agent_action", _agent_blob(tool, user_input)
+        return "agent_final", _agent_blob("Final Answer", _filler(reply_tokens))
+    if _has_image(messages):
+        return "vision", _filler(reply_tokens)
+    return "chat", _filler(reply_tokens)
+
+
+def _tokens(text: str) -> List[str]:
+    """Metni ~4 karakterlik stream parçalarına böl"""
+    return [text[i:i + 4] for i in range(0, len(text), 4)] or [""]
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args: Any) -> None:
+        pass
+
+    @property
+    def config(self) -> MockConfig:
+        return self.server.config
+
+    @property
+    def stats(self) -> MockStats:
+        return self.server.stats
+
+    # ------------------------------------------------------------------ yardımcılar
+
+    def _send_json(self, status: int, payload: Dict[str, Any], headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _start_stream(self, headers: Optional[Dict[str, str]] = None) -> None:
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+    def _write_chunk(self, text: str) -> None:
+        data = text.encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _end_stream(self) -> None:
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    def _read_body(self) -> Dict[str, Any]:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _inject_error(self, endpoint: str) -> bool:
+        """Hata oranına göre 429/5xx döndür"""
+        if self.config.error_rate <= 0 or self.config.random.random() >= self.config.error_rate:
+            return False
+        self.stats.incr(f"{endpoint}_errors")
+        status = self.config.error_status
+        headers = {"retry-after": "0"} if status == 429 else None
+        self._send_json(status, {"error": {"message": "mock injected error", "type": "mock_error"}}, headers)
+        return True
+
+    def _first_token_delay(self, endpoint: str, model: str) -> float:
+        """Taban gecikme + (seçili modellerde, tail_rate olasılıkla) kuyruk gecikmesi"""
+        delay = self.config.latency_ms / 1000
+        if self.config.tail_rate > 0 and (not self.config.tail_models or model in self.config.tail_models):
+            if self.config.random.random() < self.config.tail_rate:
+                self.stats.incr(f"{endpoint}_tail_spikes")
+                delay += self.config.tail_latency_ms / 1000
+        return delay
+
+    def _token_delay(self) -> float:
+        return 1.0 / self.config.tokens_per_second if self.config.tokens_per_second > 0 else 0.0
+
+    # ------------------------------------------------------------------ rotalar
+
+    def do_GET(self) -> None:
+        if self.path.startswith("/_stats"):
+            self._send_json(200, {"counters": self.stats.snapshot(), "config": self.config.as_dict()})
+            return
+        self._send_json(404, {"error": {"message": "not found"}})
+
+    def do_POST(self) -> None:
+        if self.path.startswith("/_reset"):
+            self.stats.reset()
+            self.server.rate_limiter = RateLimiter()
+            self._send_json(200, {"ok": True})
+        elif self.path.startswith("/openai/v1/chat/completions"):
+            self._groq(self._read_body())
+        elif self.path.startswith("/v1beta/models/"):
+            model = self.path[len("/v1beta/models/"):].split(":", 1)[0]
+            self._gemini(self._read_body(), model, stream=":streamGenerateContent" in self.path)
+        else:
+            self._send_json(404, {"error": {"message": "not found"}})
+
+    def _groq(self, body: Dict[str, Any]) -> None:
+        self.stats.incr("groq_requests")
+        if self._inject_error("groq"):
+            return
+        messages = body.get("messages", [])
+        kind, content = groq_reply(messages, self.config.reply_tokens)
+        self.stats.incr(f"groq_{kind}")
+        pieces = _tokens(content)
+        usage = {
+            "prompt_tokens": sum(len(_content_text(m.get("content"))) for m in messages) // 4,
+            "completion_tokens": len(pieces),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+        model = body.get("model", "mock")
+        self.stats.incr(f"groq_model:{model}")
+        allowed, headers = self.server.rate_limiter.check(
+            model, usage["total_tokens"], self.config.rate_limit_rpm, self.config.rate_limit_tpm)
+        if not allowed:
+            self.stats.incr("groq_rate_limited")
+            self._send_json(429, {"error": {"message": "mock rate limit", "type": "rate_limit_exceeded"}}, headers)
+            return
+        time.sleep(self._first_token_delay("groq", model))
+
+        if not body.get("stream"):
+            time.sleep(len(pieces) * self._token_delay())
+            self._send_json(200, {
+                "id": "mock", "object": "chat.completion", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+                "usage": usage,
+            }, headers)
+            return
+
+        self._start_stream(headers)
+        delay = self._token_delay()
+        for piece in pieces:
+            chunk = {
+                "id": "mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+                "choices": [{"index": 0, "delta": {"role": "assistant", "content": piece}, "finish_reason": None}],
+            }
+            self._write_chunk(f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n")
+            if delay:
+                time.sleep(delay)
+        final = {
+            "id": "mock", "object": "chat.completion.chunk", "created": int(time.time()), "model": model,
+            "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}],
+            "x_groq": {"usage": usage},
+        }
+        self._write_chunk(f"data: {json.dumps(final)}\n\n")
+        self._write_chunk("data: [DONE]\n\n")
+        self._end_stream()
+
+    def _gemini(self, body: Dict[str, Any], model: str, stream: bool) -> None:
+        self.stats.incr("gemini_requests")
+        if self._inject_error("gemini"):
+            return
+        pieces = _tokens(_filler(self.config.reply_tokens))
+        prompt_text = " ".join(
+            part.get("text", "") for content in body.get("contents", []) for part in content.get("parts", [])
+        )
+        usage = {"promptTokenCount": len(prompt_text) // 4 + 258, "candidatesTokenCount": len(pieces)}
+        time.sleep(self._first_token_delay("gemini", model))
+
+        if not stream:
+            time.sleep(len(pieces) * self._token_delay())
+            self._send_json(200, {
+                "candidates": [{"content": {"parts": [{"text": "".join(pieces)}], "role": "model"}}],
+                "usageMetadata": usage,
+            })
+            return
+
+        self._start_stream()
+        delay = self._token_delay()
+        for index, piece in enumerate(pieces):
+            event: Dict[str, Any] = {"candidates": [{"content": {"parts": [{"text": piece}], "role": "model"}}]}
+            if index == len(pieces) - 1:
+                event["usageMetadata"] = usage
+            self._write_chunk(f"data: {json.dumps(event, ensure_ascii=False)}\r\n\r\n")
+            if delay:
+                time.sleep(delay)
+        self._end_stream()
+
+
+def create_server(host: str = "127.0.0.1", port: int = 0, config: Optional[MockConfig] = None) -> ThreadingHTTPServer:
+    """Sunucuyu kur (port=0: boş port); `server.config` ve `server.stats` erişilebilir"""
+    server = ThreadingHTTPServer((host, port), MockHandler)
+    server.daemon_threads = True
+    server.config = config or MockConfig()
+    server.stats = MockStats()
+    server.rate_limiter = RateLimiter()
+    return server
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Yerel Groq + Gemini mock sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765, help="0: boş port seç")
+    parser.add_argument("--latency-ms", type=float, default=300.0, help="İlk token'a kadar gecikme")
+    parser.add_argument("--tokens-per-second", type=float, default=200.0, help="0: bekleme yok")
+    parser.add_argument("--reply-tokens", type=int, default=60, help="Yanıt başına yaklaşık kelime sayısı")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="0-1 arası hata enjeksiyon oranı")
+    parser.add_argument("--error-status", type=int, default=500, help="Enjekte edilen HTTP durumu (429, 500, 503...)")
+    parser.add_argument("--tail-rate", type=float, default=0.0, help="0-1 arası kuyruk gecikmesi olasılığı")
+    parser.add_argument("--tail-latency-ms", type=float, default=0.0, help="Sıçrama başına ek gecikme")
+    parser.add_argument("--tail-models", default="", help="Virgülle ayrılmış; boş: tüm modeller")
+    parser.add_argument("--rate-limit-rpm", type=int, default=0, help="Groq modeli başına dakikalık istek sınırı")
+    parser.add_argument("--rate-limit-tpm", type=int, default=0, help="Groq modeli başına dakikalık token sınırı")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = MockConfig(args.latency_ms, args.tokens_per_second, args.reply_tokens,
+                        args.error_rate, args.error_status, args.seed, args.tail_rate, args.tail_latency_ms,
+                        tuple(name.strip() for name in args.tail_models.split(",") if name.strip()),
+                        args.rate_limit_rpm, args.rate_limit_tpm)
+    server = create_server(args.host, args.port, config)
+    # Benchmark çalıştırıcısı seçilen portu bu satırdan okur
+    print(f"{READY_PREFIX}{server.server_address[1]}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -3,17 +3,44 @@ Konfigürasyon ayarları modülü.
 """
 
 import os
-from dotenv import load_dotenv
-from typing import Optional
+import threading
+from typing import Dict, Optional
+from config.prompts import PromptProfile, get_prompt_profile
+
+_dotenv_loaded = False
+_settings: Optional["Settings"] = None
+_settings_lock = threading.Lock()
+
+
+def _load_dotenv() -> None:
+    """.env dosyasını ilk Settings oluşturulurken bir kez yükle"""
+    global _dotenv_loaded
+    if not _dotenv_loaded:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _dotenv_loaded = True
+
+
+def _parse_pairs(raw: str) -> Dict[str, str]:
+    """`a=b,c=d` biçimindeki eşlemeleri sözlüğe çevir"""
+    pairs = {}
+    for item in raw.split(","):
+        if "=" in item:
+            key, value = item.split("=", 1)
+            if key.strip() and value.strip():
+                pairs[key.strip()] = value.strip()
+    return pairs
 
-# .env dosyasını yükle
-load_dotenv()
 
 class Settings:
     """Uygulama ayarları sınıfı."""
     
     def __init__(self):
+        _load_dotenv()
         self.groq_api_key: Optional[str] = os.getenv("GROQ_API_KEY")
+        # API uç noktaları (benchmark'lar yerel mock sunuculara yönlendirir); None: SDK varsayılanı
+        self.groq_base_url: Optional[str] = os.getenv("GROQ_BASE_URL")
+        self.gemini_base_url: str = os.getenv("GEMINI_BASE_URL", "https://generativelanguage.googleapis.com")
         # Gerçek Groq modellerini kullanıyoruz
         self.text_model: str = "llama-3.3-70b-versatile"  # En yeni ve güçlü Llama 3.3
         self.vision_model: str = "llama-3.2-90b-vision-preview"  # En güçlü vision model
@@ -23,56 +50,131 @@ class Settings:
         self.temperature: float = 0.7
         self.gradio_share: bool = False
         self.gradio_port: int = 7862
+        # Gradio kuyruğu: event başına eşzamanlı istek ve bekleyen istek sınırı
+        self.queue_concurrency_limit: int = int(os.getenv("QUEUE_CONCURRENCY_LIMIT", "200"))
+        self.queue_max_size: int = int(os.getenv("QUEUE_MAX_SIZE", "1000"))
+        self.default_timezone: str = os.getenv("DEFAULT_TIMEZONE", "Europe/Istanbul")
         
-        # Llama 3.3 70B Seviye Prompt-Based Agent System
-        self.system_prompt: str = """Sen Llama 3.3 70B seviyesinde gelişmiş bir AI Assistant'sın. LangChain ile entegre çalışıp tool'ları prompt engineering ile yönetiyorsun.
-
-🧠 LLAMA 3.3 YETENEKLERİN:
-- Çok katmanlı mantıklı düşünme (reasoning)
-- Tool'ları prompt ile akıllıca tetikleme
-- Otomatik context switch ve dil algılama
-- Görsel analiz ve OCR yetenekleri
-- Gelişmiş problem çözme algoritmaları
-
-�️ TOOL MANAGEMENT LOGIC:
-Kullanıcı mesajını analiz et ve gerekli tool'ları akıllıca seç:
-
-1. 🕐 "Saat kaç?", "bugün ne günü", "tarih" → get_current_time tool'unu çağır
-2. 📊 "analiz et", "kaç kelime", "istatistik" → text_analyzer tool'unu çağır
-3. 📝 "özetle", "kısalt", "summary" → text_summarizer tool'unu çağır
-4. 🌍 "hangi dil", "language", "dil analizi" → language_detector tool'unu çağır
-5. 🔍 "ara", "search", "hava durumu", "bilgi" → web_search tool'unu çağır
-
-🎯 SMART WORKFLOW:
-1. User input analiz et
-2. Uygun tool(s) seç ve sırayla çağır
-3. Tool çıktılarını Maverick seviyede entegre et
-4. Kullanıcının diline ve tonuna uygun yanıt üret
-5. Ekstra değer katacak insight'lar ekle
-
-🌍 MULTI-LANGUAGE RESPONSE:
-- Türkçe: Samimi, detaylı ve emoji ile zengin
-- English: Professional, structured and informative
-- Français: Élégant et informatif avec style
-- Deutsch: Präzise und methodisch
-
-🖼️ VISION CAPABILITIES:
-Görsel geldiğinde:
-1. Detaylı visual analysis
-2. OCR ve text extraction
-3. Context-aware interpretation
-4. Technical details assessment
-5. Cultural/contextual insights
-
-⚡ LLAMA 3.3 SPEED & ACCURACY:
-- Hızlı tool selection
-- Parallel thinking processes
-- Error prevention & correction
-- Context-aware responses
-- Learning from conversation history
+        # Paylaşımlı HTTP bağlantı havuzları (Groq + Gemini)
+        self.http_pool_size: int = int(os.getenv("HTTP_POOL_SIZE", "20"))
+        self.http_keepalive_connections: int = int(os.getenv("HTTP_KEEPALIVE_CONNECTIONS", "10"))
+        self.http_keepalive_expiry: float = float(os.getenv("HTTP_KEEPALIVE_EXPIRY", "30"))  # saniye
+        self.http_connect_timeout: float = float(os.getenv("HTTP_CONNECT_TIMEOUT", "5"))
+        self.http_read_timeout: float = float(os.getenv("HTTP_READ_TIMEOUT", "60"))
+        
+        # Vision görsel ön işleme
+        self.vision_max_side: int = 1536
+        self.vision_byte_budget: int = int(os.getenv("VISION_BYTE_BUDGET", "1000000"))  # byte
+        self.vision_max_quality: int = 90
+        self.vision_min_quality: int = 60
+        self.image_workers: int = int(os.getenv("IMAGE_WORKERS", "4"))
+        self.vision_concurrency: int = int(os.getenv("VISION_CONCURRENCY", "4"))  # Çoklu görselde eşzamanlı vision isteği
+        
+        # Vision backend: "gemini" (generateContent) veya "groq" (vision_model)
+        self.vision_backend: str = os.getenv("VISION_BACKEND", "gemini")
+        self.gemini_api_key: Optional[str] = os.getenv("GEMINI_API_KEY")
+        self.gemini_vision_model: str = "gemini-2.0-flash-lite"
+        
+        # Vision sonuç cache'i (piksel hash'i + prompt + model)
+        self.vision_cache_enabled: bool = os.getenv("VISION_CACHE_ENABLED", "true").lower() == "true"
+        self.vision_cache_path: str = os.getenv("VISION_CACHE_PATH", ".cache/vision_cache.sqlite3")
+        self.vision_cache_max_entries: int = 2000
+        self.vision_cache_max_bytes: int = int(os.getenv("VISION_CACHE_MAX_BYTES", "50000000"))
+        self.vision_cache_phash_distance: int = 4  # 0: algısal katman kapalı
+        self.vision_reuse_descriptions: bool = True  # Aynı görsele yeni soru: açıklama + text model
+        
+        # Oturum havuzu: her tarayıcı sekmesine ayrı hafıza
+        self.max_sessions: int = int(os.getenv("MAX_SESSIONS", "1000"))
+        self.session_idle_ttl: int = int(os.getenv("SESSION_IDLE_TTL", "3600"))  # saniye
+        self.memory_token_budget: int = int(os.getenv("MEMORY_TOKEN_BUDGET", "1500"))  # verbatim geçmiş için tahmini token
+        self.memory_summary_max_tokens: int = 300  # Eski turların arka plan özeti
+        
+        # Kalıcı konuşma deposu: "sqlite" (WAL, yeniden başlatma/çoklu süreç), "memory" veya "none"
+        self.conversation_store: str = os.getenv("CONVERSATION_STORE", "sqlite").lower()
+        self.conversation_store_path: str = os.getenv("CONVERSATION_STORE_PATH", "data/conversations.sqlite3")
+        self.history_page_size: int = int(os.getenv("HISTORY_PAGE_SIZE", "50"))  # get_conversation_history varsayılan sayfası
+        
+        # Yanıt cache'i (LRU bellek + SQLite disk)
+        self.response_cache_enabled: bool = os.getenv("RESPONSE_CACHE_ENABLED", "true").lower() == "true"
+        self.response_cache_path: str = os.getenv("RESPONSE_CACHE_PATH", ".cache/response_cache.sqlite3")
+        self.response_cache_ttl: int = int(os.getenv("RESPONSE_CACHE_TTL", "3600"))  # saniye
+        self.response_cache_memory_entries: int = 512
+        self.response_cache_disk_entries: int = 10000
+        self.response_cache_use_memory: bool = True  # Anahtara konuşma geçmişinin izini ekle
+        
+        # Yerel dil tespiti: bu güvenin altında LLM'e danışılır
+        self.language_confidence_threshold: float = 0.8
+        
+        # ReAct agent'ı önündeki hızlı yönlendirici
+        self.router_enabled: bool = os.getenv("ROUTER_ENABLED", "true").lower() == "true"
+        self.router_confidence_threshold: float = 0.6
+        
+        # Birden çok bağımsız tool: eşzamanlı çalıştırma + tek sentez çağrısı
+        self.parallel_tools_enabled: bool = os.getenv("PARALLEL_TOOLS_ENABLED", "true").lower() == "true"
+        self.tool_workers: int = int(os.getenv("TOOL_WORKERS", "8"))
+        self.tool_timeout: float = float(os.getenv("TOOL_TIMEOUT", "20"))  # saniye, tool başına
+        
+        # Özetleme modu: "extractive" (yerel TextRank) veya "abstractive" (LLM)
+        self.summarizer_mode: str = os.getenv("SUMMARIZER_MODE", "extractive")
+        
+        # Prompt profili: "full" (ayrıntılı) veya "compact" (aynı tool yönlendirmesi, ~1/3 token)
+        self.prompt_profile: str = os.getenv("PROMPT_PROFILE", "full")
+        self.prompts: PromptProfile = get_prompt_profile(self.prompt_profile)
+        self.system_prompt: str = self.prompts.system
+        
+        # Soğuk başlangıç: hazır olana kadar hedef süre ve varsayılan modelin arka planda ısıtılması
+        self.startup_target_ms: float = float(os.getenv("STARTUP_TARGET_MS", "1000"))
+        self.preload_default_model: bool = os.getenv("PRELOAD_DEFAULT_MODEL", "true").lower() == "true"
+        
+        # Gözlemlenebilirlik: istek başına span log'u, Gradio yanında /metrics ve agent'ın stdout izi
+        self.tracing_enabled: bool = os.getenv("TRACING_ENABLED", "true").lower() == "true"
+        self.trace_log_min_ms: float = float(os.getenv("TRACE_LOG_MIN_MS", "0"))  # yalnızca daha yavaş istekleri logla
+        self.metrics_enabled: bool = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+        self.metrics_path: str = os.getenv("METRICS_PATH", "/metrics")
+        self.agent_verbose: bool = os.getenv("AGENT_VERBOSE", "false").lower() == "true"
+        
+        # Headless HTTP API: Gradio ile aynı süreç/port, aynı agent, cache'ler ve oturum deposu
+        self.api_enabled: bool = os.getenv("API_ENABLED", "true").lower() == "true"
+        self.api_prefix: str = os.getenv("API_PREFIX", "/v1")
+        self.api_token: str = os.getenv("API_TOKEN", "")  # boş değilse "Authorization: Bearer <token>" zorunlu
+        self.api_max_image_bytes: int = int(os.getenv("API_MAX_IMAGE_BYTES", str(20 * 1024 * 1024)))
+        self.api_batch_max_items: int = int(os.getenv("API_BATCH_MAX_ITEMS", "100"))
+        self.api_batch_concurrency: int = int(os.getenv("API_BATCH_CONCURRENCY", "8"))  # batch başına eşzamanlı prompt
+        
+        # Dayanıklılık: 429/5xx'te jitter'lı retry, model başına circuit breaker, ikincil modele hedge/failover
+        self.llm_max_attempts: int = int(os.getenv("LLM_MAX_ATTEMPTS", "3"))
+        self.llm_retry_base_delay: float = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.25"))  # saniye
+        self.llm_retry_max_delay: float = float(os.getenv("LLM_RETRY_MAX_DELAY", "4"))
+        self.llm_retry_budget: float = float(os.getenv("LLM_RETRY_BUDGET", "10"))  # çağrı başına toplam bekleme
+        self.circuit_failure_threshold: int = int(os.getenv("CIRCUIT_FAILURE_THRESHOLD", "5"))
+        self.circuit_reset_timeout: float = float(os.getenv("CIRCUIT_RESET_TIMEOUT", "30"))
+        # "birincil=ikincil" çiftleri, virgülle ayrılmış
+        self.llm_secondary_models: Dict[str, str] = _parse_pairs(
+            os.getenv("LLM_SECONDARY_MODELS", "llama-3.3-70b-versatile=llama-3.3-70b-specdec"))
+        self.hedge_enabled: bool = os.getenv("HEDGE_ENABLED", "false").lower() == "true"
+        self.hedge_percentile: float = float(os.getenv("HEDGE_PERCENTILE", "95"))
+        self.hedge_min_delay_ms: float = float(os.getenv("HEDGE_MIN_DELAY_MS", "200"))
+        self.hedge_initial_delay_ms: float = float(os.getenv("HEDGE_INITIAL_DELAY_MS", "1500"))
+        self.hedge_min_samples: int = int(os.getenv("HEDGE_MIN_SAMPLES", "20"))
+        self.hedge_workers: int = int(os.getenv("HEDGE_WORKERS", "32"))
+        
+        # Hız sınırı zamanlayıcısı: model başına dakikalık istek/token kovaları (Groq x-ratelimit-* başlıklarıyla
+        # güncellenir), öncelik kuyruğu ve oturum başına adil paylaşım
+        self.scheduler_enabled: bool = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+        self.rate_limit_rpm: int = int(os.getenv("RATE_LIMIT_RPM", "1000"))  # Groq developer katmanı; ücretsiz: 30
+        self.rate_limit_tpm: int = int(os.getenv("RATE_LIMIT_TPM", "300000"))  # ücretsiz: 12000
+        self.gemini_rate_limit_rpm: int = int(os.getenv("GEMINI_RATE_LIMIT_RPM", "4000"))
+        self.gemini_rate_limit_tpm: int = int(os.getenv("GEMINI_RATE_LIMIT_TPM", "4000000"))
+        # Model başına "model=rpm:tpm" çiftleri, virgülle ayrılmış
+        self.rate_limit_overrides: Dict[str, str] = _parse_pairs(os.getenv("RATE_LIMITS", ""))
+        self.scheduler_completion_tokens: int = 512  # Yanıt için bütçeden ayrılan tahmini token
+        self.scheduler_max_wait: float = float(os.getenv("SCHEDULER_MAX_WAIT", "60"))  # saniye
+        
+        # Single-flight: aynı anda gelen özdeş mesaj / tool prompt'u / görsel isteği tek upstream çağrısını paylaşır
+        self.singleflight_enabled: bool = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+        # true: geçmişi olan oturumların mesajları hiç birleştirilmez; false: yalnızca geçmişi aynı olanlar
+        self.singleflight_skip_memory: bool = os.getenv("SINGLEFLIGHT_SKIP_MEMORY", "true").lower() == "true"
 
-Sen sadece bir AI değil, Llama 3.3 seviye problem solver'sın! 🚀"""
-    
     def get_available_models(self) -> dict:
         """Mevcut model listesi."""
         return {
@@ -85,7 +187,8 @@ Sen sadece bir AI değil, Llama 3.3 seviye problem solver'sın! 🚀"""
                 "llama3-70b-8192"
             ],
             "vision_models": [
-                "models/gemini-2.0-flash-lite"
+                "models/gemini-2.0-flash-lite",
+                "llama-3.2-90b-vision-preview"
             ]
         }
     
@@ -106,5 +209,18 @@ Sen sadece bir AI değil, Llama 3.3 seviye problem solver'sın! 🚀"""
             raise ValueError("GROQ_API_KEY environment variable is required")
         return True
 
-# Global settings instance
-settings = Settings()
+def get_settings() -> Settings:
+    """Süreç genelindeki ayarlar; ilk çağrıda oluşturulur"""
+    global _settings
+    if _settings is None:
+        with _settings_lock:
+            if _settings is None:
+                _settings = Settings()
+    return _settings
+
+
+def __getattr__(name: str):
+    # Geriye uyumluluk: `from config.settings import settings` import anında değil ilk erişimde kurar
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
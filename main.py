@@ -3,33 +3,108 @@ Llama 3.3 70B Prompt-Based AI Assistant
 LangChain + prompt engineering ile tool entegrasyonu
 """
 
-import gradio as gr
-from config.settings import Settings
-from agents.llm_agent import LLMAgent
-from ui.interface import GradioInterface
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
 
-def main():
+from agents.startup_profile import PHASE_MARKER, StartupTimer, format_report, parse_importtime
+
+# Ağır bağımlılıklar (gradio, langchain, groq, PIL) burada değil, build_app içinde yüklenir
+CORE_PHASES = ("settings", "import:agent", "init:agent")
+
+
+def build_app(timer: StartupTimer):
+    """Ayarları, agent'ı ve arayüzü aşama aşama kur; API anahtarı yoksa None döner"""
+    with timer.phase("settings"):
+        from config.settings import get_settings
+        settings = get_settings()
+    if not settings.groq_api_key:
+        print("❌ GROQ_API_KEY bulunamadı!")
+        print("Lütfen .env dosyasında GROQ_API_KEY=your_key_here şeklinde ayarlayın")
+        return None
+
+    print("✅ Ayarlar doğrulandı")
+
+    # Agent'ı başlat
+    with timer.phase("import:agent"):
+        from agents.llm_agent import LLMAgent
+    with timer.phase("init:agent"):
+        agent = LLMAgent()
+    print("✅ Llama 3.3 Agent başlatıldı")
+
+    # Gradio interface'i oluştur
+    with timer.phase("import:ui"):
+        from ui.interface import GradioInterface
+    with timer.phase("init:ui"):
+        interface = GradioInterface(agent)
+    print("✅ Web interface hazır")
+    return settings, agent, interface
+
+
+def profile_startup() -> None:
+    """Başlangıcı import ölçümüyle ayrı bir süreçte çalıştır ve raporla"""
+    if os.environ.get("PYTHONPROFILEIMPORTTIME"):
+        # Ölçülen alt süreç: kur, varsayılan modeli ısıt, aşama sürelerini yaz ve çık
+        timer = StartupTimer()
+        app = build_app(timer)
+        if app is not None:
+            with timer.phase("warm:model"):
+                app[1].warm_up()
+        print(PHASE_MARKER + json.dumps(timer.phases))
+        return
+
+    started = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--profile-startup"],
+        env={**os.environ, "PYTHONPROFILEIMPORTTIME": "1"},
+        capture_output=True,
+        text=True
+    )
+    process_ms = (time.perf_counter() - started) * 1000
+    phases = None
+    for line in result.stdout.splitlines():
+        if line.startswith(PHASE_MARKER):
+            phases = json.loads(line[len(PHASE_MARKER):])
+        else:
+            print(line)
+    if phases is None:
+        print(f"❌ Başlangıç profili alınamadı (çıkış kodu {result.returncode})")
+        errors = [line for line in result.stderr.splitlines() if not line.startswith("import time:")]
+        print("\n".join(errors[-20:]))
+        return
+
+    from config.settings import get_settings
+    print(format_report(phases, parse_importtime(result.stderr.splitlines()),
+                        get_settings().startup_target_ms, CORE_PHASES, process_ms))
+
+
+def main(argv=None):
     """Ana fonksiyon - Llama 3.3 70B sistemi başlat"""
+    parser = argparse.ArgumentParser(description="Llama 3.3 70B Assistant")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="Başlatmadan modül başına import sürelerini ve aşama sürelerini raporla")
+    args = parser.parse_args(argv)
+    if args.profile_startup:
+        profile_startup()
+        return
+
     try:
         print("🚀 Llama 3.3 70B Assistant başlatılıyor...")
-        
-        # Ayarları doğrula
-        settings = Settings()
-        if not settings.groq_api_key:
-            print("❌ GROQ_API_KEY bulunamadı!")
-            print("Lütfen .env dosyasında GROQ_API_KEY=your_key_here şeklinde ayarlayın")
+
+        timer = StartupTimer()
+        app = build_app(timer)
+        if app is None:
             return
-        
-        print("✅ Ayarlar doğrulandı")
-        
-        # Agent'ı başlat
-        agent = LLMAgent()
-        print("✅ Llama 3.3 Agent başlatıldı")
-        
-        # Gradio interface'i oluştur
-        interface = GradioInterface(agent)
-        print("✅ Web interface hazır")
-        
+        settings, agent, interface = app
+        print(f"⏱️ Hazır: {sum(timer.phases.values()):.0f} ms")
+
+        # Varsayılan model (langchain import'ları dahil) sunucu açılırken arka planda kurulur
+        if settings.preload_default_model:
+            agent.warm_up_async()
+
         # Başlat
         print(f"""
 🚀 Llama 3.3 70B Assistant HAZIR!
@@ -45,12 +120,14 @@ def main():
 
 🌐 Interface: http://localhost:{settings.gradio_port}
 """)
-        
+        if settings.metrics_enabled:
+            print(f"📈 Metrics: http://localhost:{settings.gradio_port}{settings.metrics_path}\n")
+
         interface.launch(
             share=settings.gradio_share,
             port=settings.gradio_port
         )
-        
+
     except Exception as e:
         print(f"❌ Başlatma hatası: {str(e)}")
         print("Lütfen .env dosyanızı ve API anahtarınızı kontrol edin")
@@ -0,0 +1,131 @@
+import asyncio
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from agents.scheduler import PRIORITY_BATCH, _priority
+from agents.session_manager import SessionManager, is_ephemeral
+from ui.api import HeadlessAPI
+
+
+class EchoAgent:
+    """HeadlessAPI'nin kullandığı LLMAgent yüzeyi; yanıtı mesajdan üretir"""
+
+    def __init__(self):
+        self.sessions = SessionManager(memory_factory=lambda session_id: [])
+        self.calls = []
+
+    async def astream_message(self, message, image=None, session_id=None):
+        session = self.sessions.get(session_id)
+        self.calls.append((message, image, session_id, _priority.get()))
+        reply = f"{'görsel ' if image is not None else ''}{message}"
+        session.memory.append(reply)
+        for word in reply.split():
+            await asyncio.sleep(0)
+            yield word + " "
+
+    async def aprocess_message(self, message, image=None, session_id=None):
+        return "".join([chunk async for chunk in self.astream_message(message, image, session_id)])
+
+
+@pytest.fixture
+def agent():
+    return EchoAgent()
+
+
+@pytest.fixture
+def api(agent):
+    return HeadlessAPI(agent)
+
+
+@pytest.fixture
+def client(api):
+    with TestClient(FastAPI(routes=api.routes())) as client:
+        yield client
+
+
+def test_chat_with_session_keeps_session(client, agent):
+    response = client.post("/v1/chat", json={"message": "merhaba dünya", "session_id": "u1"})
+    assert response.status_code == 200
+    assert response.json() == {"session_id": "u1", "response": "merhaba dünya "}
+    assert response.headers["x-session-id"] == "u1"
+    assert agent.sessions.peek("u1") is not None
+
+
+def test_sessionless_chat_is_ephemeral(client, agent):
+    response = client.post("/v1/chat", json={"message": "merhaba"})
+    assert response.json() == {"response": "merhaba "}
+    assert "x-session-id" not in response.headers
+    assert is_ephemeral(agent.calls[0][2])
+    assert len(agent.sessions) == 0
+
+
+@pytest.mark.parametrize("mode", ["sse", "ndjson"])
+def test_chat_streams(client, agent, mode):
+    response = client.post("/v1/chat", json={"message": "bir iki üç", "stream": mode})
+    assert response.status_code == 200
+    if mode == "sse":
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [line[len("data: "):] for line in response.text.splitlines() if line.startswith("data: ")]
+        deltas = [json.loads(event)["delta"] for event in events[:-1]]
+        assert "event: done" in response.text
+    else:
+        lines = [json.loads(line) for line in response.text.splitlines()]
+        deltas = [line["delta"] for line in lines[:-1]]
+        assert lines[-1] == {"done": True}
+    assert "".join(deltas) == "bir iki üç "
+    assert len(agent.sessions) == 0
+
+
+def test_vision_takes_raw_bytes(client, agent):
+    response = client.post("/v1/vision?message=bu+ne&session_id=u1", content=b"\x89PNG...",
+                           headers={"content-type": "image/png"})
+    assert response.json()["response"] == "görsel bu ne "
+    assert agent.calls[0][1] == b"\x89PNG..."
+
+
+def test_vision_rejects_empty_and_oversized_bodies(client, api, monkeypatch):
+    assert client.post("/v1/vision", content=b"").status_code == 400
+    monkeypatch.setattr(api.settings, "api_max_image_bytes", 4)
+    assert client.post("/v1/vision", content=b"12345").status_code == 413
+
+
+def test_batch_returns_every_item_at_batch_priority(client, agent):
+    items = [{"message": f"soru {i}", "id": str(i)} for i in range(5)] + [{"message": "kalıcı", "session_id": "u9"}]
+    response = client.post("/v1/batch", json={"items": items, "concurrency": 2})
+    assert response.status_code == 200
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert sorted(result["index"] for result in results) == list(range(6))
+    by_index = {result["index"]: result for result in results}
+    assert by_index[0]["response"] == "soru 0 "
+    assert "session_id" not in by_index[0]
+    assert by_index[5]["session_id"] == "u9"
+    assert all(call[3] == PRIORITY_BATCH for call in agent.calls)
+    # Yalnızca istemcinin verdiği oturum kalır
+    assert len(agent.sessions) == 1
+
+
+def test_client_cannot_use_the_ephemeral_prefix(client, agent):
+    agent.sessions.get("ephemeral-başkası")
+    assert client.post("/v1/chat", json={"message": "x", "session_id": "ephemeral-başkası"}).status_code == 400
+    assert client.post("/v1/vision?session_id=ephemeral-başkası", content=b"\x89PNG").status_code == 400
+    items = [{"message": "x"}, {"message": "y", "session_id": "ephemeral-başkası"}]
+    assert client.post("/v1/batch", json={"items": items}).status_code == 400
+    assert agent.calls == []
+    assert agent.sessions.peek("ephemeral-başkası") is not None
+
+
+def test_batch_validation(client, api):
+    assert client.post("/v1/batch", json={"items": []}).status_code == 422
+    too_many = [{"message": "x"}] * (api.settings.api_batch_max_items + 1)
+    assert client.post("/v1/batch", json={"items": too_many}).status_code == 413
+
+
+def test_token_auth(api, monkeypatch):
+    monkeypatch.setattr(api.settings, "api_token", "s3cret")
+    with TestClient(FastAPI(routes=api.routes())) as client:
+        assert client.post("/v1/chat", json={"message": "x"}).status_code == 401
+        response = client.post("/v1/chat", json={"message": "x"}, headers={"Authorization": "Bearer s3cret"})
+        assert response.status_code == 200
@@ -0,0 +1,42 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from agents.clock import find_timezone, format_now
+from agents.tools import get_current_time
+
+
+@pytest.mark.parametrize("text, zone", [
+    ("What time is it in Tokyo?", "Asia/Tokyo"),
+    ("New York'ta saat kaç?", "America/New_York"),
+    ("Londra'da saat kaç", "Europe/London"),
+    ("İstanbul saati", "Europe/Istanbul"),
+    ("saat kaç? (asia/kolkata)", "Asia/Kolkata"),
+    ("UTC", "UTC"),
+    ("Saat kaç?", None),
+    ("Bunu senin için yaptım", None),
+    ("Mars/Olympus", None),
+])
+def test_find_timezone(text, zone):
+    assert find_timezone(text) == zone
+
+
+def test_format_now_uses_language_and_zone():
+    now = datetime(2026, 1, 5, 12, 30, tzinfo=timezone.utc)
+    text = format_now(timezone="Asia/Tokyo", language="en", now=now)
+    assert "5 January 2026" in text
+    assert "Monday" in text
+    assert "21:30:00" in text
+    assert "Asia/Tokyo (UTC+09:00)" in text
+
+
+def test_unknown_timezone_falls_back_to_default():
+    now = datetime(2026, 1, 5, 12, 30, tzinfo=timezone.utc)
+    assert "Europe/Istanbul (UTC+03:00)" in format_now(timezone="Nowhere/City", now=now)
+
+
+def test_tool_reads_city_from_plain_and_json_input():
+    assert "Asia/Tokyo" in get_current_time("Tokyo")
+    assert "America/New_York" in get_current_time(json.dumps({"language": "en", "timezone": "America/New_York"}))
+    assert "Europe/Istanbul" in get_current_time(json.dumps({"language": "tr", "timezone": None}))
@@ -0,0 +1,182 @@
+import asyncio
+import threading
+import time
+from datetime import datetime
+
+import pytest
+
+from agents.conversation_store import (
+    ConversationStore, InMemoryConversationStore, SQLiteConversationStore, create_conversation_store,
+)
+from agents.llm_agent import LLMAgent
+from agents.memory import TokenBudgetMemory
+from agents.session_manager import SessionState
+
+
+@pytest.fixture(params=["sqlite", "memory"])
+def store(request, tmp_path):
+    store = create_conversation_store(request.param, str(tmp_path / "conversations.sqlite3"))
+    yield store
+    store.close()
+
+
+def _fill(store, session_id, turns, tokens=10):
+    for index in range(turns):
+        store.append(session_id, [("human", f"soru {index}", tokens), ("assistant", f"cevap {index}", tokens)],
+                     created_at=1000.0 + index)
+
+
+def test_backends_are_selected_by_name(tmp_path):
+    assert isinstance(create_conversation_store("sqlite", str(tmp_path / "c.sqlite3")), SQLiteConversationStore)
+    assert isinstance(create_conversation_store("memory", ""), InMemoryConversationStore)
+    assert create_conversation_store("none", "") is None
+    assert create_conversation_store("bilinmeyen", "") is None
+
+
+def test_incomplete_backend_fails_at_instantiation():
+    class AppendOnly(ConversationStore):
+        def append(self, session_id, messages, created_at=None):
+            return 0
+
+    with pytest.raises(TypeError):
+        AppendOnly()
+
+
+def test_append_assigns_sequential_seq_and_counts(store):
+    assert store.append("s", [("human", "a", 1), ("assistant", "b", 1)]) == 0
+    assert store.append("s", [("human", "c", 1), ("assistant", "d", 1)]) == 2
+    assert store.count("s") == 4
+    assert store.count("başka") == 0
+
+
+def test_page_reads_only_the_requested_window(store):
+    _fill(store, "s", 10)
+    page = store.page("s", offset=4, limit=3)
+    assert [message.seq for message in page] == [4, 5, 6]
+    assert [message.content for message in page] == ["soru 2", "cevap 2", "soru 3"]
+    assert store.page("s", offset=18, limit=5)[-1].seq == 19
+    assert store.page("s", offset=50, limit=5) == []
+
+
+def test_as_dict_has_real_timestamp_and_tokens(store):
+    _fill(store, "s", 1, tokens=7)
+    record = store.page("s")[0].as_dict()
+    assert record["role"] == "human"
+    assert record["tokens"] == 7
+    assert record["timestamp"] == datetime.fromtimestamp(1000.0).isoformat()
+
+
+def test_time_range(store):
+    _fill(store, "s", 5)
+    messages = store.time_range("s", since=1001.0, until=1003.0, limit=10)
+    assert [message.content for message in messages] == ["soru 1", "cevap 1", "soru 2", "cevap 2"]
+    assert len(store.time_range("s", limit=3)) == 3
+
+
+def test_tail_respects_token_budget_and_keeps_last_turn(store):
+    _fill(store, "s", 5, tokens=10)
+    assert [message.seq for message in store.tail("s", token_budget=40)] == [6, 7, 8, 9]
+    assert [message.seq for message in store.tail("s", token_budget=1)] == [8, 9]
+    assert [message.seq for message in store.tail("s", token_budget=1000, after_seq=7)] == [7, 8, 9]
+
+
+def test_clear_hides_history_without_renumbering(store):
+    _fill(store, "s", 3)
+    store.save_summary("s", "özet", 4)
+    store.clear("s")
+    assert store.count("s") == 0
+    assert store.page("s") == []
+    assert store.load_summary("s") == ("", 6)
+    assert store.append("s", [("human", "yeni", 1)]) == 6
+    assert [message.content for message in store.page("s")] == ["yeni"]
+
+
+def test_sqlite_history_survives_reopen(tmp_path):
+    path = str(tmp_path / "c.sqlite3")
+    first = SQLiteConversationStore(path)
+    _fill(first, "s", 2)
+    first.save_summary("s", "özet", 2)
+    first.close()
+    reopened = SQLiteConversationStore(path)
+    assert reopened.count("s") == 4
+    assert reopened.load_summary("s") == ("özet", 2)
+    reopened.close()
+
+
+class CountingStore(InMemoryConversationStore):
+    def __init__(self):
+        super().__init__()
+        self.count_calls = 0
+
+    def count(self, session_id):
+        self.count_calls += 1
+        return super().count(session_id)
+
+
+def _memory(store, budget=1000):
+    return TokenBudgetMemory(summarizer=lambda previous, messages: "özet", token_budget=budget,
+                             store=store, session_id="s")
+
+
+def test_memory_restores_summary_and_tail_from_store():
+    store = InMemoryConversationStore()
+    _fill(store, "s", 4, tokens=10)
+    store.save_summary("s", "eski konuşma", 4)
+    history = _memory(store, budget=25).load_memory_variables()["chat_history"]
+    assert history[0].content.endswith("eski konuşma")
+    assert [message.content for message in history[1:]] == ["soru 3", "cevap 3"]
+
+
+def test_memory_reads_do_not_hit_the_store_and_refresh_picks_up_other_writers():
+    store = CountingStore()
+    memory = _memory(store)
+    memory.save_context({"input": "merhaba"}, {"output": "selam"})
+    calls = store.count_calls
+    for _ in range(5):
+        memory.load_memory_variables()
+    assert store.count_calls == calls
+
+    # Aynı oturuma başka bir worker yazdı
+    store.append("s", [("human", "diğer", 5), ("assistant", "worker", 5)])
+    assert len(memory.load_memory_variables()["chat_history"]) == 2
+    memory.refresh()
+    assert [message.content for message in memory.load_memory_variables()["chat_history"]] == [
+        "merhaba", "selam", "diğer", "worker"]
+
+
+def test_memory_clear_clears_store():
+    store = InMemoryConversationStore()
+    memory = _memory(store)
+    memory.save_context({"input": "a"}, {"output": "b"})
+    memory.clear()
+    assert store.count("s") == 0
+    assert _memory(store).load_memory_variables()["chat_history"] == []
+
+
+def test_async_save_runs_store_write_off_the_event_loop():
+    class SlowStore(InMemoryConversationStore):
+        def append(self, *args, **kwargs):
+            self.thread = threading.current_thread()
+            time.sleep(0.2)
+            return super().append(*args, **kwargs)
+
+    store = SlowStore()
+    session = SessionState("s", _memory(store))
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.ensure_future(ticker())
+        await LLMAgent._asave(session, "soru", "cevap")
+        task.cancel()
+        return ticks
+
+    assert asyncio.run(main()) >= 5
+    assert store.thread is not threading.main_thread()
+    assert store.count("s") == 2
@@ -0,0 +1,37 @@
+import pytest
+
+from agents.language_detection import get_detector
+
+
+@pytest.mark.parametrize("text, language", [
+    ("Merhaba", "tr"),
+    ("Selam, nasılsın?", "tr"),
+    ("Bu kodda hata nerede?", "tr"),
+    ("Python'da liste nasıl sıralanır?", "tr"),
+    ("Kubernetes pod'u sürekli yeniden başlıyor, neden?", "tr"),
+    ("Kubernetes pod restart loop debug", "en"),
+    ("API endpoint returns 500 error", "en"),
+    ("Docker container keeps crashing after deploy", "en"),
+    ("How do I fix a memory leak in my React app?", "en"),
+    ("SQL query optimization tips", "en"),
+    ("Thanks", "en"),
+    ("Bonjour", "fr"),
+    ("Comment configurer nginx comme reverse proxy ?", "fr"),
+    ("Danke schön", "de"),
+    ("Wie kann ich meinen Docker Container neu starten?", "de"),
+])
+def test_detects_common_short_and_technical_inputs(text, language):
+    detected, confidence = get_detector().detect(text)
+    assert detected == language
+    assert confidence >= 0.8
+
+
+@pytest.mark.parametrize("text", ["ok", "?!", "5", "a b"])
+def test_inputs_without_enough_letters_have_no_confidence(text):
+    assert get_detector().detect(text)[1] == 0.0
+
+
+def test_spans_split_mixed_text():
+    report = get_detector().analyze("Bugün hava çok güzel. The weather is really nice today.")
+    assert report["mixed"] is True
+    assert [span["language"] for span in report["spans"]] == ["tr", "en"]
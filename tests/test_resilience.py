@@ -0,0 +1,142 @@
+import time
+
+import pytest
+
+from agents.resilience import (
+    CLOSED, HALF_OPEN, OPEN, CircuitBreaker, CircuitOpenError, Resilience, RetryPolicy, UpstreamHTTPError,
+    is_retryable,
+)
+from config.settings import Settings
+
+
+@pytest.fixture
+def settings():
+    settings = Settings()
+    settings.llm_max_attempts = 3
+    settings.llm_retry_base_delay = 0.0
+    settings.llm_retry_max_delay = 0.0
+    settings.llm_retry_budget = 5.0
+    settings.circuit_failure_threshold = 2
+    settings.circuit_reset_timeout = 60.0
+    settings.llm_secondary_models = {"birincil": "ikincil"}
+    settings.hedge_enabled = False
+    return settings
+
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("m", failure_threshold=3, reset_timeout=60)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.allow()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+    breaker.record_failure()
+    assert breaker.state == OPEN
+    assert breaker.is_open()
+    assert not breaker.allow()
+
+
+def test_half_open_admits_a_single_probe(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("m", failure_threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    assert not breaker.allow()
+    now[0] += 30
+    assert not breaker.is_open()
+    assert breaker.allow()
+    assert breaker.state == HALF_OPEN
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_failed_probe_reopens_and_successful_probe_closes(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "monotonic", lambda: now[0])
+    breaker = CircuitBreaker("m", failure_threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    now[0] += 30
+    assert breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.is_open()
+    now[0] += 30
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.failures == 0
+
+
+@pytest.mark.parametrize("error, retryable", [
+    (UpstreamHTTPError("limit", 429), True),
+    (UpstreamHTTPError("down", 503), True),
+    (UpstreamHTTPError("timeout", 408), True),
+    (UpstreamHTTPError("bad request", 400), False),
+    (UpstreamHTTPError("auth", 401), False),
+    (ConnectionError("reset"), True),
+    (TimeoutError(), True),
+    (CircuitOpenError("m"), False),
+    (ValueError("bug"), False),
+])
+def test_is_retryable(error, retryable):
+    assert is_retryable(error) is retryable
+
+
+def test_retry_delay_honours_retry_after_up_to_max():
+    policy = RetryPolicy(max_attempts=3, base_delay=0.1, max_delay=2.0)
+    assert policy.delay(0, UpstreamHTTPError("limit", 429, retry_after=1.5)) == 1.5
+    assert policy.delay(0, UpstreamHTTPError("limit", 429, retry_after=30)) == 2.0
+    assert 0 <= policy.delay(3, UpstreamHTTPError("down", 503)) <= 0.8
+
+
+def test_call_retries_transient_errors(settings):
+    settings.circuit_failure_threshold = 5
+    resilience = Resilience(settings)
+    attempts = []
+
+    def flaky(model):
+        attempts.append(model)
+        if len(attempts) < 3:
+            raise UpstreamHTTPError("down", 503)
+        return "tamam"
+
+    assert resilience.call("test", "m", flaky) == "tamam"
+    assert attempts == ["m", "m", "m"]
+    assert resilience.breaker("m").state == CLOSED
+
+
+def test_call_does_not_retry_permanent_errors(settings):
+    resilience = Resilience(settings)
+    attempts = []
+
+    def rejected(model):
+        attempts.append(model)
+        raise UpstreamHTTPError("bad request", 400)
+
+    with pytest.raises(UpstreamHTTPError):
+        resilience.call("test", "m", rejected)
+    assert len(attempts) == 1
+    assert resilience.breaker("m").state == CLOSED
+
+
+def test_open_circuit_fails_over_to_secondary(settings):
+    resilience = Resilience(settings)
+
+    def failing(model):
+        raise UpstreamHTTPError("down", 503)
+
+    with pytest.raises(UpstreamHTTPError):
+        resilience.call("test", "birincil", failing)
+    assert resilience.breaker("birincil").state == OPEN
+    assert not resilience.available("birincil")
+    assert resilience.call("test", "birincil", lambda model: model) == "ikincil"
+
+
+def test_open_circuit_without_secondary_rejects_immediately(settings):
+    resilience = Resilience(settings)
+    for _ in range(settings.circuit_failure_threshold):
+        resilience.record_outcome("yalnız", UpstreamHTTPError("down", 503))
+    with pytest.raises(CircuitOpenError):
+        resilience.call("test", "yalnız", lambda model: "çağrılmamalı")
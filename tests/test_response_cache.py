@@ -0,0 +1,120 @@
+import pytest
+
+from agents.response_cache import ResponseCache, is_time_sensitive, memory_fingerprint, normalize_message
+
+
+class Message:
+    def __init__(self, content):
+        self.content = content
+
+
+class HumanMessage(Message):
+    pass
+
+
+class AIMessage(Message):
+    pass
+
+
+def key(message, **overrides):
+    params = {"model": "llama", "temperature": 0.7, "system_prompt": "sistem", "fingerprint": None}
+    params.update(overrides)
+    return ResponseCache.make_key(params["model"], params["temperature"], params["system_prompt"], message,
+                                  params["fingerprint"])
+
+
+def test_normalize_message_ignores_case_spacing_and_trailing_punctuation():
+    assert normalize_message("  Python   NEDIR?! ") == "python nedir"
+    assert normalize_message("Merhaba\n dünya...") == "merhaba dünya"
+
+
+def test_make_key_separates_model_temperature_prompt_and_history():
+    base = key("Python nedir?")
+    assert key("  python nedir ") == base
+    assert key("Python nedir?", model="gemma") != base
+    assert key("Python nedir?", temperature=0.2) != base
+    assert key("Python nedir?", system_prompt="başka") != base
+    assert key("Python nedir?", fingerprint="abc") != base
+
+
+def test_memory_fingerprint_depends_on_roles_and_order():
+    history = [HumanMessage("selam"), AIMessage("merhaba")]
+    assert memory_fingerprint(history) == memory_fingerprint([HumanMessage("selam"), AIMessage("merhaba")])
+    assert memory_fingerprint(history) != memory_fingerprint(list(reversed(history)))
+    assert memory_fingerprint(history) != memory_fingerprint([AIMessage("selam"), AIMessage("merhaba")])
+    assert memory_fingerprint([]) != memory_fingerprint(history)
+
+
+@pytest.mark.parametrize("message, expected", [
+    ("Saat kaç?", True),
+    ("Bugün hava durumu nasıl", True),
+    ("latest news please", True),
+    ("Python nedir?", False),
+    ("Bir liste nasıl sıralanır", False),
+])
+def test_time_sensitive_messages(message, expected):
+    assert is_time_sensitive(message) is expected
+
+
+def test_memory_tier_hit_and_miss():
+    cache = ResponseCache()
+    assert cache.get("k") is None
+    cache.set("k", "yanıt")
+    assert cache.get("k") == "yanıt"
+    stats = cache.stats()
+    assert stats["memory_hits"] == 1
+    assert stats["misses"] == 1
+    assert stats["stores"] == 1
+    assert stats["hit_rate"] == 0.5
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = ResponseCache(memory_entries=2)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.get("a")
+    cache.set("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1"
+    assert cache.get("c") == "3"
+
+
+def test_expired_entries_are_misses():
+    cache = ResponseCache()
+    cache.set("k", "eski", ttl=-1)
+    assert cache.get("k") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_disk_tier_survives_reopen(tmp_path):
+    db_path = str(tmp_path / "cache" / "responses.db")
+    ResponseCache(db_path=db_path).set("k", "kalıcı")
+    reopened = ResponseCache(db_path=db_path)
+    assert reopened.get("k") == "kalıcı"
+    assert reopened.get("k") == "kalıcı"
+    stats = reopened.stats()
+    assert stats["disk_hits"] == 1
+    assert stats["memory_hits"] == 1
+
+
+def test_disk_tier_drops_expired_and_overflowing_entries(tmp_path):
+    db_path = str(tmp_path / "responses.db")
+    cache = ResponseCache(db_path=db_path, disk_entries=2)
+    cache.set("eski", "x", ttl=-1)
+    cache.set("a", "1")
+    cache.set("b", "2")
+    cache.set("c", "3")
+    reopened = ResponseCache(db_path=db_path)
+    assert reopened.get("eski") is None
+    assert reopened.get("a") is None
+    assert reopened.get("b") == "2"
+    assert reopened.get("c") == "3"
+
+
+def test_clear_and_bypass_counter(tmp_path):
+    cache = ResponseCache(db_path=str(tmp_path / "responses.db"))
+    cache.set("k", "v")
+    cache.record_bypass()
+    cache.clear()
+    assert cache.get("k") is None
+    assert cache.stats()["bypasses"] == 1
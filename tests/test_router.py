@@ -0,0 +1,127 @@
+import json
+
+import pytest
+
+from agents.llm_agent import LLMAgent
+from agents.router import (
+    IntentRouter, ROUTE_AGENT, ROUTE_DIRECT, ROUTE_PARALLEL, ROUTE_TOOL, extract_payload,
+)
+
+
+@pytest.fixture
+def router():
+    return IntentRouter(confidence_threshold=0.6)
+
+
+@pytest.mark.parametrize("message, tool", [
+    ("Saat kaç?", "get_current_time"),
+    ("saat", "get_current_time"),
+    ("What time is it?", "get_current_time"),
+    ("what's the time", "get_current_time"),
+    ("Bugünün tarihi nedir?", "get_current_time"),
+    ("Bugün ne günü?", "get_current_time"),
+    ("tarih?", "get_current_time"),
+    ("İstanbul hava durumu", "web_search"),
+    ("internette ara: python 3.13", "web_search"),
+    ("Bu metni analiz et: Lorem ipsum dolor sit amet", "text_analyzer"),
+    ("Özetle: Birinci cümle. İkinci cümle.", "text_summarizer"),
+])
+def test_anchored_triggers_short_circuit_to_tool(router, message, tool):
+    decision = router.route(message)
+    assert decision.route == ROUTE_TOOL
+    assert decision.tool == tool
+    assert decision.confidence == 1.0
+
+
+@pytest.mark.parametrize("message, hint", [
+    ("What is the date of the French revolution?", "get_current_time"),
+    ("Bugün ne yemek yapsam?", "get_current_time"),
+    ("tarih dersi için kaynak öner", "get_current_time"),
+    ("Python'da date objesi nasıl formatlanır?", "get_current_time"),
+    ("Hangi gün doğdun?", "get_current_time"),
+    ("Toplantı saat kaçta?", "get_current_time"),
+    ("Bir ara görüşelim mi?", "web_search"),
+])
+def test_loose_keywords_go_to_agent_below_threshold(router, message, hint):
+    decision = router.route(message)
+    assert decision.route == ROUTE_AGENT
+    assert decision.stage == "regex-hint"
+    assert hint in decision.intents
+    assert decision.confidence < router.confidence_threshold
+
+
+@pytest.mark.parametrize("message, zone", [
+    ("What time is it in Tokyo?", "Asia/Tokyo"),
+    ("New York'ta saat kaç?", "America/New_York"),
+    ("Saat kaç?", None),
+])
+def test_time_questions_carry_the_asked_timezone(router, message, zone):
+    decision = router.route(message)
+    assert decision.tool == "get_current_time"
+    tool_input = json.loads(LLMAgent._tool_input(decision.tool, decision, message))
+    assert tool_input["timezone"] == zone
+
+
+@pytest.mark.parametrize("message", [
+    "Bugünün tarihi ile 3 gün sonrası hangi güne denk gelir?",
+    "What time is it in Springfield?",
+    "Springfield'da saat kaç?",
+    "Saat kaç? Tokyo ile saat farkı ne?",
+])
+def test_time_questions_needing_reasoning_go_to_agent(router, message):
+    decision = router.route(message)
+    assert decision.route == ROUTE_AGENT
+    assert decision.stage == "regex-qualified"
+    assert decision.intents == ("get_current_time",)
+    assert decision.confidence < router.confidence_threshold
+
+
+def test_parallel_payload_does_not_qualify_time_question(router):
+    message = "Saat kaç ve bu metni özetle: Dün yağmur yağdı. Üç gün sonra güneş açtı."
+    decision = router.route(message)
+    assert decision.route == ROUTE_PARALLEL
+    assert json.loads(LLMAgent._tool_input("get_current_time", decision, message))["timezone"] is None
+
+
+def test_smalltalk_goes_direct(router):
+    assert router.route("Merhaba!").route == ROUTE_DIRECT
+
+
+def test_long_message_with_greeting_is_not_smalltalk(router):
+    decision = router.route("Merhaba, bana kuantum dolanıklığını ayrıntılı ve örneklerle anlatır mısın?")
+    assert decision.route == ROUTE_AGENT
+
+
+def test_text_tool_without_payload_falls_back_to_agent(router):
+    decision = router.route("Bunu analiz et")
+    assert decision.route == ROUTE_AGENT
+    assert decision.stage == "regex-no-payload"
+
+
+def test_independent_tools_run_in_parallel(router):
+    decision = router.route("Saat kaç ve bu metni özetle: Bir. İki. Üç.")
+    assert decision.route == ROUTE_PARALLEL
+    assert decision.tools == ("get_current_time", "text_summarizer")
+
+
+def test_parallel_disabled_falls_back_to_agent():
+    decision = IntentRouter(parallel_enabled=False).route("Saat kaç ve bu metni özetle: Bir. İki.")
+    assert decision.route == ROUTE_AGENT
+
+
+def test_stats_count_fast_paths(router):
+    router.route("Saat kaç?")
+    router.route("Bir ara görüşelim mi?")
+    stats = router.stats()
+    assert stats["total"] == 2
+    assert stats["routes"] == {ROUTE_TOOL: 1, ROUTE_AGENT: 1}
+    assert stats["fast_path_ratio"] == 0.5
+
+
+@pytest.mark.parametrize("message, payload", [
+    ("Bu metni analiz et: merhaba dünya", "merhaba dünya"),
+    ('Şunu özetle "uzun bir metin"', "uzun bir metin"),
+    ("Bunu analiz et", None),
+])
+def test_extract_payload(message, payload):
+    assert extract_payload(message) == payload
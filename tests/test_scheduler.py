@@ -0,0 +1,166 @@
+import threading
+import time
+
+import pytest
+
+from agents import scheduler as scheduler_module
+from agents.scheduler import (
+    PRIORITY_BACKGROUND, PRIORITY_BATCH, RequestScheduler, SchedulerTimeoutError, TokenBucket, parse_duration,
+    work_scope,
+)
+from config.settings import Settings
+
+
+@pytest.fixture
+def settings():
+    settings = Settings()
+    settings.scheduler_enabled = True
+    settings.scheduler_max_wait = 0.2
+    settings.rate_limit_rpm = 2
+    settings.rate_limit_tpm = 1000
+    settings.rate_limit_overrides = {}
+    return settings
+
+
+@pytest.mark.parametrize("value, expected", [
+    ("7.66s", 7.66),
+    ("2m59.56s", 179.56),
+    ("120ms", 0.12),
+    ("1h", 3600.0),
+    ("3", 3.0),
+    (2.5, 2.5),
+    ("-1", 0.0),
+    (None, None),
+    ("yakında", None),
+])
+def test_parse_duration(value, expected):
+    if expected is None:
+        assert parse_duration(value) is None
+    else:
+        assert parse_duration(value) == pytest.approx(expected)
+
+
+def test_work_scope_restores_previous_values():
+    with work_scope(session_id="a", priority=PRIORITY_BACKGROUND):
+        with work_scope(priority=PRIORITY_BATCH):
+            assert scheduler_module._session_id.get() == "a"
+            assert scheduler_module._priority.get() == PRIORITY_BATCH
+        assert scheduler_module._priority.get() == PRIORITY_BACKGROUND
+    assert scheduler_module._session_id.get() is None
+    assert scheduler_module._priority.get() == scheduler_module.PRIORITY_INTERACTIVE
+
+
+def test_bucket_refills_at_capacity_per_period():
+    bucket = TokenBucket(60, period=60)
+    start = bucket.updated
+    assert bucket.wait_time(60, start) == 0
+    bucket.take(60, start)
+    assert bucket.wait_time(1, start) == pytest.approx(1.0)
+    assert bucket.level(start + 30) == pytest.approx(30)
+    assert bucket.level(start + 600) == pytest.approx(60)
+
+
+def test_bucket_caps_oversized_requests_and_refunds():
+    bucket = TokenBucket(10, period=10)
+    start = bucket.updated
+    bucket.take(50, start)
+    assert bucket.level(start) == 0
+    assert bucket.wait_time(50, start) == pytest.approx(10.0)
+    bucket.refund(4, start)
+    assert bucket.level(start) == pytest.approx(4)
+
+
+def test_bucket_sync_adopts_server_budget():
+    bucket = TokenBucket(1000, period=60)
+    now = bucket.updated + 1
+    bucket.sync(limit=6000, remaining=0, reset=6.0, now=now)
+    assert bucket.capacity == 6000
+    assert bucket.level(now) == 0
+    # Kalan bütçe reset süresi sonunda tamamen dolar
+    assert bucket.wait_time(6000, now) == pytest.approx(6.0)
+    bucket.sync(limit=None, remaining=6000, reset=None, now=now)
+    assert bucket.rate == pytest.approx(100)
+
+
+def test_bucket_clamp_and_hold():
+    bucket = TokenBucket(30, period=60)
+    now = bucket.updated
+    bucket.clamp(5, now)
+    assert bucket.level(now) == pytest.approx(5)
+    bucket.clamp(None, now)
+    bucket.clamp(20, now)
+    assert bucket.level(now) == pytest.approx(5)
+    bucket.hold(3.0, now)
+    assert bucket.wait_time(1, now) == pytest.approx(3.0)
+    assert bucket.wait_time(1, now + 3.0) == 0
+
+
+def test_acquire_is_noop_when_disabled(settings):
+    settings.scheduler_enabled = False
+    scheduler = RequestScheduler(settings)
+    for _ in range(10):
+        scheduler.acquire("llama", 10_000)
+    assert scheduler.stats() == {"budgets": {}, "queued": {}}
+
+
+def test_acquire_times_out_when_budget_is_exhausted(settings):
+    scheduler = RequestScheduler(settings)
+    scheduler.acquire("llama", 10)
+    scheduler.acquire("llama", 10)
+    started = time.perf_counter()
+    with pytest.raises(SchedulerTimeoutError) as excinfo:
+        scheduler.acquire("llama", 10)
+    assert time.perf_counter() - started >= settings.scheduler_max_wait
+    assert excinfo.value.model == "llama"
+    stats = scheduler.stats()
+    assert stats["queued"] == {}
+    assert stats["budgets"]["llama"]["requests_capacity"] == 2
+
+
+def test_budgets_are_per_model_with_overrides(settings):
+    settings.rate_limit_overrides = {"gemma": "5:500"}
+    scheduler = RequestScheduler(settings)
+    scheduler.acquire("llama", 100)
+    scheduler.acquire("gemma", 100)
+    budgets = scheduler.stats()["budgets"]
+    assert budgets["llama"]["tokens"] == 900
+    assert budgets["gemma"]["requests_capacity"] == 5
+    assert budgets["gemma"]["tokens"] == 400
+
+
+def test_rate_limit_response_holds_the_queue(settings):
+    settings.scheduler_max_wait = 0.1
+    scheduler = RequestScheduler(settings)
+    scheduler.observe_headers("llama", 429, {"retry-after": "30"})
+    with pytest.raises(SchedulerTimeoutError):
+        scheduler.acquire("llama", 1)
+
+
+def test_waiters_are_served_in_priority_order(settings):
+    settings.rate_limit_rpm = 1
+    settings.scheduler_max_wait = 5.0
+    scheduler = RequestScheduler(settings)
+    scheduler.acquire("llama", 1)
+    order = []
+
+    def call(priority):
+        with work_scope(session_id=f"s{priority}", priority=priority):
+            scheduler.acquire("llama", 1)
+        order.append(priority)
+
+    threads = [threading.Thread(target=call, args=(priority,)) for priority in (PRIORITY_BATCH, PRIORITY_BACKGROUND)]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 2
+    while sum(scheduler.stats()["queued"].values()) < 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    # Kovayı elle doldurup sırayı gözle: önce arka plan, sonra batch
+    with scheduler._lock:
+        scheduler._budgets["llama"].requests.refund(1, time.monotonic())
+        scheduler._dispatch()
+    threads[1].join(timeout=2)
+    with scheduler._lock:
+        scheduler._budgets["llama"].requests.refund(1, time.monotonic())
+        scheduler._dispatch()
+    threads[0].join(timeout=2)
+    assert order == [PRIORITY_BACKGROUND, PRIORITY_BATCH]
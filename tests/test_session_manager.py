@@ -0,0 +1,69 @@
+import threading
+
+from agents.session_manager import SessionManager
+
+
+def test_get_creates_once_and_reuses():
+    built = []
+    manager = SessionManager(memory_factory=lambda session_id: built.append(session_id) or session_id)
+    assert manager.get("a") is manager.get("a")
+    assert manager.get().session_id == "default"
+    assert built == ["a", "default"]
+
+
+def test_lru_eviction_keeps_recently_used():
+    manager = SessionManager(memory_factory=lambda session_id: None, max_sessions=2)
+    manager.get("a")
+    manager.get("b")
+    manager.get("a")
+    manager.get("c")
+    assert manager.peek("b") is None
+    assert manager.peek("a") is not None
+    assert manager.stats()["evictions"] == 1
+
+
+def test_slow_memory_restore_does_not_block_other_sessions():
+    release = threading.Event()
+
+    def factory(session_id):
+        if session_id == "yavaş":
+            release.wait(5)
+        return session_id
+
+    manager = SessionManager(memory_factory=factory)
+    manager.get("hazır")
+    slow = threading.Thread(target=manager.get, args=("yavaş",))
+    slow.start()
+    try:
+        fetched = []
+        other = threading.Thread(target=lambda: fetched.extend([manager.get("hazır"), manager.get("yeni")]))
+        other.start()
+        other.join(timeout=1)
+        assert not other.is_alive()
+        assert [state.session_id for state in fetched] == ["hazır", "yeni"]
+    finally:
+        release.set()
+        slow.join()
+    assert manager.peek("yavaş") is not None
+
+
+def test_concurrent_creation_keeps_a_single_session():
+    start = threading.Barrier(8)
+
+    def factory(session_id):
+        return object()
+
+    manager = SessionManager(memory_factory=factory)
+    states = []
+
+    def get():
+        start.wait()
+        states.append(manager.get("s"))
+
+    threads = [threading.Thread(target=get) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(state) for state in states}) == 1
+    assert len(manager) == 1
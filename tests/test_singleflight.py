@@ -0,0 +1,124 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from agents.singleflight import SingleFlight
+
+
+def _run_concurrently(count, target):
+    results, errors = [], []
+
+    def worker():
+        try:
+            results.append(target())
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+
+def test_do_shares_one_call_between_concurrent_callers():
+    flights = SingleFlight("test")
+    calls = []
+    release = threading.Event()
+
+    def slow():
+        calls.append(True)
+        release.wait(timeout=5)
+        return "yanıt"
+
+    threading.Timer(0.2, release.set).start()
+    results, errors = _run_concurrently(5, lambda: flights.do("k", slow))
+    assert errors == []
+    assert results == ["yanıt"] * 5
+    assert len(calls) == 1
+    assert flights.in_flight() == 0
+
+
+def test_do_propagates_leader_error_to_followers():
+    flights = SingleFlight("test")
+    release = threading.Event()
+
+    def failing():
+        release.wait(timeout=5)
+        raise ValueError("upstream")
+
+    threading.Timer(0.2, release.set).start()
+    results, errors = _run_concurrently(4, lambda: flights.do("k", failing))
+    assert results == []
+    assert len(errors) == 4
+    assert all(isinstance(error, ValueError) for error in errors)
+    # Hata sonrası anahtar serbest: yeni çağrı yeniden çalışır
+    assert flights.do("k", lambda: "yeni") == "yeni"
+
+
+def test_do_without_key_or_when_disabled_does_not_merge():
+    calls = []
+
+    def func():
+        calls.append(True)
+        time.sleep(0.05)
+        return len(calls)
+
+    _run_concurrently(3, lambda: SingleFlight("test").do(None, func))
+    _run_concurrently(3, lambda: SingleFlight("test", enabled=False).do("k", func))
+    assert len(calls) == 6
+
+
+def test_stream_replays_all_chunks_to_every_consumer():
+    flights = SingleFlight("test")
+    started = []
+
+    def factory():
+        started.append(True)
+        for chunk in ("a", "b", "c"):
+            time.sleep(0.05)
+            yield chunk
+
+    results, errors = _run_concurrently(4, lambda: "".join(flights.stream("k", factory)))
+    assert errors == []
+    assert results == ["abc"] * 4
+    assert len(started) == 1
+
+
+def test_stream_error_reaches_consumers_after_partial_output():
+    flights = SingleFlight("test")
+
+    def factory():
+        yield "a"
+        raise RuntimeError("kesildi")
+
+    seen = []
+    with pytest.raises(RuntimeError, match="kesildi"):
+        for chunk in flights.stream("k", factory):
+            seen.append(chunk)
+    assert seen == ["a"]
+    assert flights.in_flight() == 0
+
+
+def test_astream_shares_one_upstream_stream():
+    flights = SingleFlight("test")
+    started = []
+
+    async def factory():
+        started.append(True)
+        for chunk in ("x", "y"):
+            await asyncio.sleep(0.01)
+            yield chunk
+
+    async def consume():
+        return "".join([chunk async for chunk in flights.astream("k", factory)])
+
+    async def main():
+        return await asyncio.gather(*[consume() for _ in range(5)])
+
+    assert asyncio.run(main()) == ["xy"] * 5
+    assert len(started) == 1
+    assert flights.in_flight() == 0
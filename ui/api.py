@@ -0,0 +1,207 @@
+"""
+Headless HTTP/JSON API.
+Gradio'nun FastAPI uygulamasına (aynı süreç ve port) eklenir; UI ile aynı agent'ı, cache'leri ve
+oturum deposunu kullanır, Gradio kuyruk protokolünden geçmez.
+
+- POST /v1/chat   {"message", "session_id"?, "stream"?: "sse" | "ndjson"}
+- POST /v1/vision ham görsel bytes (gövde), soru ve oturum query parametresi
+- POST /v1/batch  {"items": [{"message", "session_id"?, "id"?}], "concurrency"?} → biten sonuçlar NDJSON
+
+session_id verilmeyen çağrılar geçicidir: hafızasız tek seferlik bir oturumda çalışır, konuşma deposuna
+yazılmaz ve yanıt bitince oturum havuzundan çıkarılır (UI oturumlarını LRU'dan itmez). Geçici oturum öneki
+("ephemeral-") sunucuya ayrılmıştır; bu önekle gelen session_id 400 ile reddedilir.
+"""
+
+import asyncio
+import hmac
+import json
+import time
+import uuid
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, Field
+
+from config.settings import get_settings
+from agents.metrics import get_metrics
+from agents.scheduler import PRIORITY_BATCH, work_scope
+from agents.session_manager import EPHEMERAL_PREFIX, is_ephemeral
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+API_REQUESTS = get_metrics().counter(
+    "api_requests_total", "Headless API istekleri", ("endpoint", "mode"))
+
+StreamMode = Optional[Literal["sse", "ndjson"]]
+
+
+class ChatRequest(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+    stream: StreamMode = None
+
+
+class BatchItem(BaseModel):
+    message: str
+    session_id: Optional[str] = None
+    id: Optional[str] = None
+
+
+class BatchRequest(BaseModel):
+    items: List[BatchItem] = Field(min_length=1)
+    concurrency: Optional[int] = Field(default=None, ge=1)
+
+
+class HeadlessAPI:
+    """LLMAgent'ı /v1 altında JSON uç noktalarıyla sunar"""
+
+    def __init__(self, agent):
+        self.agent = agent
+        self.settings = get_settings()
+
+    def routes(self) -> List[APIRoute]:
+        """Gradio uygulamasına eklenecek rotalar (Gradio rotalarından önce eşleşir)"""
+        prefix = self.settings.api_prefix.rstrip("/")
+        return [
+            APIRoute(f"{prefix}/chat", self.chat, methods=["POST"]),
+            APIRoute(f"{prefix}/vision", self.vision, methods=["POST"]),
+            APIRoute(f"{prefix}/batch", self.batch, methods=["POST"]),
+        ]
+
+    def _authorize(self, request: Request) -> None:
+        """API_TOKEN ayarlıysa Bearer token'ı doğrula"""
+        token = self.settings.api_token
+        if not token:
+            return
+        header = request.headers.get("authorization", "")
+        if not hmac.compare_digest(header.encode(), f"Bearer {token}".encode()):
+            raise HTTPException(status_code=401, detail="Geçersiz veya eksik API token'ı")
+
+    @staticmethod
+    def _check_session_id(session_id: Optional[str]) -> None:
+        """Geçici oturum öneki sunucuya ayrılmıştır; istemci verirse başka çağıranın oturumunu silebilirdi"""
+        if is_ephemeral(session_id):
+            raise HTTPException(status_code=400,
+                                detail=f"session_id '{EPHEMERAL_PREFIX}' ile başlayamaz (sunucuya ayrılmış önek)")
+
+    @staticmethod
+    def _new_session_id() -> str:
+        return f"{EPHEMERAL_PREFIX}{uuid.uuid4().hex}"
+
+    async def _released(self, chunks: AsyncIterator[str], session_id: str) -> AsyncIterator[str]:
+        """Yanıt bittiğinde (veya istemci koptuğunda) geçici oturumu havuzdan çıkar"""
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            if is_ephemeral(session_id):
+                self.agent.sessions.remove(session_id)
+
+    async def chat(self, body: ChatRequest, request: Request):
+        """Metin mesajı; stream verilirse yanıt parça parça (SSE veya NDJSON) döner"""
+        self._authorize(request)
+        self._check_session_id(body.session_id)
+        API_REQUESTS.inc(endpoint="chat", mode=body.stream or "json")
+        session_id = body.session_id or self._new_session_id()
+        chunks = self._released(self.agent.astream_message(body.message, session_id=session_id), session_id)
+        return await self._respond(chunks, body.session_id, body.stream)
+
+    async def vision(self, request: Request, message: str = "", session_id: Optional[str] = None,
+                     stream: StreamMode = None):
+        """Gövdedeki ham görsel bytes'ı (base64'süz) soru ile analiz et"""
+        self._authorize(request)
+        self._check_session_id(session_id)
+        API_REQUESTS.inc(endpoint="vision", mode=stream or "json")
+        image = await self._read_image(request)
+        used_session_id = session_id or self._new_session_id()
+        chunks = self._released(self.agent.astream_message(message, image, session_id=used_session_id),
+                                used_session_id)
+        return await self._respond(chunks, session_id, stream)
+
+    async def _read_image(self, request: Request) -> bytes:
+        """Gövdeyi boyut sınırıyla oku (sınır aşılınca tamamı belleğe alınmaz)"""
+        limit = self.settings.api_max_image_bytes
+        declared = request.headers.get("content-length")
+        if declared and declared.isdigit() and int(declared) > limit:
+            raise HTTPException(status_code=413, detail=f"Görsel en fazla {limit} byte olabilir")
+        data = bytearray()
+        async for chunk in request.stream():
+            data.extend(chunk)
+            if len(data) > limit:
+                raise HTTPException(status_code=413, detail=f"Görsel en fazla {limit} byte olabilir")
+        if not data:
+            raise HTTPException(status_code=400, detail="İstek gövdesinde görsel yok")
+        return bytes(data)
+
+    async def _respond(self, chunks: AsyncIterator[str], session_id: Optional[str], stream: StreamMode):
+        """Parçaları tek JSON yanıtında topla veya SSE/NDJSON olarak akıt (session_id yalnızca istemci verdiyse döner)"""
+        headers = {"X-Session-Id": session_id} if session_id else {}
+        if stream is None:
+            response = "".join([chunk async for chunk in chunks])
+            body = {"session_id": session_id, "response": response} if session_id else {"response": response}
+            return JSONResponse(body, headers=headers)
+        if stream == "sse":
+            return StreamingResponse(self._sse(chunks, session_id), media_type="text/event-stream",
+                                     headers={**headers, "Cache-Control": "no-cache"})
+        return StreamingResponse(self._ndjson(chunks, session_id), media_type="application/x-ndjson",
+                                 headers=headers)
+
+    @staticmethod
+    async def _sse(chunks: AsyncIterator[str], session_id: Optional[str]) -> AsyncIterator[str]:
+        async for chunk in chunks:
+            yield f"data: {json.dumps({'delta': chunk}, ensure_ascii=False)}\n\n"
+        yield f"event: done\ndata: {json.dumps({'session_id': session_id} if session_id else {})}\n\n"
+
+    @staticmethod
+    async def _ndjson(chunks: AsyncIterator[str], session_id: Optional[str]) -> AsyncIterator[str]:
+        async for chunk in chunks:
+            yield json.dumps({"delta": chunk}, ensure_ascii=False) + "\n"
+        yield json.dumps({"done": True, "session_id": session_id} if session_id else {"done": True}) + "\n"
+
+    async def batch(self, body: BatchRequest, request: Request):
+        """Prompt'ları sınırlı eşzamanlılıkla, batch önceliğinde çalıştır; bitenler sırayla NDJSON satırı olur"""
+        self._authorize(request)
+        if len(body.items) > self.settings.api_batch_max_items:
+            raise HTTPException(status_code=413,
+                                detail=f"Batch en fazla {self.settings.api_batch_max_items} öğe içerebilir")
+        for item in body.items:
+            self._check_session_id(item.session_id)
+        API_REQUESTS.inc(endpoint="batch", mode="ndjson")
+        concurrency = min(body.concurrency or self.settings.api_batch_concurrency, self.settings.api_batch_concurrency)
+        return StreamingResponse(self._run_batch(body.items, concurrency), media_type="application/x-ndjson")
+
+    async def _run_batch(self, items: List[BatchItem], concurrency: int) -> AsyncIterator[str]:
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(index: int, item: BatchItem) -> Dict[str, Any]:
+            async with semaphore:
+                session_id = item.session_id or self._new_session_id()
+                result: Dict[str, Any] = {"index": index, "id": item.id}
+                if item.session_id:
+                    result["session_id"] = item.session_id
+                started = time.perf_counter()
+                # Zamanlayıcıda etkileşimli sohbetin ve arka plan özetinin arkasında kalır
+                with work_scope(priority=PRIORITY_BATCH):
+                    try:
+                        result["response"] = await self.agent.aprocess_message(item.message, session_id=session_id)
+                    except Exception as e:
+                        logger.warning(f"⚠️ Batch öğesi başarısız ({index}): {str(e)}")
+                        result["error"] = str(e)
+                    finally:
+                        if is_ephemeral(session_id):
+                            self.agent.sessions.remove(session_id)
+                result["elapsed_ms"] = round((time.perf_counter() - started) * 1000, 1)
+                return result
+
+        tasks = [asyncio.ensure_future(run(index, item)) for index, item in enumerate(items)]
+        try:
+            for finished in asyncio.as_completed(tasks):
+                yield json.dumps(await finished, ensure_ascii=False) + "\n"
+        finally:
+            # İstemci bağlantıyı kestiyse kalan prompt'lar boşuna çalışmasın
+            for task in tasks:
+                task.cancel()
@@ -3,8 +3,10 @@ Gradio arayüz modülü.
 """
 
 import gradio as gr
-from typing import List, Tuple
+from typing import AsyncIterator, List, Optional, Tuple
 import logging
+from config.settings import get_settings
+from agents.metrics import CONTENT_TYPE, Gauge, get_metrics
 
 # Logging ayarları
 logging.basicConfig(level=logging.INFO)
@@ -21,6 +23,7 @@ class GradioInterface:
     
     def _create_interface(self) -> None:
         """Gradio arayüzünü oluşturur."""
+        settings = get_settings()
         try:
             # CSS stilleri
             css = """
@@ -73,10 +76,17 @@ class GradioInterface:
                             with gr.Column(scale=1):
                                 image_input = gr.Image(
                                     label="Görsel Yükle",
-                                    type="pil",
+                                    type="filepath",  # Ham dosya: JPEG draft-mode decode için
                                     sources=["upload", "webcam"],
                                     height=100
                                 )
+                                images_input = gr.File(
+                                    label="Çoklu Görsel",
+                                    file_count="multiple",
+                                    file_types=["image"],
+                                    type="filepath",
+                                    height=100
+                                )
                         
                         with gr.Row():
                             send_btn = gr.Button("Gönder", variant="primary", scale=2)
@@ -85,27 +95,22 @@ class GradioInterface:
                     with gr.Column(scale=1):
                         # Model seçici
                         with gr.Accordion("🚀 Model Ayarları", open=False):
+                            # Seçim sadece bu oturumu etkiler; model örnekleri agent'ta cache'lidir
+                            available = settings.get_available_models()
                             text_model_dropdown = gr.Dropdown(
-                                choices=[
-                                    "llama-3.3-70b-versatile",  # En yeni Llama 3.3
-                                    "llama-3.3-70b-specdec", 
-                                    "llama-3.1-70b-versatile",
-                                    "llama-3.1-405b-reasoning",
-                                    "llama3-groq-70b-8192-tool-use-preview",
-                                    "llama3-70b-8192"
-                                ],
-                                value="llama-3.3-70b-versatile",  # Default en yeni model
+                                choices=available["text_models"],
+                                value=settings.text_model,  # Default en yeni model
                                 label="Text Model",
                                 interactive=True
                             )
                             vision_model_dropdown = gr.Dropdown(
-                                choices=[
-                                    "models/gemini-2.0-flash-lite"
-                                ],
-                                value="models/gemini-2.0-flash-lite",
-                                label="Vision Model (Gemini 2.0 Flash Lite)",
-                                interactive=False
+                                choices=available["vision_models"],
+                                value=(settings.vision_model if settings.vision_backend == "groq"
+                                       else available["vision_models"][0]),
+                                label="Vision Model",
+                                interactive=True
                             )
+                            model_status = gr.Markdown("")
                         
                         # Bilgi paneli
                         gr.HTML("""
@@ -139,146 +144,40 @@ class GradioInterface:
                         """)
                 
                 # Event handlers
-                def process_message(message: str, image, history: List[List[str]]) -> Tuple[List[List[str]], str, None]:
-                    """
-                    Kullanıcı mesajını işler. Eğer saat veya tarih soruluyorsa, local date/time bilgisini prompt'a ekler.
-                    """
-                    try:
-                        import re
-                        import datetime
-                        if not message.strip() and image is None:
-                            return history, "", None
-                        
-                        # Görsel yüklendiyse Gemini Vision API ile analiz et
-                        if image is not None:
-                            try:
-                                import os
-                                import requests
-                                import json
-                                import base64
-                                import io
-                                from PIL import Image
-                                gemini_api_key = os.getenv("GEMINI_API_KEY")
-                                if not gemini_api_key:
-                                    error_response = "❌ Görsel analizi için Gemini API anahtarı bulunamadı. Lütfen .env dosyanıza GEMINI_API_KEY ekleyin."
-                                    display_message = message if message.strip() else "Görsel analizi"
-                                    history.append([display_message, error_response])
-                                    return history, "", None
-                                # Görseli base64'e çevir
-                                if hasattr(image, 'name'):
-                                    img = Image.open(image.name)
-                                else:
-                                    img = image
-                                img.thumbnail((1536, 1536), Image.Resampling.LANCZOS)
-                                buffer = io.BytesIO()
-                                img.save(buffer, format='JPEG', quality=95)
-                                image_bytes = buffer.getvalue()
-                                image_base64 = base64.b64encode(image_bytes).decode('utf-8')
-                                url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.0-flash-lite:generateContent?key={gemini_api_key}"
-                                prompt = message or "Bu resmi açıkla"
-                                data = {
-                                    "contents": [
-                                        {
-                                            "parts": [
-                                                {"text": prompt},
-                                                {"inline_data": {"mime_type": "image/jpeg", "data": image_base64}}
-                                            ]
-                                        }
-                                    ]
-                                }
-                                headers = {"Content-Type": "application/json"}
-                                response = requests.post(url, headers=headers, data=json.dumps(data), timeout=60)
-                                if response.status_code == 200:
-                                    result = response.json()
-                                    gemini_text = result["candidates"][0]["content"]["parts"][0]["text"]
-                                    display_message = message if message.strip() else "Görsel analizi"
-                                    history.append([display_message, gemini_text])
-                                    return history, "", None
-                                else:
-                                    error_response = f"❌ Gemini Vision API hatası: {response.status_code} - {response.text}"
-                                    display_message = message if message.strip() else "Görsel analizi"
-                                    history.append([display_message, error_response])
-                                    return history, "", None
-                            except Exception as e:
-                                error_response = f"❌ Görsel analizi hatası: {str(e)}"
-                                display_message = message if message.strip() else "Görsel analizi"
-                                history.append([display_message, error_response])
-                                return history, "", None
-                        
-                        # Mesaj hazırla
-                        display_message = message if message.strip() else "Görsel analizi"
-                        
-                        # Saat veya tarih sorusu mu?
-                        time_patterns = [
-                            r"saat[\s\?]*$", r"saat kaç", r"what time", r"current time", r"time now", r"kaç saat", r"zaman nedir", r"date", r"tarih", r"bugün ne", r"hangi gün"
-                        ]
-                        is_time_query = any(re.search(pat, message.lower()) for pat in time_patterns)
-                        prompt = message
-                        if is_time_query:
-                            now = datetime.datetime.now()
-                            local_time = now.strftime("%d.%m.%Y %A %H:%M:%S")
-                            # Türkçe ve İngilizce açıklama ekle
-                            ek = f"\nNot: Şu anki yerel saat ve tarih: {local_time} (Lütfen cevabında bu bilgiyi kullan.)"
-                            prompt = f"{message}\n{ek}"
-                        
-                        # Agent'tan yanıt al
-                        response = self.agent.process_message(prompt, image)
-                        
-                        # Geçmişe ekle
-                        history.append([display_message, response])
-                        
-                        return history, "", None
-                        
-                    except Exception as e:
-                        logger.error(f"Mesaj işleme hatası: {str(e)}")
-                        error_response = f"Üzgünüm, bir hata oluştu: {str(e)}"
-                        history.append([message or "Görsel", error_response])
-                        return history, "", None
-                
-                def clear_conversation():
-                    """Konuşmayı temizler."""
+                def clear_conversation(request: gr.Request):
+                    """Sadece bu oturumun konuşmasını temizler."""
                     try:
-                        self.agent.clear_memory()
+                        self.agent.clear_memory(self._session_id(request))
                         return []
                     except Exception as e:
                         logger.error(f"Temizleme hatası: {str(e)}")
                         return []
                 
-                def change_text_model(model_name):
-                    """Text modelini değiştirir."""
+                def change_text_model(model_name: str, request: gr.Request):
+                    """Bu oturumun text modelini değiştirir."""
                     try:
-                        from config.settings import settings
-                        if settings.switch_model(model_name, "text"):
-                            # Agent'ı yeniden başlat
-                            self.agent._initialize_llms()
-                            return f"✅ Text model değiştirildi: {model_name}"
-                        return "❌ Model değiştirilemedi"
+                        return self.agent.set_session_model(self._session_id(request), text_model=model_name)
                     except Exception as e:
                         return f"❌ Hata: {str(e)}"
                 
-                def change_vision_model(model_name):
-                    """Vision modelini değiştirir."""
+                def change_vision_model(model_name: str, request: gr.Request):
+                    """Bu oturumun vision modelini değiştirir."""
                     try:
-                        from config.settings import settings
-                        if settings.switch_model(model_name, "vision"):
-                            # Agent'ı yeniden başlat
-                            self.agent._initialize_llms()
-                            return f"✅ Vision model değiştirildi: {model_name}"
-                        return "❌ Model değiştirilemedi"
+                        return self.agent.set_session_model(self._session_id(request), vision_model=model_name)
                     except Exception as e:
                         return f"❌ Hata: {str(e)}"
                 
                 # Event bindings
                 send_btn.click(
-                    fn=process_message,
-                    inputs=[user_input, image_input, chatbot],
-                    outputs=[chatbot, user_input, image_input]
+                    fn=self.handle_message,
+                    inputs=[user_input, image_input, images_input, chatbot],
+                    outputs=[chatbot, user_input, image_input, images_input]
                 )
                 
                 user_input.submit(
-                    fn=process_message,
-                    inputs=[user_input, image_input, chatbot],
-                    outputs=[chatbot, user_input, image_input]
+                    fn=self.handle_message,
+                    inputs=[user_input, image_input, images_input, chatbot],
+                    outputs=[chatbot, user_input, image_input, images_input]
                 )
                 
                 clear_btn.click(
@@ -290,13 +189,13 @@ class GradioInterface:
                 text_model_dropdown.change(
                     fn=change_text_model,
                     inputs=[text_model_dropdown],
-                    outputs=[]
+                    outputs=[model_status]
                 )
                 
                 vision_model_dropdown.change(
                     fn=change_vision_model,
                     inputs=[vision_model_dropdown],
-                    outputs=[]
+                    outputs=[model_status]
                 )
             
             self.interface = interface
@@ -306,6 +205,97 @@ class GradioInterface:
             logger.error(f"Arayüz oluşturma hatası: {str(e)}")
             raise
     
+    async def handle_message(self, message: str, image, images: Optional[List[str]], history: List[List[str]],
+                             request: gr.Request) -> AsyncIterator[Tuple[List[List[str]], str, None, None]]:
+        """
+        Kullanıcı mesajını işler ve yanıtı geldikçe son sohbet balonuna yazar.
+        Saat/tarih gibi net niyetler agent'ın router'ı ile doğrudan tool'a gider;
+        görseller agent'ın vision backend'ine (cache'li) gider.
+        """
+        bubble_added = False
+        uploads = ([image] if image is not None else []) + list(images or [])
+        try:
+            if not message.strip() and not uploads:
+                yield history, "", None, None
+                return
+            
+            # Mesaj hazırla
+            display_message = message if message.strip() else "Görsel analizi"
+            if len(uploads) > 1:
+                display_message = f"🖼️ {len(uploads)} görsel: {display_message}"
+            session_id = self._session_id(request)
+            
+            # Boş balonu hemen göster, yanıtı geldikçe doldur
+            history.append([display_message, ""])
+            bubble_added = True
+            yield history, "", None, None
+            
+            if len(uploads) > 1:
+                async for update in self._stream_batch(message, uploads, history, session_id):
+                    yield update
+                return
+            
+            async for chunk in self.agent.astream_message(message, uploads[0] if uploads else None, session_id=session_id):
+                history[-1][1] += chunk
+                yield history, "", None, None
+            
+        except Exception as e:
+            logger.error(f"Mesaj işleme hatası: {str(e)}")
+            error_response = f"Üzgünüm, bir hata oluştu: {str(e)}"
+            if bubble_added:
+                history[-1][1] = error_response
+            else:
+                history.append([message or "Görsel", error_response])
+            yield history, "", None, None
+    
+    async def _stream_batch(self, message: str, uploads: List[str], history: List[List[str]],
+                            session_id: Optional[str]) -> AsyncIterator[Tuple[List[List[str]], str, None, None]]:
+        """Çoklu görselde her biri bittikçe ilerlemeyi, sonra birleşik yanıtı gösterir."""
+        total = len(uploads)
+        done: List[str] = []
+        merged = ""
+        async for event in self.agent.astream_images(message, uploads, session_id=session_id):
+            if event["type"] == "image":
+                preview = event["text"].strip().replace("\n", " ")
+                done.append(f"✅ Görsel {event['index'] + 1}: {preview[:160]}{'…' if len(preview) > 160 else ''}")
+                history[-1][1] = f"⏳ Görseller analiz ediliyor: {len(done)}/{total}\n\n" + "\n\n".join(done)
+            else:
+                merged += event["text"]
+                history[-1][1] = merged
+            yield history, "", None, None
+    
+    @staticmethod
+    def _session_id(request: Optional[gr.Request]) -> Optional[str]:
+        """Gradio isteğinden oturum anahtarını çıkarır."""
+        return getattr(request, "session_hash", None) if request is not None else None
+    
+    def _collect_queue_metrics(self) -> List[Gauge]:
+        """Gradio kuyruğunun anlık derinliği ve çalışan iş sayısı."""
+        depth = Gauge("gradio_queue_depth", "Gradio kuyruğunda bekleyen istekler")
+        active = Gauge("gradio_queue_active_workers", "Gradio kuyruğunda çalışan işler")
+        queue = getattr(self.interface, "_queue", None)
+        if queue is not None:
+            depth.set(len(queue))
+            active.set(queue.get_active_worker_count())
+        return [depth, active]
+    
+    def _app_kwargs(self) -> dict:
+        """Gradio'nun FastAPI uygulamasına /metrics ve headless API rotalarını ekler (Gradio rotalarından önce eşleşir)."""
+        settings = get_settings()
+        routes = []
+        if settings.metrics_enabled:
+            from fastapi.responses import Response
+            from fastapi.routing import APIRoute
+            
+            def metrics() -> Response:
+                return Response(get_metrics().render(), media_type=CONTENT_TYPE)
+            
+            routes.append(APIRoute(settings.metrics_path, metrics, methods=["GET"], include_in_schema=False))
+        if settings.api_enabled:
+            from ui.api import HeadlessAPI
+            routes.extend(HeadlessAPI(self.agent).routes())
+        return {"routes": routes} if routes else {}
+    
     def launch(self, share: bool = False, port: int = 7860, max_tries: int = 10) -> None:
         """Arayüzü başlatır. Port kullanımdaysa bir sonraki portu dener."""
         try:
@@ -316,12 +306,20 @@ class GradioInterface:
             for attempt in range(max_tries):
                 try:
                     logger.info(f"Arayüz başlatılıyor - Port: {current_port}, Share: {share}")
+                    # Async handler'lar thread tutmaz; sınır API gecikmesine göre ayarlanır
+                    settings = get_settings()
+                    self.interface.queue(
+                        default_concurrency_limit=settings.queue_concurrency_limit,
+                        max_size=settings.queue_max_size
+                    )
+                    get_metrics().set_collector("gradio_queue", self._collect_queue_metrics)
                     self.interface.launch(
                         share=share,
                         server_port=current_port,
                         server_name="0.0.0.0",
                         show_error=True,
-                        quiet=False
+                        quiet=False,
+                        app_kwargs=self._app_kwargs()
                     )
                     return
                 except Exception as e: